@@ -0,0 +1,3 @@
+from .legistar_server import LegistarStandIn
+from .fetch_benchmarks import run_fetch_benchmarks
+from .serializer_benchmarks import run_serializer_benchmarks
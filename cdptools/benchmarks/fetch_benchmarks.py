@@ -0,0 +1,204 @@
+from cdptools.processor.io.pipelines import LegistarPipe, BodyPipe
+from cdptools.generator.staging import get_legistar_tables
+from cdptools.benchmarks.legistar_server import LegistarStandIn
+from cdptools.utils import throttles
+from cdptools.utils import sessions
+from cdptools.utils import checks
+import contextlib
+import tempfile
+import time
+import io
+
+DEFAULT_WORKERS = [1, 4, 16]
+DEFAULT_DETAILS = 500
+
+def run_fetch_benchmark(name, func, stand_in):
+    """
+    Run a single fetch benchmark against a running stand-in server.
+
+    Example:
+    ==========
+    ```
+        >>> with LegistarStandIn() as stand_in:
+        ...     pipe = LegistarPipe("seattle", host=stand_in.host)
+        ...     run_fetch_benchmark("Matters",
+        ...                         lambda: pipe.get_legistar_object(
+        ...                             "Matters", pages="all"),
+        ...                         stand_in)
+        {'name': 'Matters', 'wall_time': 0.61, 'requests': 21, ...}
+    ```
+
+    Parameters
+    ==========
+    name: str
+        The name to report the benchmark under.
+    func: function
+        The fetch to time. Anything it prints is discarded.
+    stand_in: cdptools.benchmarks.legistar_server.LegistarStandIn
+        The running stand-in server func requests against.
+
+    Returns
+    ==========
+    result: dict
+        The wall time, request, error, and byte counts, and the request and
+        byte throughput of the benchmark.
+    """
+
+    # enforce types
+    checks.check_types(name, str)
+    checks.check_types(stand_in, LegistarStandIn)
+
+    stand_in.reset_stats()
+    with contextlib.redirect_stdout(io.StringIO()):
+        start = time.perf_counter()
+        func()
+        wall_time = time.perf_counter() - start
+
+    stats = stand_in.stats
+    return {"name": name,
+            "wall_time": wall_time,
+            "requests": stats["requests"],
+            "errors": stats["errors"],
+            "bytes": stats["bytes"],
+            "requests_per_second": stats["requests"] / wall_time,
+            "bytes_per_second": stats["bytes"] / wall_time}
+
+def format_fetch_results(results):
+    """
+    Returns the provided benchmark results formatted as a plain text table.
+    """
+
+    lines = ["{n:<40}{w:>10}{r:>10}{e:>8}{rps:>12}{bps:>14}".format(
+        n="benchmark", w="wall (s)", r="requests", e="errors",
+        rps="requests/s", bps="KB/s")]
+    for result in results:
+        lines.append(
+            "{n:<40}{w:>10.3f}{r:>10}{e:>8}{rps:>12.1f}{bps:>14.1f}".format(
+                n=result["name"],
+                w=result["wall_time"],
+                r=result["requests"],
+                e=result["errors"],
+                rps=result["requests_per_second"],
+                bps=result["bytes_per_second"] / 1024))
+
+    return "\n".join(lines)
+
+def run_fetch_benchmarks(rows=None,
+                         latency=0.02,
+                         error_rate=0.0,
+                         workers=DEFAULT_WORKERS,
+                         city="seattle",
+                         details=DEFAULT_DETAILS):
+    """
+    Benchmark full table pulls of LegistarPipe, BodyPipe, and
+    get_legistar_tables, and per id detail requests of LegistarPipe against a
+    local stand-in server.
+
+    Example:
+    ==========
+    ```
+        >>> results = run_fetch_benchmarks(latency=0.05, workers=[1, 8])
+        benchmark                                 wall (s)  requests  ...
+        LegistarPipe Matters workers=1               1.262        21  ...
+        ...
+    ```
+
+    Parameters
+    ==========
+    rows: dict
+        How many rows each synthetic table should have.
+    latency: int, float
+        How many seconds the stand-in delays every request by.
+    error_rate: float
+        The probability of any request failing. When errors are injected every
+        pipe is given a Throttle so that failures are retried.
+    workers: list
+        The page window and detail worker counts to benchmark LegistarPipe
+        with.
+    city: str
+        The city name to request tables for.
+    details: int
+        How many Matters details each detail benchmark requests.
+
+    Returns
+    ==========
+    results: list
+        The result of every benchmark, see run_fetch_benchmark.
+    """
+
+    # enforce types
+    checks.check_types(workers, list)
+    checks.check_types(city, str)
+    checks.check_types(details, int)
+
+    def create_throttle(limit):
+        if error_rate <= 0:
+            return None
+
+        return throttles.Throttle(rate=10000,
+                                  initial=limit,
+                                  maximum=limit,
+                                  backoff=0.01)
+
+    results = []
+    with LegistarStandIn(rows=rows,
+                         latency=latency,
+                         error_rate=error_rate) as stand_in:
+        session = sessions.create_session(host_connections=max(workers))
+
+        # warm the synthetic tables so generation is not timed
+        stand_in.get_tables(city)
+
+        for count in workers:
+            pipe = LegistarPipe(city,
+                                session=session,
+                                throttle=create_throttle(count),
+                                host=stand_in.host)
+            results.append(run_fetch_benchmark(
+                "LegistarPipe Matters workers={w}".format(w=count),
+                lambda: pipe.get_legistar_object("Matters",
+                                                 pages="all",
+                                                 workers=count),
+                stand_in))
+
+        ids = [matter["MatterId"]
+               for matter in stand_in.get_tables(city)["Matters"][:details]]
+        for count in workers:
+            pipe = LegistarPipe(city,
+                                session=session,
+                                throttle=create_throttle(count),
+                                host=stand_in.host)
+            results.append(run_fetch_benchmark(
+                "LegistarPipe Matters details workers={w}".format(w=count),
+                lambda: list(pipe.iter_legistar_details(
+                    ("Matters/{id}".format(id=id) for id in ids),
+                    workers=count)),
+                stand_in))
+
+        def pull_bodies():
+            pipe = BodyPipe(city,
+                            session=session,
+                            throttle=create_throttle(1),
+                            host=stand_in.host)
+            pipe.active
+            pipe.names
+            pipe.body_types
+
+        results.append(run_fetch_benchmark("BodyPipe active, names, types",
+                                           pull_bodies,
+                                           stand_in))
+
+        with tempfile.TemporaryDirectory() as storage:
+            results.append(run_fetch_benchmark(
+                "get_legistar_tables",
+                lambda: get_legistar_tables(city,
+                                            storage,
+                                            update=True,
+                                            host=stand_in.host,
+                                            session=session,
+                                            throttle=create_throttle(1),
+                                            extended=False),
+                stand_in))
+
+    print(format_fetch_results(results))
+    return results
@@ -0,0 +1,507 @@
+from cdptools.generator.staging.get_legistar_tables import FORMATTING
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cdptools.utils import checks
+import urllib.parse
+import threading
+import datetime
+import hashlib
+import random
+import json
+import gzip
+import time
+import re
+
+PAGE_SIZE = 1000
+
+DEFAULT_ROWS = {"Actions": 200,
+                "Bodies": 150,
+                "BodyTypes": 12,
+                "CodeSections": 0,
+                "Events": 5000,
+                "Indexes": 300,
+                "Matters": 20000}
+
+EPOCH = datetime.datetime(2012, 1, 1)
+
+FILTER_CLAUSE = re.compile(
+    r"^\s*(\w+)\s+(eq|ne|gt|ge|lt|le)\s+(datetime'[^']*'|'[^']*'|-?\d+)\s*$")
+
+FILTER_OPERATORS = {"eq": lambda a, b: a == b,
+                    "ne": lambda a, b: a != b,
+                    "gt": lambda a, b: a is not None and a > b,
+                    "ge": lambda a, b: a is not None and a >= b,
+                    "lt": lambda a, b: a is not None and a < b,
+                    "le": lambda a, b: a is not None and a <= b}
+
+def _timestamp(minutes):
+    return (EPOCH + datetime.timedelta(minutes=minutes)).isoformat()
+
+def _guid(table, id):
+    digest = hashlib.md5("{t}{i}".format(t=table, i=id).encode("utf-8"))
+    return digest.hexdigest().upper()
+
+def generate_tables(rows=None, seed=0):
+    """
+    Generate synthetic Legistar tables with the id, foreign key, and last
+    modified fields the CDP tools rely on.
+
+    Example:
+    ==========
+    ```
+        >>> tables = generate_tables({"Matters": 10}, seed=1)
+        >>> len(tables["Matters"])
+        10
+        >>> tables["Matters"][0]["MatterId"]
+        1
+    ```
+
+    Parameters
+    ==========
+    rows: dict
+        How many rows each table should have. Tables that are not provided use
+        DEFAULT_ROWS.
+    seed: int
+        The seed the table contents are generated from.
+
+    Returns
+    ==========
+    tables: dict
+        The generated tables keyed by Legistar table name.
+    """
+
+    # enforce types
+    checks.check_types(rows, [dict, type(None)])
+    checks.check_types(seed, int)
+
+    counts = dict(DEFAULT_ROWS)
+    if rows is not None:
+        counts.update(rows)
+
+    rand = random.Random(seed)
+    words = ["transportation", "housing", "budget", "parks", "utilities",
+             "public safety", "finance", "civil rights", "energy", "land use",
+             "sustainability", "education", "neighborhoods", "governance"]
+
+    def modified():
+        return _timestamp(rand.randint(0, 60 * 24 * 365 * 6))
+
+    tables = {}
+
+    tables["BodyTypes"] = [{"BodyTypeId": i,
+                            "BodyTypeGuid": _guid("BodyTypes", i),
+                            "BodyTypeLastModifiedUtc": modified(),
+                            "BodyTypeName": "Body Type {i}".format(i=i)}
+                           for i in range(1, counts["BodyTypes"] + 1)]
+
+    tables["Bodies"] = []
+    for i in range(1, counts["Bodies"] + 1):
+        name = "{w} committee {i}".format(w=rand.choice(words).title(), i=i)
+        body_type = rand.randint(1, max(1, counts["BodyTypes"]))
+        tables["Bodies"].append({
+            "BodyId": i,
+            "BodyGuid": _guid("Bodies", i),
+            "BodyLastModifiedUtc": modified(),
+            "BodyName": name,
+            "BodyTypeId": body_type,
+            "BodyTypeName": "Body Type {i}".format(i=body_type),
+            "BodyActiveFlag": int(rand.random() < 0.6),
+            "BodyDescription": "http://www.example.gov/committees/{n}".format(
+                n=name.lower().replace(" ", "-"))})
+
+    tables["Actions"] = [{"ActionId": i,
+                          "ActionGuid": _guid("Actions", i),
+                          "ActionLastModifiedUtc": modified(),
+                          "ActionName": "Action {i}".format(i=i),
+                          "ActionActiveFlag": 1,
+                          "ActionUsedFlag": int(rand.random() < 0.8)}
+                         for i in range(1, counts["Actions"] + 1)]
+
+    tables["CodeSections"] = [{"CodeSectionId": i,
+                               "CodeSectionGuid": _guid("CodeSections", i),
+                               "CodeSectionLastModifiedUtc": modified(),
+                               "CodeSectionNumber": "{i}.{j}".format(
+                                   i=i, j=rand.randint(1, 99)),
+                               "CodeSectionName": "Code Section {i}".format(
+                                   i=i)}
+                              for i in range(1, counts["CodeSections"] + 1)]
+
+    tables["Indexes"] = [{"IndexId": i,
+                          "IndexGuid": _guid("Indexes", i),
+                          "IndexLastModifiedUtc": modified(),
+                          "IndexName": rand.choice(words).title(),
+                          "IndexUsedFlag": 1}
+                         for i in range(1, counts["Indexes"] + 1)]
+
+    tables["Events"] = []
+    for i in range(1, counts["Events"] + 1):
+        body = rand.randint(1, max(1, counts["Bodies"]))
+        date = EPOCH + datetime.timedelta(days=rand.randint(0, 365 * 6))
+        tables["Events"].append({
+            "EventId": i,
+            "EventGuid": _guid("Events", i),
+            "EventLastModifiedUtc": modified(),
+            "EventBodyId": body,
+            "EventBodyName": (tables["Bodies"][body - 1]["BodyName"]
+                              if counts["Bodies"] > 0 else None),
+            "EventDate": date.isoformat(),
+            "EventTime": "9:30 AM",
+            "EventLocation": "Council Chambers",
+            "EventAgendaFile": "http://www.example.gov/agenda/{i}.pdf".format(
+                i=i),
+            "EventMinutesFile": None})
+
+    tables["Matters"] = []
+    for i in range(1, counts["Matters"] + 1):
+        topic = rand.choice(words)
+        tables["Matters"].append({
+            "MatterId": i,
+            "MatterGuid": _guid("Matters", i),
+            "MatterLastModifiedUtc": modified(),
+            "MatterFile": "CB {i}".format(i=100000 + i),
+            "MatterName": "Ordinance {i}".format(i=i),
+            "MatterTitle": ("AN ORDINANCE relating to {t}; amending "
+                            "ordinance {o} which adopted the {y} budget; and "
+                            "ratifying and confirming certain prior "
+                            "acts.").format(t=topic,
+                                            o=rand.randint(100000, 200000),
+                                            y=rand.randint(2012, 2018)),
+            "MatterBodyId": rand.randint(1, max(1, counts["Bodies"])),
+            "MatterIntroDate": modified(),
+            "MatterStatusName": rand.choice(["Adopted", "In Committee",
+                                             "Passed", "Filed"])})
+
+    return tables
+
+def generate_event_items(event, matters, seed=0):
+    """
+    Returns a deterministic list of synthetic EventItems for the provided event
+    that reference rows of the provided matters table.
+    """
+
+    rand = random.Random(seed * 1000003 + event["EventId"])
+    items = []
+    for n in range(rand.randint(2, 8)):
+        matter = rand.choice(matters) if len(matters) > 0 else None
+        items.append({
+            "EventItemId": event["EventId"] * 100 + n,
+            "EventItemGuid": _guid("EventItems", event["EventId"] * 100 + n),
+            "EventItemEventId": event["EventId"],
+            "EventItemAgendaNumber": str(n + 1),
+            "EventItemTitle": (matter["MatterTitle"] if matter is not None
+                               else "Public Comment"),
+            "EventItemMatterId": (matter["MatterId"] if matter is not None
+                                  else None),
+            "EventItemMatterFile": (matter["MatterFile"] if matter is not None
+                                    else None),
+            "EventItemMatterAttachments": []})
+
+    return items
+
+def _parse_literal(literal):
+    if literal.startswith("datetime'"):
+        return literal[len("datetime'"):-1]
+    if literal.startswith("'"):
+        return literal[1:-1]
+    return int(literal)
+
+def apply_filter(rows, expression):
+    """
+    Returns the rows that match the provided OData filter expression. Only
+    comparisons of a field with a literal joined by "and" are supported.
+    """
+
+    for clause in re.split(r"\s+and\s+", expression):
+        match = FILTER_CLAUSE.match(clause)
+        if match is None:
+            raise ValueError("Unsupported filter: {c}".format(c=clause))
+
+        field, operator, literal = match.groups()
+        value = _parse_literal(literal)
+        compare = FILTER_OPERATORS[operator]
+        rows = [row for row in rows if compare(row.get(field), value)]
+
+    return rows
+
+class _LegistarHandler(BaseHTTPRequestHandler):
+
+    protocol_version = "HTTP/1.1"
+
+    # headers and body are separate writes, without this small keep alive
+    # responses stall on delayed acks
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        stand_in = self.server.stand_in
+        stand_in._record_request()
+
+        if stand_in.latency > 0:
+            time.sleep(stand_in.latency)
+
+        if stand_in._should_fail():
+            headers = {}
+            if stand_in.retry_after is not None:
+                headers["Retry-After"] = str(stand_in.retry_after)
+            self._send(stand_in.error_status, {"Message": "Injected error"},
+                       headers)
+            return
+
+        parsed = urllib.parse.urlparse(self.path)
+        parts = [part for part in parsed.path.split("/") if part != ""]
+        params = {key: values[0] for key, values in
+                  urllib.parse.parse_qs(parsed.query).items()}
+
+        try:
+            status, body = stand_in._route(parts, params)
+        except ValueError as e:
+            status, body = 400, {"Message": str(e)}
+
+        self._send(status, body)
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+
+        accepts = self.headers.get("Accept-Encoding", "")
+        compressed = "gzip" in accepts
+        if compressed:
+            payload = gzip.compress(payload)
+
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if compressed:
+            self.send_header("Content-Encoding", "gzip")
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+        self.server.stand_in._record_bytes(len(payload), status)
+
+class LegistarStandIn:
+    """
+    Local stand-in for webapi.legistar.com serving synthetic tables.
+
+    Example:
+    ==========
+    ```
+        >>> with LegistarStandIn(latency=0.05, error_rate=0.01) as stand_in:
+        ...     pipe = LegistarPipe("seattle", host=stand_in.host)
+        ...     matters = pipe.get_legistar_object("Matters", pages="all")
+        >>> stand_in.stats
+        {'requests': 21, 'errors': 0, 'bytes': 1304011}
+    ```
+
+    Parameters
+    ==========
+    rows: dict
+        How many rows each synthetic table should have.
+    latency: int, float
+        How many seconds every request is delayed by.
+    error_rate: float
+        The probability of any request failing with error_status.
+    error_status: int
+        The status code injected errors respond with.
+    retry_after: int
+        The Retry-After header value sent with injected errors.
+    port: int
+        Which port to listen on. Zero picks a free port.
+    seed: int
+        The seed the tables and injected errors are generated from. Every city
+        is served its own tables derived from this seed.
+
+    Usage
+    ==========
+    Serves /v1/{city}/{table} with $skip paging in pages of 1000 as well as
+    $top, $select, $filter, and $orderby, single objects at
+    /v1/{city}/{table}/{id}, Events/{id} with EventItems, and
+    EventDates/{BodyId}. Responses are gzipped when asked for and connections
+    are kept alive.
+    """
+
+    def __init__(self,
+                 rows=None,
+                 latency=0,
+                 error_rate=0.0,
+                 error_status=503,
+                 retry_after=None,
+                 port=0,
+                 seed=0):
+
+        # enforce types
+        checks.check_types(rows, [dict, type(None)])
+        checks.check_types(latency, [int, float])
+        checks.check_types(error_rate, float)
+        checks.check_types(error_status, int)
+        checks.check_types(retry_after, [int, type(None)])
+        checks.check_types(port, int)
+        checks.check_types(seed, int)
+
+        self.rows = rows
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.retry_after = retry_after
+        self.port = port
+        self.seed = seed
+
+        self._tables = {}
+        self._indexes = {}
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._server = None
+        self._thread = None
+        self.reset_stats()
+
+    @property
+    def host(self):
+        """
+        Returns the scheme and host to point a LegistarPipe at.
+        """
+
+        return "http://127.0.0.1:{p}".format(p=self.port)
+
+    @property
+    def stats(self):
+        """
+        Returns a dictionary of the request, error, and response byte counters.
+        """
+
+        with self._lock:
+            return {"requests": self.requests,
+                    "errors": self.errors,
+                    "bytes": self.bytes}
+
+    def reset_stats(self):
+        """
+        Reset the request, error, and response byte counters to zero.
+        """
+
+        with self._lock:
+            self.requests = 0
+            self.errors = 0
+            self.bytes = 0
+
+    def get_tables(self, city):
+        """
+        Returns the synthetic tables served for the provided city.
+        """
+
+        with self._lock:
+            if city not in self._tables:
+                city_seed = int(hashlib.md5(city.encode("utf-8")).hexdigest(),
+                                16) % 100000
+                tables = generate_tables(self.rows, self.seed + city_seed)
+                self._tables[city] = tables
+                self._indexes[city] = {
+                    table: {str(row[FORMATTING[table]]): row for row in rows}
+                    for table, rows in tables.items()}
+
+            return self._tables[city]
+
+    def start(self):
+        """
+        Start serving in a background thread.
+        """
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", self.port),
+                                           _LegistarHandler)
+        self._server.daemon_threads = True
+        self._server.stand_in = self
+        self.port = self._server.server_address[1]
+
+        self._thread = threading.Thread(target=self._server.serve_forever,
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """
+        Stop serving and close the listening socket.
+        """
+
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._thread.join()
+            self._server = None
+            self._thread = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def _record_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def _record_bytes(self, size, status):
+        with self._lock:
+            self.bytes += size
+            if status != 200:
+                self.errors += 1
+
+    def _should_fail(self):
+        if self.error_rate <= 0:
+            return False
+
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def _route(self, parts, params):
+        if len(parts) < 3 or parts[0] != "v1":
+            return 404, {"Message": "Unknown route"}
+
+        city = parts[1].lower()
+        tables = self.get_tables(city)
+        table = parts[2]
+
+        # future event dates of a single body
+        if table == "EventDates" and len(parts) == 4:
+            body_id = int(parts[3])
+            return 200, sorted({event["EventDate"]
+                                for event in tables["Events"]
+                                if event["EventBodyId"] == body_id})
+
+        if table not in tables:
+            return 404, {"Message": "Unknown table"}
+
+        # single objects
+        if len(parts) == 4:
+            found = self._indexes[city][table].get(parts[3])
+            if found is None:
+                return 404, {"Message": "Unknown id"}
+
+            found = dict(found)
+            if table == "Events" and params.get("EventItems") == "1":
+                found["EventItems"] = generate_event_items(found,
+                                                           tables["Matters"],
+                                                           self.seed)
+
+            return 200, found
+
+        # paged tables
+        rows = tables[table]
+        if "$filter" in params:
+            rows = apply_filter(rows, params["$filter"])
+        if "$orderby" in params:
+            field, *direction = params["$orderby"].split()
+            rows = sorted(rows,
+                          key=lambda row: (row.get(field) is None,
+                                           row.get(field)),
+                          reverse=(direction == ["desc"]))
+
+        skip = int(params.get("$skip", 0))
+        top = min(PAGE_SIZE, int(params.get("$top", PAGE_SIZE)))
+        rows = rows[skip:skip + top]
+
+        if "$select" in params:
+            fields = params["$select"].split(",")
+            rows = [{field: row.get(field) for field in fields}
+                    for row in rows]
+
+        return 200, rows
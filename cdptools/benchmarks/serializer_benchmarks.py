@@ -0,0 +1,193 @@
+from cdptools.benchmarks.legistar_server import generate_tables
+from cdptools.utils import checks
+from cdptools.utils import stores
+import pathlib
+import random
+import time
+
+DEFAULT_REPEAT = 3
+DEFAULT_TRANSCRIPTS = 200
+
+def load_artifact(path):
+    """
+    Returns the data of an artifact stored by cdptools.utils.stores, i.e. a
+    stored table, tfidf.json, or combined_data.json. Newline delimited json
+    tables are returned as a list of their records.
+    """
+
+    # enforce types
+    checks.check_types(path, [str, pathlib.Path])
+
+    if ".ndjson" in pathlib.Path(path).suffixes:
+        return list(stores.read_records(path))
+
+    return stores.read_data(path)
+
+def generate_artifacts(rows=None, transcripts=DEFAULT_TRANSCRIPTS, seed=0):
+    """
+    Returns synthetic Matters and Events tables and a synthetic tfidf tree
+    keyed by artifact name, for when no stored artifacts are available.
+    """
+
+    tables = generate_tables(rows, seed=seed)
+
+    # every transcript scores the words of a few matter titles
+    generator = random.Random(seed)
+    words = sorted({word.strip(";,.").lower()
+                    for matter in tables["Matters"][:2000]
+                    for word in matter["MatterTitle"].split()})
+    tfidf = {}
+    for number in range(transcripts):
+        transcript = "council_briefing_{n:04d}".format(n=number)
+        tfidf[transcript] = {word: generator.random() / 10
+                             for word in generator.sample(
+                                 words, min(len(words), 400))}
+
+    return {"Matters": tables["Matters"],
+            "Events": tables["Events"],
+            "tfidf": tfidf}
+
+def run_serializer_benchmark(name, data, serializer, repeat=DEFAULT_REPEAT):
+    """
+    Time serializing and deserializing a single artifact with a single
+    serializer.
+
+    Example:
+    ==========
+    ```
+        >>> run_serializer_benchmark("Matters", matters, "orjson")
+        {'name': 'Matters', 'serializer': 'orjson', 'bytes': 6812345, ...}
+    ```
+
+    Parameters
+    ==========
+    name: str
+        The name to report the benchmark under.
+    data: list, dict
+        The artifact to serialize.
+    serializer: str, cdptools.utils.stores.Serializer
+        The serializer to benchmark.
+    repeat: int
+        How many times to serialize and deserialize the artifact. The fastest
+        time of each is reported.
+
+    Returns
+    ==========
+    result: dict
+        The serialized size, the fastest dump and load times and their
+        throughput, and whether the artifact survived the round trip
+        unchanged.
+    """
+
+    # enforce types
+    checks.check_types(name, str)
+    checks.check_types(data, [list, dict])
+    checks.check_types(repeat, int)
+
+    serializer = stores.get_serializer(serializer)
+
+    dump_times = []
+    load_times = []
+    for i in range(repeat):
+        start = time.perf_counter()
+        payload = serializer.dumps(data)
+        dump_times.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        loaded = serializer.loads(payload)
+        load_times.append(time.perf_counter() - start)
+
+    return {"name": name,
+            "serializer": serializer.name,
+            "bytes": len(payload),
+            "dump_time": min(dump_times),
+            "load_time": min(load_times),
+            "dump_bytes_per_second": len(payload) / min(dump_times),
+            "load_bytes_per_second": len(payload) / min(load_times),
+            "round_trip": loaded == data}
+
+def format_serializer_results(results):
+    """
+    Returns the provided benchmark results formatted as a plain text table.
+    """
+
+    lines = ["{n:<24}{s:<10}{b:>12}{d:>10}{l:>10}{dm:>10}{lm:>10}{r:>7}"
+             .format(n="artifact", s="format", b="KB", d="dump (s)",
+                     l="load (s)", dm="dump MB/s", lm="load MB/s", r="same")]
+    for result in results:
+        lines.append(
+            "{n:<24}{s:<10}{b:>12.1f}{d:>10.3f}{l:>10.3f}{dm:>10.1f}"
+            "{lm:>10.1f}{r:>7}".format(
+                n=result["name"],
+                s=result["serializer"],
+                b=result["bytes"] / 1024,
+                d=result["dump_time"],
+                l=result["load_time"],
+                dm=result["dump_bytes_per_second"] / 1024 ** 2,
+                lm=result["load_bytes_per_second"] / 1024 ** 2,
+                r=str(result["round_trip"])))
+
+    return "\n".join(lines)
+
+def run_serializer_benchmarks(artifacts=None, serializers=None,
+                              repeat=DEFAULT_REPEAT, rows=None):
+    """
+    Benchmark every available serializer against stored artifacts so the
+    fastest serializer can be chosen per artifact.
+
+    Example:
+    ==========
+    ```
+        >>> results = run_serializer_benchmarks(
+        ...     ["/cdp/stg/seattle/Matters.json",
+        ...      "/transcription_runner/seattle/json/tfidf.json"])
+        artifact                format            KB  dump (s)  ...
+        Matters.json            json         12345.6     0.210  ...
+        Matters.json            orjson       12001.2     0.021  ...
+        ...
+    ```
+
+    Parameters
+    ==========
+    artifacts: list
+        The paths of stored artifacts to benchmark, i.e. stored tables,
+        tfidf.json, and combined_data.json. When not provided synthetic
+        Matters and Events tables and a synthetic tfidf tree are used.
+    serializers: list
+        The names of the serializers to benchmark. Defaults to every
+        serializer whose package is installed.
+    repeat: int
+        How many times every artifact is serialized and deserialized with
+        every serializer.
+    rows: dict
+        How many rows each synthetic table should have.
+
+    Returns
+    ==========
+    results: list
+        The result of every benchmark, see run_serializer_benchmark.
+    """
+
+    # enforce types
+    checks.check_types(artifacts, [list, type(None)])
+    checks.check_types(serializers, [list, type(None)])
+
+    if serializers is None:
+        serializers = stores.get_available_serializers()
+
+    if artifacts is None:
+        loaded = generate_artifacts(rows)
+    else:
+        loaded = {pathlib.Path(path).name: load_artifact(path)
+                  for path in artifacts}
+
+    results = []
+    for name, data in loaded.items():
+        for serializer in serializers:
+            results.append(run_serializer_benchmark(name,
+                                                    data,
+                                                    serializer,
+                                                    repeat))
+
+    print(format_serializer_results(results))
+    return results
@@ -1,2 +1,4 @@
-from .create_staging_db import create_staging_db
+from .create_staging_db import create_staging_db, get_body_events
 from .get_legistar_tables import get_legistar_tables
+from .harvest_legistar_clients import harvest_legistar_clients
+from .build_event_documents import build_event_documents
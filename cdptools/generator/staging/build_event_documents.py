@@ -0,0 +1,235 @@
+from .get_legistar_tables import TABLE_FORMATS
+from .create_staging_db import EVENT_DETAILS
+from .create_staging_db import find_stored_table, iter_stored_details
+from cdptools.utils import checks
+from cdptools.utils import stores
+import pathlib
+import time
+import os
+
+EVENT_DOCUMENTS = "event_documents"
+
+def index_table(records, key, fields=None):
+    """
+    Returns a dictionary of the provided records keyed by the provided field
+    so that every later lookup is a single hash probe. When fields is provided
+    only those fields of each record are kept.
+    """
+
+    if fields is None:
+        return {record[key]: record for record in records}
+
+    return {record[key]: {field: record.get(field) for field in fields}
+            for record in records}
+
+def build_event_document(event, bodies, body_types, items, matters):
+    """
+    Returns the provided event joined with its body and body type names and
+    its event items, each joined with its matter, using the provided indexes.
+    """
+
+    body = bodies.get(event["EventBodyId"], {})
+    body_type = body_types.get(body.get("BodyTypeId"), {})
+
+    document = dict(event)
+    document["EventBodyName"] = body.get("BodyName",
+                                         event.get("EventBodyName"))
+    document["EventBodyTypeId"] = body.get("BodyTypeId")
+    document["EventBodyTypeName"] = body_type.get("BodyTypeName")
+    document["EventItems"] = []
+    for item in items.get(event["EventId"], []):
+        item = dict(item)
+        item["EventItemMatter"] = matters.get(item.get("EventItemMatterId"))
+        document["EventItems"].append(item)
+
+    return document
+
+def build_event_documents(client="seattle", storage="/cdp/stg/",
+                          update=False, in_memory=False, table_format="json",
+                          compression=None,
+                          serializer=stores.DEFAULT_SERIALIZER,
+                          skip_unchanged=False):
+    """
+    Build one document per meeting from the stored Legistar tables of a
+    client.
+
+    Example:
+    ==========
+    ```
+        >>> documents = build_event_documents("seattle", in_memory=True)
+        >>> documents[0]["EventBodyName"], documents[0]["EventBodyTypeName"]
+        ('Transportation committee 1', 'Committee')
+        >>> documents[0]["EventItems"][0]["EventItemMatter"]["MatterFile"]
+        'CB 100001'
+    ```
+
+    Parameters
+    ==========
+    client: str
+        The Legistar client whose stored tables should be used.
+    storage: str
+        Where the tables were stored by get_legistar_tables. The client name
+        is appended if it is not already part of the path.
+    update: bool
+        Should already stored event documents be overwritten.
+    in_memory: bool
+        Should the event documents be returned instead of their stored path.
+    table_format: str
+        How the event documents should be stored, "json" or "ndjson".
+    compression: str
+        How ndjson event documents should be compressed, "gzip", "zstd", or
+        None.
+    serializer: str, cdptools.utils.stores.Serializer
+        Which json serializer to read ndjson tables and store the event
+        documents with, "json" or "orjson".
+    skip_unchanged: bool
+        Should the stored event documents be left untouched when the rebuilt
+        documents are identical, so that whatever consumes them can skip
+        work too.
+
+    Returns
+    ==========
+    results: list, pathlib.Path
+        The event documents in stored Events order when in_memory is True,
+        otherwise their stored path.
+
+    Usage
+    ==========
+    Every document is the stored Event with its body name, body type id and
+    name, and its EventItems from the stored Events details, each with the
+    stored Matter it links to in EventItemMatter. Bodies, BodyTypes, the
+    event items, and the linked Matters are each read once into a hash index
+    and the Events are then streamed through the indexes and written as they
+    are joined, so the build is linear in the size of the tables. Only the
+    Matters linked to by an event item are held in memory.
+    """
+
+    # ensure param types
+    checks.check_types(client, [str])
+    checks.check_types(storage, [str, pathlib.Path])
+    checks.check_types(update, [bool])
+    checks.check_types(in_memory, [bool])
+    checks.check_types(table_format, [str])
+    checks.check_types(compression, [str, type(None)])
+    checks.check_types(skip_unchanged, [bool])
+    if table_format not in TABLE_FORMATS:
+        raise ValueError("Unknown table format: {f}".format(f=table_format))
+    if compression is not None and table_format != "ndjson":
+        raise ValueError("Only ndjson tables can be compressed")
+    serializer = stores.get_json_serializer(serializer)
+
+    client = client.lower()
+    if isinstance(storage, str):
+        storage = pathlib.Path(storage)
+
+    if client not in str(storage):
+        storage /= client
+
+    print("-" * 80)
+    print("Building CDP event documents for client:", client,
+          "\nWill store event documents at:", storage / EVENT_DOCUMENTS,
+          "\nWill update existing event documents:", update)
+    print("-" * 80)
+
+    start = time.perf_counter()
+    stored_events = find_stored_table(storage, "Events")
+    if stored_events is None:
+        raise FileNotFoundError("No stored Events table in: {s}".format(
+            s=storage))
+
+    # small tables
+    bodies = {}
+    stored_bodies = find_stored_table(storage, "Bodies")
+    if stored_bodies is not None:
+        bodies = index_table(stores.read_records(stored_bodies, serializer),
+                             "BodyId",
+                             ["BodyName", "BodyTypeId"])
+
+    body_types = {}
+    stored_body_types = find_stored_table(storage, "BodyTypes")
+    if stored_body_types is not None:
+        body_types = index_table(stores.read_records(stored_body_types,
+                                                     serializer),
+                                 "BodyTypeId",
+                                 ["BodyTypeName"])
+
+    # event items of every event and the matters they link to
+    items = {}
+    linked = set()
+    details_store = storage / EVENT_DETAILS
+    if os.path.isdir(details_store):
+        for id, detail in iter_stored_details(details_store):
+            event_items = detail.get("EventItems") or []
+            items[int(id)] = event_items
+            linked.update(item.get("EventItemMatterId")
+                          for item in event_items)
+
+    matters = {}
+    stored_matters = find_stored_table(storage, "Matters")
+    if stored_matters is not None:
+        stored = stores.read_records(stored_matters, serializer)
+        matters = index_table((matter for matter in stored
+                               if matter["MatterId"] in linked),
+                              "MatterId")
+
+    print("Indexed: bodies:", len(bodies),
+          "body types:", len(body_types),
+          "events with items:", len(items),
+          "linked matters:", len(matters))
+
+    # stream every event through the indexes
+    documents = []
+    count = 0
+
+    def join_events():
+        nonlocal count
+        for event in stores.read_records(stored_events, serializer):
+            document = build_event_document(event,
+                                            bodies,
+                                            body_types,
+                                            items,
+                                            matters)
+            count += 1
+            if in_memory:
+                documents.append(document)
+
+            yield document
+
+    documents_store = storage / EVENT_DOCUMENTS
+    if table_format == "ndjson" and skip_unchanged:
+        path, written = stores.store_ndjson_stream_if_changed(
+            join_events(),
+            documents_store,
+            update,
+            compression=compression,
+            serializer=serializer)
+    elif table_format == "ndjson":
+        path = stores.store_ndjson_stream(join_events(),
+                                          documents_store,
+                                          update,
+                                          compression=compression,
+                                          serializer=serializer)
+        written = True
+    elif skip_unchanged:
+        path, written = stores.store_json_stream_if_changed(
+            join_events(),
+            documents_store,
+            update,
+            serializer=serializer)
+    else:
+        path = stores.store_json_stream(join_events(),
+                                        documents_store,
+                                        update,
+                                        serializer=serializer)
+        written = True
+
+    print("-" * 80)
+    print("Built event documents:", count,
+          "written:", written,
+          "seconds:", round(time.perf_counter() - start, 2))
+    print("-" * 80)
+
+    if in_memory:
+        return documents
+
+    return path
@@ -1,8 +1,451 @@
-def create_staging_db(client="seattle", storage="/cdp/stg/", update=False):
+from .get_legistar_tables import SIMPLE, FORMATTING, TABLE_FORMATS
+from .get_legistar_tables import get_modified_field, get_table_path
+from cdptools.utils import checks
+from cdptools.utils import stores
+import itertools
+import hashlib
+import pathlib
+import sqlite3
+import json
+import time
+import os
+
+STAGING_DB = "staging.db"
+DEFAULT_BATCH_SIZE = 5000
+
+# columns pulled out of every row so they can be indexed and queried without
+# parsing the stored row, every table also has its id, last modified, content
+# hash, and data
+COLUMNS = {"Actions": [],
+           "Bodies": [("BodyTypeId", "INTEGER"),
+                      ("BodyName", "TEXT"),
+                      ("BodyActiveFlag", "INTEGER")],
+           "BodyTypes": [("BodyTypeName", "TEXT")],
+           "CodeSections": [],
+           "Events": [("EventBodyId", "INTEGER"),
+                      ("EventDate", "TEXT")],
+           "Indexes": [],
+           "Matters": [("MatterBodyId", "INTEGER"),
+                       ("MatterIntroDate", "TEXT"),
+                       ("MatterFile", "TEXT")],
+           "EventItems": [("EventItemEventId", "INTEGER"),
+                          ("EventItemMatterId", "INTEGER")]}
+INDEXES = {"Bodies": [["BodyTypeId"]],
+           "Events": [["EventBodyId", "EventDate"],
+                      ["EventDate"]],
+           "Matters": [["MatterBodyId"],
+                       ["MatterIntroDate"],
+                       ["MatterFile"]],
+           "EventItems": [["EventItemEventId"],
+                          ["EventItemMatterId"]]}
+EVENT_DETAILS = "Events@EventId"
+DETAILS_TABLE = """
+CREATE TABLE IF NOT EXISTS Details (
+    Query TEXT NOT NULL,
+    Id TEXT NOT NULL,
+    Hash TEXT NOT NULL,
+    Data TEXT NOT NULL,
+    PRIMARY KEY (Query, Id)
+)
+"""
+
+def get_staging_table(table):
+    """
+    Returns the id field, last modified field, and every column of the
+    provided staging table in insert order.
+    """
+
+    if table == "EventItems":
+        id_field = "EventItemId"
+        modified = "EventItemLastModifiedUtc"
+    else:
+        id_field = FORMATTING[table]
+        modified = get_modified_field(table)
+
+    columns = ([(id_field, "INTEGER PRIMARY KEY"), (modified, "TEXT")]
+               + COLUMNS[table]
+               + [("Hash", "TEXT NOT NULL"), ("Data", "TEXT NOT NULL")])
+
+    return id_field, modified, columns
+
+def create_staging_table(connection, table):
+    """
+    Create the provided staging table without its indexes.
+    """
+
+    columns = get_staging_table(table)[2]
+    connection.execute("CREATE TABLE IF NOT EXISTS {t} ({c})".format(
+        t=table,
+        c=", ".join(name + " " + kind for name, kind in columns)))
+
+def create_staging_indexes(connection, table):
+    """
+    Create every index of the provided staging table.
+    """
+
+    for fields in INDEXES.get(table, []):
+        connection.execute("CREATE INDEX IF NOT EXISTS {n} ON {t} ({f})".format(
+            n="_".join(["idx", table] + fields),
+            t=table,
+            f=", ".join(fields)))
+
+def get_content(record):
+    """
+    Returns the provided record serialized with sorted keys and the sha1 hash
+    of the serialization.
+    """
+
+    data = json.dumps(record, sort_keys=True)
+    return hashlib.sha1(data.encode("utf-8")).hexdigest(), data
+
+def get_staging_row(table, record):
+    """
+    Returns the provided record as a tuple of the provided staging table's
+    columns.
+    """
+
+    columns = get_staging_table(table)[2]
+    return (tuple(record.get(name) for name, kind in columns[:-2])
+            + get_content(record))
+
+def execute_batches(connection, statement, rows, batch_size):
+    """
+    Execute the provided statement for every provided row in batches of
+    batch_size rows.
+    """
+
+    while True:
+        batch = list(itertools.islice(rows, batch_size))
+        if len(batch) == 0:
+            return
+
+        connection.executemany(statement, batch)
+
+def sync_staging_rows(connection, table, records,
+                      batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Upsert the provided records into the provided staging table and delete
+    the stored rows whose id is not in the records. A stored row is only
+    replaced when its last modified timestamp differs from the record's, or
+    when either has no timestamp, its content hash does. Returns the number
+    of inserted, updated, unchanged, and deleted rows.
+    """
+
+    id_field, modified, columns = get_staging_table(table)
+    stored = {row[0]: (row[1], row[2]) for row in connection.execute(
+        "SELECT {i}, {m}, Hash FROM {t}".format(i=id_field,
+                                                m=modified,
+                                                t=table))}
+    seen = set()
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+    def changed_rows():
+        for record in records:
+            id = record[id_field]
+            mark = record.get(modified)
+            seen.add(id)
+
+            previous = stored.get(id)
+            if (previous is not None
+                    and mark is not None
+                    and mark == previous[0]):
+                counts["unchanged"] += 1
+                continue
+
+            row = get_staging_row(table, record)
+            if previous is None:
+                counts["inserted"] += 1
+            elif row[-2] == previous[1]:
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+
+            stored[id] = (mark, row[-2])
+            yield row
+
+    execute_batches(connection,
+                    "INSERT OR REPLACE INTO {t} VALUES ({p})".format(
+                        t=table,
+                        p=", ".join("?" for column in columns)),
+                    changed_rows(),
+                    batch_size)
+
+    deleted = [(id,) for id in stored if id not in seen]
+    connection.executemany("DELETE FROM {t} WHERE {i} = ?".format(
+        t=table, i=id_field), deleted)
+    counts["deleted"] = len(deleted)
+
+    return counts
+
+def sync_staging_details(connection, query, details,
+                         batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Upsert the provided (id, detail) tuples of the provided extended query
+    into the Details table and delete the stored details of the query whose
+    id is not provided. A stored detail is only replaced when its content hash
+    differs. Returns the number of inserted, updated, unchanged, and deleted
+    details.
+    """
+
+    stored = {row[0]: row[1] for row in connection.execute(
+        "SELECT Id, Hash FROM Details WHERE Query = ?", (query,))}
+    seen = set()
+    counts = {"inserted": 0, "updated": 0, "unchanged": 0, "deleted": 0}
+
+    def changed_rows():
+        for id, detail in details:
+            seen.add(id)
+            digest, data = get_content(detail)
+
+            previous = stored.get(id)
+            if previous is None:
+                counts["inserted"] += 1
+            elif digest == previous:
+                counts["unchanged"] += 1
+                continue
+            else:
+                counts["updated"] += 1
+
+            stored[id] = digest
+            yield query, id, digest, data
+
+    execute_batches(connection,
+                    "INSERT OR REPLACE INTO Details VALUES (?, ?, ?, ?)",
+                    changed_rows(),
+                    batch_size)
+
+    deleted = [(query, id) for id in stored if id not in seen]
+    connection.executemany("DELETE FROM Details WHERE Query = ? AND Id = ?",
+                           deleted)
+    counts["deleted"] = len(deleted)
+
+    return counts
+
+def has_staging_schema(database):
+    """
+    Returns True if the provided staging database has every staging table with
+    every staging column, so that it can be updated incrementally.
+    """
+
+    connection = sqlite3.connect(str(database))
+    try:
+        for table in SIMPLE + ["EventItems", "Details"]:
+            stored = {row[1] for row in connection.execute(
+                "PRAGMA table_info({t})".format(t=table))}
+            if table == "Details":
+                expected = ["Query", "Id", "Hash", "Data"]
+            else:
+                expected = [name for name, kind in get_staging_table(table)[2]]
+            if not set(expected) <= stored:
+                return False
+    finally:
+        connection.close()
+
+    return True
+
+def find_stored_table(storage, table):
+    """
+    Returns the path of the provided simple table stored in any format and
+    compression, or None if the table is not stored. When the table is
+    stored in more than one format, i.e. after table_format was switched,
+    the most recently written copy is returned.
+    """
+
+    found = []
+    for table_format in TABLE_FORMATS:
+        for compression in stores.COMPRESSIONS:
+            if table_format == "json" and compression is not None:
+                continue
+
+            path = get_table_path(storage / table, table_format, compression)
+            if os.path.exists(path):
+                found.append(path)
+
+    if len(found) == 0:
+        return None
+
+    return max(found, key=os.path.getmtime)
+
+def get_stored_time(storage):
+    """
+    Returns the last time any simple table or extended detail batch stored in
+    the provided client storage was written or removed, as seconds since the
+    epoch, or None if nothing is stored.
+    """
+
+    # removing a batch only changes the modification time of its directory
+    paths = [find_stored_table(storage, table) for table in SIMPLE]
+    paths += list(storage.glob("*@*/*.json"))
+    paths += [path for path in storage.glob("*@*") if path.is_dir()]
+
+    times = [os.path.getmtime(path) for path in paths if path is not None]
+    if len(times) == 0:
+        return None
+
+    return max(times)
+
+def iter_stored_details(details_store):
+    """
+    Yields an (id, detail) tuple for every detail stored in the batches of the
+    provided directory. Details stored in later batches are yielded after, and
+    so replace, details stored in earlier batches.
+    """
+
+    for batch in sorted(details_store.glob("*.json")):
+        yield from stores.read_json_stream(batch)
+
+def connect_staging_db(database):
+    """
+    Returns a connection to the provided staging database that returns rows
+    that can be accessed by column name.
+    """
+
+    # enforce types
+    checks.check_types(database, [str, pathlib.Path])
+
+    connection = sqlite3.connect(str(database))
+    connection.row_factory = sqlite3.Row
+    return connection
+
+def publish_staging_db(partial, database):
+    """
+    Copy the completed partial staging database into the live staging
+    database and remove the partial database. The copy is made with the
+    SQLite backup API as a single write transaction on the live database, so
+    readers connected to it keep a consistent view. Renaming over a live WAL
+    database would instead leave its WAL and shared memory files to be
+    applied to the new file.
+    """
+
+    source = sqlite3.connect(str(partial))
+    destination = sqlite3.connect(str(database))
+    try:
+        source.backup(destination)
+        destination.execute("PRAGMA journal_mode=WAL")
+    finally:
+        destination.close()
+        source.close()
+
+    os.remove(partial)
+
+def get_body_events(database, body_id, start=None, end=None):
+    """
+    Returns the events of a body between two dates from a staging database.
+
+    Example:
+    ==========
+    ```
+        >>> events = get_body_events("/cdp/stg/seattle/staging.db", 2,
+        ...                          "2018-01-01", "2018-07-01")
+        >>> events[0]["EventDate"]
+        '2018-01-08T00:00:00'
+    ```
+
+    Parameters
+    ==========
+    database: str, pathlib.Path
+        The staging database created by create_staging_db.
+    body_id: int
+        The BodyId of the body to get the events of.
+    start: str
+        The earliest EventDate to include as an ISO date.
+    end: str
+        The date to get events before as an ISO date.
+
+    Returns
+    ==========
+    events: list
+        The stored events of the body ordered by EventDate.
+    """
+
+    # enforce types
+    checks.check_types(body_id, int)
+    checks.check_types(start, [str, type(None)])
+    checks.check_types(end, [str, type(None)])
+
+    statement = "SELECT Data FROM Events WHERE EventBodyId = ?"
+    params = [body_id]
+    if start is not None:
+        statement += " AND EventDate >= ?"
+        params.append(start)
+    if end is not None:
+        statement += " AND EventDate < ?"
+        params.append(end)
+    statement += " ORDER BY EventDate"
+
+    connection = connect_staging_db(database)
+    try:
+        return [json.loads(row["Data"])
+                for row in connection.execute(statement, params)]
+    finally:
+        connection.close()
+
+def create_staging_db(client="seattle", storage="/cdp/stg/", update=False,
+                      batch_size=DEFAULT_BATCH_SIZE, incremental=False,
+                      serializer=stores.DEFAULT_SERIALIZER,
+                      skip_unchanged=False):
+    """
+    Build an indexed SQLite staging database from the stored Legistar tables
+    of a client.
+
+    Parameters
+    ==========
+    client: str
+        The Legistar client whose stored tables should be used.
+    storage: str
+        Where the tables were stored by get_legistar_tables. The client name
+        is appended if it is not already part of the path.
+    update: bool
+        Should an already created staging database be rebuilt.
+    batch_size: int
+        How many rows are inserted with each statement.
+    incremental: bool
+        Should an already created staging database be updated in place with
+        only the rows that changed since it was last built instead of being
+        rebuilt. Implies update. A database created without the content hash
+        columns is rebuilt.
+    serializer: str, cdptools.utils.stores.Serializer
+        Which json serializer to read ndjson tables with, "json" or "orjson".
+        Content hashes are always computed with the json module so they do
+        not depend on the serializer.
+    skip_unchanged: bool
+        Should an already created staging database be left untouched when it
+        was built after every stored table and detail batch was last written.
+        Tables stored with skip_unchanged keep their modification time when a
+        pull finds them unchanged.
+
+    Returns
+    ==========
+    database: pathlib.Path
+        The path of the staging database.
+
+    Usage
+    ==========
+    Every simple table is stored in a table of the same name with its id as
+    the primary key, its last modified timestamp, the columns listed in
+    COLUMNS, the content hash of the row, and the whole row as json in Data.
+    The EventItems of every stored Events detail are stored in EventItems and
+    every stored detail in Details. Rows are bulk inserted in one transaction
+    per table. A full build creates indexes once every row is inserted and is
+    built next to the old database and copied into it once complete with the
+    SQLite backup API, so connected readers are never left reading a file
+    that was renamed away from them. An
+    incremental update compares every stored row's last modified timestamp,
+    or content hash when there is no timestamp, to what the database holds
+    and only upserts changed rows and deletes removed rows, so its work is
+    proportional to the changes. The database is left in WAL mode so readers
+    never block on a writer.
+    """
+
     # ensure param types
     checks.check_types(client, [str])
-    checks.check_types(storage, [str])
+    checks.check_types(storage, [str, pathlib.Path])
     checks.check_types(update, [bool])
+    checks.check_types(batch_size, [int])
+    checks.check_types(incremental, [bool])
+    checks.check_types(skip_unchanged, [bool])
+    serializer = stores.get_json_serializer(serializer)
 
     client = client.lower()
     if isinstance(storage, str):
@@ -11,18 +454,129 @@ def create_staging_db(client="seattle", storage="/cdp/stg/", update=False):
     if client not in str(storage):
         storage /= client
 
+    database = storage / STAGING_DB
+    exists = os.path.exists(database)
+    if exists and not (update or incremental):
+        raise FileExistsError("File exists already and overwrite is False")
+
+    # nothing to do when no input was written since the last build
+    stored_time = get_stored_time(storage)
+    if (skip_unchanged
+            and exists
+            and stored_time is not None
+            and os.path.getmtime(database) >= stored_time):
+        print("Skipped: staging database is newer than every stored table:",
+              database)
+        return database
+
+    incremental = incremental and exists and has_staging_schema(database)
+
     print("-" * 80)
-    print("Creating CDP NoSQL test/ staging database for client:", client,
-          "\nWill store completed json at:", storage,
-          "\nWill update existing json:", update)
+    print("Creating CDP SQLite staging database for client:", client,
+          "\nWill store completed database at:", database,
+          "\nWill update existing database:", update or incremental,
+          "\nWill only upsert changed rows:", incremental)
     print("-" * 80)
 
-    for file in os.listdir(storage):
-        print(file)
+    # build next to the old database so a failed build never replaces it
+    target = database
+    if not incremental:
+        target = database.with_name(database.name + ".partial")
+        if os.path.exists(target):
+            os.remove(target)
+
+    connection = sqlite3.connect(str(target), isolation_level=None)
+    try:
+        # the partial database has no readers, the live one is published in
+        # WAL mode
+        if incremental:
+            connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+
+        for table in SIMPLE + ["EventItems"]:
+            create_staging_table(connection, table)
+        connection.execute(DETAILS_TABLE)
+
+        def report(name, counts, start):
+            print("Synced:", name,
+                  "inserted:", counts["inserted"],
+                  "updated:", counts["updated"],
+                  "unchanged:", counts["unchanged"],
+                  "deleted:", counts["deleted"],
+                  "seconds:", round(time.perf_counter() - start, 2))
+
+        # simple tables
+        for table in SIMPLE:
+            start = time.perf_counter()
+            stored_table = find_stored_table(storage, table)
+            if stored_table is None:
+                print("Skipped:", table, "table is not stored")
+                continue
 
-    # TODO:
-    # process tables into NoSQL schema
+            connection.execute("BEGIN")
+            counts = sync_staging_rows(connection,
+                                       table,
+                                       stores.read_records(stored_table,
+                                                           serializer),
+                                       batch_size)
+            connection.execute("COMMIT")
+            report(table, counts, start)
+
+        # extended details
+        for details_store in sorted(storage.glob("*@*")):
+            if not os.path.isdir(details_store):
+                continue
+
+            start = time.perf_counter()
+            query = details_store.name
+
+            connection.execute("BEGIN")
+            counts = sync_staging_details(connection,
+                                          query,
+                                          iter_stored_details(details_store),
+                                          batch_size)
+            connection.execute("COMMIT")
+            report(query, counts, start)
+
+            if query == EVENT_DETAILS:
+                start = time.perf_counter()
+                items = (item
+                         for id, detail in iter_stored_details(details_store)
+                         for item in detail.get("EventItems") or [])
+
+                connection.execute("BEGIN")
+                counts = sync_staging_rows(connection,
+                                           "EventItems",
+                                           items,
+                                           batch_size)
+                connection.execute("COMMIT")
+                report("EventItems", counts, start)
+
+        # indexes are cheaper to build once than to maintain on every insert
+        for table in INDEXES:
+            create_staging_indexes(connection, table)
+        if incremental:
+            connection.execute("PRAGMA optimize")
+        else:
+            connection.execute("ANALYZE")
+
+    except BaseException:
+        if connection.in_transaction:
+            connection.execute("ROLLBACK")
+        connection.close()
+        if not incremental:
+            os.remove(target)
+        raise
+
+    connection.close()
+    if not incremental:
+        publish_staging_db(target, database)
+
+    # an update that changed no rows still counts as built from the inputs
+    os.utime(database)
 
     print("-" * 80)
-    print("CDP NoSQL test/ staging database complete")
+    print("CDP SQLite staging database complete")
     print("-" * 80)
+
+    return database
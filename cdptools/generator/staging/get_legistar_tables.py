@@ -1,10 +1,16 @@
+from cdptools.processor.io.pipelines.legistarpipe import LEGISTAR_HOST
 from cdptools.processor.io.pipelines import LegistarPipe
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from cdptools.utils import checkpoints
 from cdptools.utils import checks
 from cdptools.utils import stores
+import itertools
 import requests
 import pathlib
 import json
+import time
 import os
+import re
 
 SIMPLE = ["Actions",
           "Bodies",
@@ -22,7 +28,7 @@ FORMATTING = {"Actions": "ActionId",
               "Matters": "MatterId"}
 EXTENDED = ["Actions/{ActionId}",
             "Bodies/{BodyId}",
-            "Bodies/{BodyTypeId}",
+            "BodyTypes/{BodyTypeId}",
             "CodeSections/{CodeSectionId}",
             "EventDates/{BodyId}?FutureDatesOnly=True",
             "Events/{EventId}?\
@@ -32,22 +38,426 @@ EXTENDED = ["Actions/{ActionId}",
                 &EventItemAttachments=1",
             "Indexes/{IndexId}",
             "Matters/{MatterId}"]
+MODIFIED = "{prefix}LastModifiedUtc"
+DELTA_FILTER = "{field} gt datetime'{mark}'"
+WATERMARKS = "watermarks"
+CHECKPOINTS = ".checkpoints"
+TABLE_FORMATS = ["json", "ndjson"]
+BATCH = "{number:06d}"
+DEFAULT_WORKERS = 4
+DEFAULT_DETAIL_WORKERS = 8
+DEFAULT_BATCH_SIZE = 500
 
-# TODO:
-# instead of always getting tables
-# check if they are in the storage dir provided
-# if so: load from there
+def is_fresh(store_path, max_age=None):
+    """
+    Returns True if a file is stored at the provided path and was last written,
+    or found unchanged by a skip_unchanged write, at most max_age seconds ago.
+    Nothing is fresh when max_age is None.
+    """
+
+    if max_age is None or not os.path.exists(store_path):
+        return False
+
+    return time.time() - stores.get_checked_time(store_path) <= max_age
+
+def get_modified_field(table):
+    """
+    Returns the name of the last modified field of the provided simple table,
+    i.e. "MatterLastModifiedUtc" for "Matters".
+    """
+
+    return MODIFIED.format(prefix=FORMATTING[table][:-len("Id")])
 
-def get_legistar_tables(client="seattle", storage="/cdp/stg/", update=False):
+def iter_merged_table(stored, changed, id_field):
+    """
+    Yields the rows of the stored table one at a time with every changed row
+    replacing the stored row with the same id, followed by the changed rows
+    that were not stored before. Only the changed rows are held in memory.
     """
 
+    changed = {row[id_field]: row for row in changed}
+    for row in stored:
+        yield changed.pop(row[id_field], row)
+
+    yield from changed.values()
+
+def get_table_path(table_store, table_format="json", compression=None):
+    """
+    Returns the path the simple table stored at the provided path without a
+    suffix is stored at in the provided format and compression.
+    """
+
+    if table_format == "ndjson":
+        return stores.get_ndjson_path(table_store, compression)
+
+    return table_store.with_suffix(".json")
+
+def track_table(table, records, tracked, in_memory=True):
+    """
+    Yields the provided records unchanged while recording the first record,
+    the number of records, the ids of the records, and the high water mark of
+    the table in the tracked dict. When in_memory is True the records are also
+    collected in tracked["rows"].
+    """
+
+    field = get_modified_field(table)
+    id_field = FORMATTING[table]
+    tracked.update({"first": None, "count": 0, "mark": None, "ids": []})
+    if in_memory:
+        tracked["rows"] = []
+
+    for record in records:
+        if tracked["first"] is None:
+            tracked["first"] = record
+        tracked["count"] += 1
+        tracked["ids"].append(record[id_field])
+
+        mark = record.get(field)
+        if mark is not None and (tracked["mark"] is None
+                                 or mark > tracked["mark"]):
+            tracked["mark"] = mark
+
+        if in_memory:
+            tracked["rows"].append(record)
+
+        yield record
+
+def get_parent_table(query):
+    """
+    Returns the simple table and id field the provided extended query is
+    formatted with, i.e. ("Bodies", "BodyId") for
+    "EventDates/{BodyId}?FutureDatesOnly=True".
+    """
+
+    id_field = re.search(r"{(\w+)}", query).group(1)
+    for table, field in FORMATTING.items():
+        if field == id_field:
+            return table, id_field
+
+    raise KeyError("No simple table has the id field: " + id_field)
+
+def get_details_name(query):
+    """
+    Returns the storage name of the provided extended query, i.e.
+    "Events@EventId" for "Events/{EventId}?EventItems=1".
+    """
+
+    name = query.replace(" ", "").split("?")[0]
+    return re.sub(r"[{}]", "", name).replace("/", "@")
+
+def load_stored_details(details_store, in_memory=True):
+    """
+    Returns a dictionary of the set of ids stored in every detail batch in the
+    provided directory keyed by batch path in batch order, and when in_memory
+    is True every stored detail keyed by id. Details stored in later batches
+    replace details stored in earlier batches.
+    """
+
+    batch_ids = {}
+    details = {}
+    for batch in sorted(details_store.glob("*.json")):
+        batch_ids[batch] = set()
+        for id, detail in stores.read_json_stream(batch):
+            batch_ids[batch].add(id)
+            if in_memory:
+                details[id] = detail
+
+    return batch_ids, details
+
+def pull_legistar_details(pipe, query, ids, storage, update=False,
+                          refetch=None, in_memory=True,
+                          workers=DEFAULT_DETAIL_WORKERS,
+                          batch_size=DEFAULT_BATCH_SIZE, checkpoint=None,
+                          max_age=None, serializer=stores.DEFAULT_SERIALIZER,
+                          skip_unchanged=False):
+    """
+    Request an extended query for every provided id and store the responses
+    in batches.
+
+    Parameters
+    ==========
+    pipe: cdptools.processor.io.pipelines.LegistarPipe
+        The pipe to request the details with.
+    query: str
+        The extended query to format with every id, i.e. "Matters/{MatterId}".
+    ids: list
+        The ids of the parent table to request details for.
+    storage: pathlib.Path
+        The client storage directory. Details are stored in a directory named
+        by get_details_name below it, as json batches of details keyed by id.
+    update: bool
+        Should details that are already stored be requested again. Batches
+        stored before the pull are removed once it completes.
+    refetch: list
+        Ids whose details should be requested again even if they are stored,
+        i.e. the ids of rows modified since the last pull.
+    in_memory: bool
+        Should every stored detail be returned.
+    workers: int
+        How many details should be requested at the same time.
+    batch_size: int
+        How many details are stored in each batch.
+    checkpoint: cdptools.utils.checkpoints.Checkpoint
+        Where the ids of every stored batch are recorded. Ids recorded by an
+        interrupted pull are not requested again, even with update, and the
+        checkpoint is cleared once the pull completes.
+    max_age: int, float
+        How many seconds old a batch may be for its details to be kept with
+        update. Details in older batches are requested again.
+    serializer: str, cdptools.utils.stores.Serializer
+        Which json serializer to store the batches with, "json" or "orjson".
+    skip_unchanged: bool
+        Should an old batch be kept with update instead of storing the batch
+        replacing it when both are identical, so that unchanged batches keep
+        their modification time.
+
+    Returns
+    ==========
+    results: dict, pathlib.Path
+        Every stored detail keyed by id when in_memory is True, otherwise the
+        details directory.
+    """
+
+    # enforce types
+    checks.check_types(query, [str])
+    checks.check_types(ids, [list])
+    checks.check_types(refetch, [list, type(None)])
+    checks.check_types(workers, [int])
+    checks.check_types(batch_size, [int])
+    checks.check_types(checkpoint, [checkpoints.Checkpoint, type(None)])
+    checks.check_types(max_age, [int, float, type(None)])
+    checks.check_types(skip_unchanged, [bool])
+
+    serializer = stores.get_json_serializer(serializer)
+    query = query.replace(" ", "")
+    id_field = get_parent_table(query)[1]
+    details_store = storage / get_details_name(query)
+    if not os.path.isdir(details_store):
+        os.makedirs(details_store)
+
+    batch_ids, details = load_stored_details(details_store, in_memory)
+    old_batches = list(batch_ids.keys())
+    number = 0
+    if len(old_batches) > 0:
+        number = int(old_batches[-1].stem) + 1
+
+    # ids stored by an interrupted pull are not requested again, and the
+    # batches it stored are not old batches
+    done = set()
+    if checkpoint is not None:
+        done = checkpoint.ids
+        old_batches = [old_batch for old_batch in old_batches
+                       if int(old_batch.stem) not in checkpoint.batches]
+
+    # with update only the batches stored within max_age are kept
+    if update:
+        kept = [old_batch for old_batch in old_batches
+                if is_fresh(old_batch, max_age)]
+        old_batches = [old_batch for old_batch in old_batches
+                       if old_batch not in kept]
+    else:
+        kept = old_batches
+
+    stored_ids = set()
+    for batch in kept:
+        stored_ids.update(batch_ids[batch])
+
+    refetch = set(str(id) for id in (refetch if refetch is not None else []))
+
+    pending = [id for id in ids
+               if str(id) not in done
+               and (str(id) not in stored_ids or str(id) in refetch)]
+    print("Pulling:", query, "details:", len(pending),
+          "already stored:", len(ids) - len(pending))
+
+    queries = (query.format(**{id_field: id}) for id in pending)
+    responses = pipe.iter_legistar_details(queries, workers)
+
+    # new batches are matched by digest against the old batches they replace,
+    # only old batches stored after every batch that is not replaced can be
+    # kept so that later batches still replace earlier ones
+    reusable = {}
+    if update and skip_unchanged:
+        last = max([int(batch.stem) for batch in batch_ids
+                    if batch not in old_batches], default=-1)
+        reusable = {stores.read_digest(old_batch): old_batch
+                    for old_batch in old_batches
+                    if int(old_batch.stem) > last}
+        reusable.pop(None, None)
+    reused = []
+
+    def store_batch(batch, number):
+        old_batch = None
+        if len(reusable) > 0:
+            digest = stores.get_digest(batch, serializer)
+            old_batch = reusable.pop(digest, None)
+
+        if old_batch is not None and stores.is_unchanged(old_batch, digest):
+            reused.append(old_batch)
+            number = int(old_batch.stem)
+        else:
+            stores.store_json_data(batch,
+                                   details_store / BATCH.format(number=number),
+                                   serializer=serializer,
+                                   skip_unchanged=skip_unchanged)
+
+        if in_memory:
+            details.update(batch)
+        if checkpoint is not None:
+            checkpoint.record_batch(number, batch.keys())
+
+    # store every full batch as it completes so a failed pull only loses the
+    # details of the current batch
+    batch = {}
+    try:
+        for id, (_, response) in zip(pending, responses):
+            batch[str(id)] = response
+            if len(batch) >= batch_size:
+                store_batch(batch, number)
+                number += 1
+                batch = {}
+    finally:
+        if len(batch) > 0:
+            store_batch(batch, number)
+
+    # the old batches are replaced by the new batches
+    if update:
+        for old_batch in old_batches:
+            if old_batch not in reused:
+                os.remove(old_batch)
+                stores.clear_digest(old_batch)
+        if in_memory:
+            details = {str(id): details[str(id)] for id in ids
+                       if str(id) in details}
+
+    if checkpoint is not None:
+        checkpoint.clear()
+
+    print("Pulled:", query, "details:", len(pending))
+
+    if in_memory:
+        return details
+
+    return details_store
+
+def get_legistar_tables(client="seattle", storage="/cdp/stg/", update=False,
+                        delta=False, in_memory=True, host=LEGISTAR_HOST,
+                        session=None, throttle=None, workers=DEFAULT_WORKERS,
+                        detail_workers=DEFAULT_DETAIL_WORKERS,
+                        batch_size=DEFAULT_BATCH_SIZE, extended=True,
+                        resume=False, table_format="json",
+                        compression=None, max_age=None,
+                        serializer=stores.DEFAULT_SERIALIZER,
+                        skip_unchanged=False):
+    """
+    Pull the Legistar tables of a client and store them as json or newline
+    delimited json.
+
+    Parameters
+    ==========
+    client: str
+        The Legistar client to pull tables from.
+    storage: str
+        Where the tables should be stored. The client name is appended if it is
+        not already part of the path.
+    update: bool
+        Should already stored tables be overwritten.
+    delta: bool
+        Should the simple tables only be pulled for rows modified since the
+        last pull. The latest last modified timestamp of every simple table is
+        always stored in watermarks.json and with delta changed rows are merged
+        into the stored table. Tables without a stored copy or a watermark,
+        i.e. empty tables, are pulled whole and replace their stored copy.
+    in_memory: bool
+        Should the simple tables be held in memory and returned. When False
+        every fully pulled table is written to storage page by page as it
+        arrives and only the current page is held in memory.
+    host: str
+        The scheme and host of the Legistar API, i.e. a local stand-in server.
+    session: requests.Session
+        A pooled HTTP session to make requests with. Defaults to the shared
+        session from cdptools.utils.sessions.
+    throttle: cdptools.utils.throttles.Throttle
+        The rate, concurrency, and retry policy requests are made with.
+    workers: int
+        How many simple tables should be pulled at the same time. Every table
+        is stored as soon as it completes and the seconds each table took are
+        printed once all of them complete.
+    detail_workers: int
+        How many extended queries should be requested at the same time. Every
+        extended query is requested for every id of its parent table and ids
+        whose details are already stored are skipped unless update is True or
+        their row was modified since the last delta pull.
+    batch_size: int
+        How many extended query responses are stored in each batch file.
+    extended: bool
+        Should the extended queries be pulled at all.
+    resume: bool
+        Should the progress of every full table pull and extended query be
+        checkpointed in the .checkpoints directory of storage, and should the
+        checkpoints left by an interrupted pull be continued from instead of
+        starting over. Checkpoints are removed as their table is stored, and
+        without update or delta stored tables without a checkpoint are loaded
+        instead of pulled.
+    table_format: str
+        How the simple tables should be stored, "json" for a single json list
+        or "ndjson" for newline delimited json with one row per line that can
+        be read back a row at a time with cdptools.utils.stores.read_records.
+    compression: str
+        How ndjson tables should be compressed, "gzip", "zstd" (requires the
+        zstandard package), or None.
+    max_age: int, float
+        How many seconds old a stored table may be to be loaded from storage
+        instead of pulled. Missing and older tables are pulled and overwrite
+        the stored table. With update, extended details stored within max_age
+        are kept and older details are requested again. The summary printed
+        once every simple table completes shows whether each table was
+        loaded, pulled whole, or delta pulled.
+    serializer: str, cdptools.utils.stores.Serializer
+        Which json serializer to store the tables and extended details with,
+        "json" or "orjson" (requires the orjson package). Both write plain
+        json, so tables stored with one can be read and merged with the
+        other.
+    skip_unchanged: bool
+        Should a pulled simple table, and the watermarks, be left untouched
+        when it is identical to the stored table, and an old detail batch be
+        kept with update when it is identical to the batch replacing it.
+        Unchanged tables and batches keep their modification time, so later
+        stages such as create_staging_db can skip work when none of their
+        inputs were written. The summary shows which tables were written.
+
+    Returns
+    ==========
+    results: dict
+        The pulled tables keyed by their storage name. When in_memory is False
+        the fully pulled simple tables are replaced by their stored path and
+        the extended tables by their stored directory.
     """
 
     # ensure param types
     checks.check_types(client, [str])
     checks.check_types(storage, [str])
     checks.check_types(update, [bool])
+    checks.check_types(delta, [bool])
+    checks.check_types(in_memory, [bool])
+    checks.check_types(host, [str])
+    checks.check_types(workers, [int])
+    checks.check_types(detail_workers, [int])
+    checks.check_types(batch_size, [int])
+    checks.check_types(extended, [bool])
+    checks.check_types(resume, [bool])
+    checks.check_types(table_format, [str])
+    checks.check_types(compression, [str, type(None)])
+    checks.check_types(max_age, [int, float, type(None)])
+    checks.check_types(skip_unchanged, [bool])
+    if table_format not in TABLE_FORMATS:
+        raise ValueError("Unknown table format: {f}".format(f=table_format))
+    if compression not in stores.COMPRESSIONS:
+        raise ValueError("Unknown compression: {c}".format(c=compression))
+    if compression is not None and table_format != "ndjson":
+        raise ValueError("Only ndjson tables can be compressed")
     checks.check_string(client, "^[a-zA-Z]+$")
+    serializer = stores.get_json_serializer(serializer)
 
     # ensure client
     client = client.lower()
@@ -64,52 +474,207 @@ def get_legistar_tables(client="seattle", storage="/cdp/stg/", update=False):
     print("-" * 80)
     print("Pulling Legistar tables from client:", client,
           "\nWill store tables and completed database at:", storage,
-          "\nWill update existing tables:", update)
+          "\nWill update existing tables:", update,
+          "\nWill only pull modified rows:", delta,
+          "\nWill pull tables at the same time:", workers,
+          "\nWill resume from checkpoints:", resume,
+          "\nWill store tables as:", table_format, compression or "",
+          "\nWill serialize tables with:", serializer.name,
+          "\nWill skip writing unchanged tables:", skip_unchanged,
+          "\nWill load tables stored within seconds:", max_age)
     print("-" * 80)
 
     # setting up table queries
-    pipe = LegistarPipe(client)
+    pipe = LegistarPipe(client,
+                        session=session,
+                        throttle=throttle,
+                        host=host)
 
-    # simple tables
-    results = {}
-    for query in SIMPLE:
+    # load the last pulled timestamps
+    watermarks_store = storage / (WATERMARKS + ".json")
+    watermarks = {}
+    if os.path.exists(watermarks_store):
+        with open(watermarks_store, "r") as watermarks_file:
+            watermarks = json.load(watermarks_file)
+
+    def pull_table(query):
+        start = time.perf_counter()
         formatted_query = query.replace(" ", "")
         request = "v1/{c}/{q}".format(c=client, q=formatted_query)
+        table_store = storage / formatted_query
+        stored_table = get_table_path(table_store, table_format, compression)
+        tracked = {"written": False}
+
+        def store_table(records, overwrite):
+            if table_format == "ndjson" and skip_unchanged:
+                stored, tracked["written"] = (
+                    stores.store_ndjson_stream_if_changed(
+                        records,
+                        table_store,
+                        overwrite,
+                        compression=compression,
+                        serializer=serializer))
+            elif table_format == "ndjson":
+                stored = stores.store_ndjson_stream(records,
+                                                    table_store,
+                                                    overwrite,
+                                                    compression=compression,
+                                                    serializer=serializer)
+                tracked["written"] = True
+            elif skip_unchanged:
+                stored, tracked["written"] = (
+                    stores.store_json_stream_if_changed(
+                        records,
+                        table_store,
+                        overwrite,
+                        serializer=serializer))
+            else:
+                stored = stores.store_json_stream(records,
+                                                  table_store,
+                                                  overwrite,
+                                                  serializer=serializer)
+                tracked["written"] = True
+
+            return stored
+
+        # a resumed pull keeps the tables an interrupted pull already stored
+        resumed = (resume
+                   and not update
+                   and not delta
+                   and os.path.exists(stored_table)
+                   and not os.path.exists(storage
+                                          / CHECKPOINTS
+                                          / formatted_query
+                                          / checkpoints.MANIFEST))
+
+        # load tables stored within max_age instead of pulling them
+        if is_fresh(stored_table, max_age) or resumed:
+            records = stores.read_records(stored_table, serializer)
+            for record in track_table(query, records, tracked, in_memory):
+                pass
+
+            response = stored_table
+            if in_memory:
+                response = tracked["rows"]
+            tracked["source"] = "local"
+            print("Loaded:", stored_table, "rows:", tracked["count"])
+
+        # only ask for rows modified since the last pull when there is a
+        # stored table to merge them into
+        elif delta and query in watermarks and os.path.exists(stored_table):
+            field = get_modified_field(query)
+            delta_filter = DELTA_FILTER.format(field=field,
+                                               mark=watermarks[query])
+            changed = pipe.get_legistar_object(formatted_query,
+                                               pages="all",
+                                               filter=delta_filter)
+
+            # merge the changed rows into the stored rows as they are read
+            stored = stores.read_records(stored_table, serializer)
+            records = iter_merged_table(stored, changed, FORMATTING[query])
+            response = store_table(track_table(query,
+                                               records,
+                                               tracked,
+                                               in_memory),
+                                   True)
+            if in_memory:
+                response = tracked["rows"]
+            tracked["changed"] = [row[FORMATTING[query]] for row in changed]
+            tracked["source"] = "delta"
+            print("Pulled:", request, "modified rows:", len(changed))
+
+        # stream every page straight to storage as it arrives
+        else:
+            if resume:
+                checkpoint = checkpoints.Checkpoint(storage
+                                                    / CHECKPOINTS
+                                                    / formatted_query)
+                pages = checkpoint.resume_pages(
+                    lambda begin: pipe.iter_legistar_object(formatted_query,
+                                                            begin=begin,
+                                                            pages="all"))
+            else:
+                pages = pipe.iter_legistar_object(formatted_query,
+                                                  pages="all")
+
+            # with delta a table without a watermark replaces its stored copy
+            records = itertools.chain.from_iterable(pages)
+            response = store_table(track_table(query,
+                                               records,
+                                               tracked,
+                                               in_memory),
+                                   update or delta or max_age is not None)
+            if in_memory:
+                response = tracked["rows"]
+            if resume:
+                checkpoint.clear()
+            tracked["source"] = "pulled"
+            print("Pulled:", request, "rows:", tracked["count"])
 
-        # TODO:
-        # actual query completion
-        response = pipe.get_legistar_object(formatted_query, pages="all")
-        formatted_query = formatted_query.replace("/", "@")
-        results[formatted_query] = response
-        print("Pulled:", request)
+        tracked["response"] = response
+        tracked["seconds"] = time.perf_counter() - start
+        print("Table complete:", query,
+              "seconds:", round(tracked["seconds"], 2))
 
-        if isinstance(storage, pathlib.Path):
-            table_store = storage / formatted_query
-            stores.store_json_data(response, table_store, update)
+        return tracked
 
-    # TODO:
-    # handle empty results (CodeSections)
+    # simple tables
+    # every table is stored by its own worker as soon as it completes so the
+    # slowest table bounds the pull instead of the sum of all of them
+    pulled = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(pull_table, query): query
+                   for query in SIMPLE}
+        for future in as_completed(futures):
+            pulled[futures[future]] = future.result()
+
+    results = {}
+    for query in SIMPLE:
+        tracked = pulled[query]
+        formatted_query = query.replace(" ", "").replace("/", "@")
+        results[formatted_query] = tracked["response"]
 
-    # use the first item in each simple table to get the extended tables
-    format_attrs = {id: results[key][0][id] for key, id in FORMATTING.items()}
+        if tracked["mark"] is not None:
+            watermarks[query] = tracked["mark"]
+
+    print("-" * 80)
+    for query in sorted(SIMPLE, key=lambda q: -pulled[q]["seconds"]):
+        print("{q:<20}{p:<8}{r:>10} rows{s:>10.2f} seconds{w:>10}".format(
+            q=query,
+            p=pulled[query]["source"],
+            r=pulled[query]["count"],
+            s=pulled[query]["seconds"],
+            w="written" if pulled[query]["written"] else ""))
+    print("-" * 80)
+
+    stores.store_json_data(watermarks,
+                           watermarks_store,
+                           True,
+                           skip_unchanged=skip_unchanged)
 
     # extended tables
-    for query in EXTENDED:
-        formatted_query = query.replace(" ", "")
-        formatted_query = formatted_query.format(**format_attrs)
-        request = "v1/{c}/{q}".format(c=client, q=formatted_query)
-        request = request.replace(" ", "")
-
-        # TODO:
-        # actual query completion
-        response = {}
-        formatted_query = formatted_query.replace("/", "@")
-        results[formatted_query] = response
-        print("Pulled:", request)
-
-        if isinstance(storage, pathlib.Path):
-            table_store = storage / formatted_query
-            stores.store_json_data(response, table_store, update)
+    # every extended query is requested once for every id of its parent table
+    for query in (EXTENDED if extended else []):
+        parent, id_field = get_parent_table(query)
+        tracked = pulled[parent]
+
+        results[get_details_name(query)] = pull_legistar_details(
+            pipe,
+            query,
+            tracked["ids"],
+            storage,
+            update=update,
+            refetch=tracked.get("changed"),
+            in_memory=in_memory,
+            workers=detail_workers,
+            batch_size=batch_size,
+            checkpoint=(checkpoints.Checkpoint(storage
+                                               / CHECKPOINTS
+                                               / get_details_name(query))
+                        if resume else None),
+            max_age=max_age,
+            serializer=serializer,
+            skip_unchanged=skip_unchanged)
 
     # end process
     print("-" * 80)
@@ -0,0 +1,175 @@
+from cdptools.processor.io.pipelines.legistarpipe import LEGISTAR_HOST
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from .get_legistar_tables import get_legistar_tables
+from .get_legistar_tables import DEFAULT_WORKERS as DEFAULT_TABLE_WORKERS
+from cdptools.utils import throttles
+from cdptools.utils import sessions
+from cdptools.utils import checks
+import time
+
+DEFAULT_HOST_CONNECTIONS = 8
+DEFAULT_HOST_RATE = 10
+
+def harvest_legistar_clients(clients,
+                             storage="/cdp/stg/",
+                             update=False,
+                             delta=False,
+                             workers=None,
+                             table_workers=DEFAULT_TABLE_WORKERS,
+                             extended=True,
+                             resume=False,
+                             table_format="json",
+                             compression=None,
+                             max_age=None,
+                             serializer="json",
+                             skip_unchanged=False,
+                             host=LEGISTAR_HOST,
+                             host_connections=DEFAULT_HOST_CONNECTIONS,
+                             host_rate=DEFAULT_HOST_RATE):
+    """
+    Pull and store the Legistar tables of many clients concurrently.
+
+    Example:
+    ==========
+    ```
+        >>> report = harvest_legistar_clients(["seattle", "boston"],
+        ...                                   "/cdp/stg/")
+        >>> report["seattle"]["status"]
+        'complete'
+        >>> report["boston"]["status"]
+        'failed'
+        >>> report["boston"]["error"]
+        'Something went wrong with legistar get. ...'
+    ```
+
+    Parameters
+    ==========
+    clients: list
+        The Legistar clients to pull tables from.
+    storage: str
+        Where the tables should be stored. Every client is stored in its own
+        directory below storage.
+    update: bool
+        Should already stored tables be overwritten.
+    delta: bool
+        Should the simple tables only be pulled for rows modified since the
+        last pull, see get_legistar_tables.
+    workers: int
+        How many clients should be pulled at the same time. Defaults to one
+        worker per client.
+    table_workers: int
+        How many tables of each client should be pulled at the same time, see
+        get_legistar_tables.
+    extended: bool
+        Should the per id extended queries of every client be pulled.
+    resume: bool
+        Should every client checkpoint its pulls and continue from the
+        checkpoints of an interrupted harvest, see get_legistar_tables.
+    table_format: str
+        How every client's simple tables should be stored, "json" or
+        "ndjson".
+    compression: str
+        How ndjson tables should be compressed, "gzip", "zstd", or None.
+    max_age: int, float
+        How many seconds old a stored table may be to be loaded from storage
+        instead of pulled, see get_legistar_tables.
+    serializer: str
+        Which json serializer every client's tables should be stored with,
+        "json" or "orjson".
+    skip_unchanged: bool
+        Should tables identical to the stored tables be left untouched, see
+        get_legistar_tables.
+    host: str
+        The scheme and host of the Legistar API.
+    host_connections: int
+        The most connections and requests in flight to the host across every
+        client.
+    host_rate: int, float
+        The most requests started each second against the host across every
+        client.
+
+    Returns
+    ==========
+    report: dict
+        Per client progress keyed by client. Every entry holds the status
+        ("complete" or "failed"), the seconds the pull took, the stored tables
+        of a completed pull, and the error of a failed pull.
+
+    Usage
+    ==========
+    Every client shares one pooled session and one Throttle so the host is
+    never sent more than the politeness limits allow no matter how many
+    clients are harvested. A failing client does not stop the others.
+    """
+
+    # enforce types
+    checks.check_types(clients, list)
+    checks.check_types(storage, str)
+    checks.check_types(workers, [int, type(None)])
+    checks.check_types(table_workers, int)
+    checks.check_types(host_connections, int)
+    for client in clients:
+        checks.check_types(client, str)
+
+    if workers is None:
+        workers = max(1, len(clients))
+
+    # one pool and one politeness limit for the host shared by every client
+    session = sessions.create_session(host_connections=host_connections)
+    throttle = throttles.Throttle(rate=host_rate, maximum=host_connections)
+
+    def harvest(client):
+        start = time.perf_counter()
+        print("Harvest started:", client)
+        tables = get_legistar_tables(client,
+                                     storage,
+                                     update=update,
+                                     delta=delta,
+                                     in_memory=False,
+                                     host=host,
+                                     session=session,
+                                     throttle=throttle,
+                                     workers=table_workers,
+                                     extended=extended,
+                                     resume=resume,
+                                     table_format=table_format,
+                                     compression=compression,
+                                     max_age=max_age,
+                                     serializer=serializer,
+                                     skip_unchanged=skip_unchanged)
+
+        return {"status": "complete",
+                "seconds": time.perf_counter() - start,
+                "tables": sorted(tables.keys()),
+                "error": None}
+
+    report = {}
+    starts = {}
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {}
+        for client in clients:
+            starts[client] = time.perf_counter()
+            futures[executor.submit(harvest, client)] = client
+
+        for future in as_completed(futures):
+            client = futures[future]
+            try:
+                report[client] = future.result()
+                print("Harvest complete:", client,
+                      "seconds:", round(report[client]["seconds"], 2))
+
+            # isolate the failure to the client
+            except Exception as e:
+                report[client] = {"status": "failed",
+                                  "seconds": (time.perf_counter()
+                                              - starts[client]),
+                                  "tables": [],
+                                  "error": str(e).strip()}
+                print("Harvest failed:", client, "error:", repr(e))
+
+    print("-" * 80)
+    print("Harvest of", len(clients), "clients complete.",
+          "Failed:", [c for c in clients if report[c]["status"] == "failed"])
+    print("-" * 80)
+
+    return report
@@ -1,12 +1,14 @@
 from cdptools.utils import checks
+from cdptools.utils import sessions
 import requests
+import sys
 
-def get_legistar_object(city, query="Bodies", begin=0, pages=1):
+def get_legistar_object(city, query="Bodies", begin=0, pages=1, session=None):
     """
     Parameters
     ----------
-    self: LegistarPipe
-        The LegistarPipe that stores which city to query data for.
+    city: str
+        A Legistar supported city to query against.
     query: str
         Which type of data to query for.
         (Default: "Bodies")
@@ -17,6 +19,9 @@ def get_legistar_object(city, query="Bodies", begin=0, pages=1):
         Due to the paging style return of the legistar api, how many pages
         should be returned from the request. Pass "all" to return all pages.
         (Default: 1)
+    session: requests.Session
+        A pooled HTTP session to make requests with.
+        (Default: the shared session from cdptools.utils.sessions)
 
     Output
     ----------
@@ -47,10 +52,21 @@ get_legistar_object requires the "pages" parameter to be an integer or string
     "all" to complete.
 """ + err_footer
 
-    check_types(city, [str], check_city_err)
-    check_types(query, [str], check_query_err)
-    check_types(begin, [int], check_begin_err)
-    check_types(pages, [int, str], check_pages_err)
+    check_session_err = """
+get_legistar_object requires the "session" parameter to be a requests.Session
+    or None to complete.
+""" + err_footer
+
+    checks.check_types(city, [str], check_city_err)
+    checks.check_types(query, [str], check_query_err)
+    checks.check_types(begin, [int], check_begin_err)
+    checks.check_types(pages, [int, str], check_pages_err)
+    checks.check_types(session,
+                       [requests.Session, type(None)],
+                       check_session_err)
+
+    if session is None:
+        session = sessions.get_shared_session()
 
     url = "http://webapi.legistar.com/v1/{c}/{q}?$skip={s}"
     results = []
@@ -61,7 +77,7 @@ get_legistar_object requires the "pages" parameter to be an integer or string
     process = range(begin, begin + (pages*1000), 1000)
     for skip in process:
         try:
-            r = requests.get(url.format(c=self.city, q=query, s=skip))
+            r = session.get(url.format(c=city, q=query, s=skip))
 
             if r.status_code == 200:
                 results += r.json()
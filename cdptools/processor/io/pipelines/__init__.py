@@ -1,3 +1,4 @@
 from .bodypipe import BodyPipe
 from .videopipe import VideoPipe
 from .legistarpipe import LegistarPipe
+from .asynclegistarpipe import AsyncLegistarPipe, AsyncBodyPipe
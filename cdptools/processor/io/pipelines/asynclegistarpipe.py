@@ -0,0 +1,469 @@
+from .legistarpipe import *
+import concurrent.futures
+import asyncio
+
+CHECK_EXECUTOR_ERR = """
+AsyncLegistarPipe requires the "executor" parameter to be a
+    concurrent.futures.Executor or None to initialize.
+"""
+
+SYNC_ONLY_ERR = """
+AsyncLegistarPipe does not support {method}, its tables are requested once by
+    awaiting their properties and reset with update. Use {alternative}
+    instead.
+"""
+
+class AsyncLegistarPipe(LegistarPipe):
+    """
+    Extends
+    ---------
+    cdp.io.pipelines.LegistarPipe
+
+    Parameters
+    ----------
+    city: str
+        A Legistar supported city to query against.
+    session: requests.Session
+        A pooled HTTP session to make requests with.
+    cache: cdptools.utils.caches.ResponseCache, SharedCache
+        Where successful page responses are stored and served from.
+    throttle: cdptools.utils.throttles.Throttle
+        The rate, concurrency, and retry policy requests are made with.
+    host: str
+        The scheme and host of the Legistar API.
+    executor: concurrent.futures.Executor
+        Where the blocking page requests are run so that the event loop is free
+        to schedule other work. When not provided the event loop's default
+        executor is used.
+
+    Usage
+    ----------
+    Counterpart to LegistarPipe for use inside of an asyncio event loop.
+    get_legistar_object is awaitable and every page request runs in the
+    executor, so many queries, tables, and cities can be gathered on one loop.
+    """
+
+    def __init__(self, city, session=None, cache=None, throttle=None,
+                 host=LEGISTAR_HOST, executor=None):
+        """
+        Parameters
+        ----------
+        city: str
+            A Legistar supported city to query against.
+        session: requests.Session
+            A pooled HTTP session to make requests with.
+            (Default: the shared session)
+        cache: cdptools.utils.caches.ResponseCache, SharedCache
+            Where successful page responses are stored and served from.
+            (Default: None, every page is requested)
+        throttle: cdptools.utils.throttles.Throttle
+            The rate, concurrency, and retry policy requests are made with.
+            (Default: None, requests are not limited or retried)
+        host: str
+            The scheme and host of the Legistar API.
+            (Default: LEGISTAR_HOST)
+        executor: concurrent.futures.Executor
+            Where the blocking page requests are run.
+            (Default: the event loop's default executor)
+        """
+
+        checks.check_types(executor,
+                           [concurrent.futures.Executor, type(None)],
+                           CHECK_EXECUTOR_ERR)
+        self.executor = executor
+
+        super().__init__(city, session, cache, throttle, host)
+
+    async def get_legistar_object(self, query="Bodies", begin=0, pages=1,
+                                  workers=1, select=None, filter=None,
+                                  orderby=None, top=None, use_cache=True):
+        """
+        Parameters
+        ----------
+        self: AsyncLegistarPipe
+            The AsyncLegistarPipe that stores which city to query data for.
+        query: str
+            Which type of data to query for.
+            (Default: "Bodies")
+        begin: int
+            What index should the results start from.
+            (Default: 0)
+        pages: int, str
+            Due to the paging style return of the legistar api, how many pages
+            should be returned from the request. Pass "all" to return all pages.
+            (Default: 1)
+        workers: int
+            How many pages should be requested at the same time. Pages are
+            requested in windows of this size and the first short page in a
+            window ends the query. When the AsyncLegistarPipe has a throttle
+            the window is further limited by the throttle's concurrency limit.
+            (Default: 1)
+        select: str, list
+            Which fields the Legistar API should return for each object as an
+            OData $select expression or a list of field names, i.e.
+            ["BodyId", "BodyName"].
+            (Default: None, all fields)
+        filter: str
+            An OData $filter expression the Legistar API should apply before
+            paging, i.e. "MatterLastModifiedUtc gt datetime'2018-01-01'".
+            (Default: None)
+        orderby: str
+            An OData $orderby expression the Legistar API should sort by before
+            paging, i.e. "EventDate desc".
+            (Default: None)
+        top: int
+            The maximum number of objects to return. The final page request
+            is trimmed with $top so no extra objects are downloaded.
+            (Default: None, no limit beyond pages)
+        use_cache: bool
+            Should pages be served from the AsyncLegistarPipe's cache. When
+            False every page is requested and the cache is updated with the
+            response.
+            (Default: True)
+
+        Output
+        ----------
+        Returns the json object found from the successful query in page order.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        results = []
+        async for page in self.iter_legistar_object(query,
+                                                    begin,
+                                                    pages,
+                                                    workers,
+                                                    select,
+                                                    filter,
+                                                    orderby,
+                                                    top,
+                                                    use_cache):
+            results += page
+
+        print("Objects returned:", len(results))
+        return results
+
+    async def iter_legistar_object(self, query="Bodies", begin=0, pages=1,
+                                   workers=1, select=None, filter=None,
+                                   orderby=None, top=None, use_cache=True):
+        """
+        Parameters
+        ----------
+        self: AsyncLegistarPipe
+            The AsyncLegistarPipe that stores which city to query data for.
+        query: str
+            Which type of data to query for.
+            (Default: "Bodies")
+        begin: int
+            What index should the results start from.
+            (Default: 0)
+        pages: int, str
+            Due to the paging style return of the legistar api, how many pages
+            should be returned from the request. Pass "all" to return all pages.
+            (Default: 1)
+        workers: int
+            How many pages should be requested at the same time. Pages are
+            requested in windows of this size and the first short page in a
+            window ends the query. When the AsyncLegistarPipe has a throttle
+            the window is further limited by the throttle's concurrency limit.
+            (Default: 1)
+        select: str, list
+            Which fields the Legistar API should return for each object as an
+            OData $select expression or a list of field names, i.e.
+            ["BodyId", "BodyName"].
+            (Default: None, all fields)
+        filter: str
+            An OData $filter expression the Legistar API should apply before
+            paging, i.e. "MatterLastModifiedUtc gt datetime'2018-01-01'".
+            (Default: None)
+        orderby: str
+            An OData $orderby expression the Legistar API should sort by before
+            paging, i.e. "EventDate desc".
+            (Default: None)
+        top: int
+            The maximum number of objects to return. The final page request
+            is trimmed with $top so no extra objects are downloaded.
+            (Default: None, no limit beyond pages)
+        use_cache: bool
+            Should pages be served from the AsyncLegistarPipe's cache. When
+            False every page is requested and the cache is updated with the
+            response.
+            (Default: True)
+
+        Output
+        ----------
+        Asynchronously yields each page of the query as a json list in page
+        order as soon as its window arrives.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        options, process = self._plan_query(query, begin, pages, workers,
+                                            select, filter, orderby, top)
+        checks.check_types(use_cache, [bool], CHECK_USE_CACHE_ERR)
+
+        loop = asyncio.get_running_loop()
+        while True:
+            window = list(itertools.islice(process,
+                                           self._get_window_size(workers)))
+            if len(window) == 0:
+                break
+
+            # gather returns the pages in offset order regardless of which
+            # request finished first
+            window_pages = await asyncio.gather(*[
+                loop.run_in_executor(self.executor,
+                                     self._get_legistar_page,
+                                     query,
+                                     skip,
+                                     options,
+                                     size,
+                                     use_cache)
+                for skip, size in window])
+
+            for (skip, size), page in zip(window, window_pages):
+                yield page
+                if len(page) < size:
+                    return
+
+    async def get_legistar_detail(self, query):
+        """
+        Parameters
+        ----------
+        self: AsyncLegistarPipe
+            The AsyncLegistarPipe that stores which city to query data for.
+        query: str
+            Which single object to query for, including any query options,
+            i.e. "Matters/1234" or "Events/5678?EventItems=1".
+
+        Output
+        ----------
+        Returns the json object found from the successful query, requested in
+        the executor. Gather many details to request them at the same time.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor,
+                                          super().get_legistar_detail,
+                                          query)
+
+    def iter_legistar_details(self, queries, workers=1):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="iter_legistar_details",
+            alternative="asyncio.gather over get_legistar_detail"))
+
+    def prefetch(self, attrs=None):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="prefetch",
+            alternative="asyncio.gather over the awaited properties"))
+
+    def refresh(self, force=False):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="refresh",
+            alternative="update"))
+
+    def _get_source(self, attr):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="_get_source",
+            alternative="_get_table"))
+
+    def _fetch_source(self, attr, force=False, refresh=False):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="_fetch_source",
+            alternative="_get_table"))
+
+    def _get_projection(self, attr, source, **options):
+        """
+        Not supported by AsyncLegistarPipe, raises a NotImplementedError.
+        """
+
+        raise NotImplementedError(SYNC_ONLY_ERR.format(
+            method="_get_projection",
+            alternative="get_legistar_object"))
+
+    async def _get_table(self, attr, query):
+        """
+        Parameters
+        ----------
+        self: AsyncLegistarPipe
+            The AsyncLegistarPipe that stores which city to query data for.
+        attr: str
+            The updatable attribute the table is stored at.
+        query: str
+            Which table to query for.
+
+        Output
+        ----------
+        Returns the full table. The first caller schedules the query and every
+        concurrent caller awaits the same task so a table is only requested
+        once. Only the table is stored, the task is dropped once it is done so
+        a failed query is requested again by the next caller and the pipe can
+        be awaited from any later event loop. Like any request in flight, the
+        task is cancelled when the attribute is updated, and a table that
+        arrives after an update is returned but not stored.
+        """
+
+        if getattr(self, attr) is not None:
+            return getattr(self, attr)
+
+        task = self._pending.get(attr)
+        if task is None:
+            task = asyncio.ensure_future(
+                self.get_legistar_object(query, pages="all"))
+            self._pending[attr] = task
+
+        try:
+            table = await task
+        finally:
+            current = self._pending.get(attr) is task
+            if current:
+                del self._pending[attr]
+
+        if current:
+            setattr(self, attr, table)
+
+        return table
+
+CHECK_ASYNC_BODY_CITY_ERR = """
+AsyncBodyPipe requires the "city" parameter to be a string to initialize.
+"""
+
+class AsyncBodyPipe(AsyncLegistarPipe):
+    """
+    Extends
+    ---------
+    cdp.io.pipelines.AsyncLegistarPipe
+
+    Parameters
+    ----------
+    city: str
+        A Legistar supported city to query against.
+    session: requests.Session
+        A pooled HTTP session to make requests with.
+    cache: cdptools.utils.caches.ResponseCache, SharedCache
+        Where successful page responses are stored and served from.
+    throttle: cdptools.utils.throttles.Throttle
+        The rate, concurrency, and retry policy requests are made with.
+    host: str
+        The scheme and host of the Legistar API.
+    executor: concurrent.futures.Executor
+        Where the blocking page requests are run.
+
+    Usage
+    ----------
+    Counterpart to BodyPipe whose properties must be awaited.
+    ```
+        >>> pipe = AsyncBodyPipe("seattle")
+        >>> active = await pipe.active
+    ```
+    """
+
+    def __init__(self, city, session=None, cache=None, throttle=None,
+                 host=LEGISTAR_HOST, executor=None):
+        """
+        Parameters
+        ----------
+        city: str
+            A Legistar supported city to query against.
+        session: requests.Session
+            A pooled HTTP session to make requests with.
+            (Default: the shared session)
+        cache: cdptools.utils.caches.ResponseCache, SharedCache
+            Where successful page responses are stored and served from.
+            (Default: None, every page is requested)
+        throttle: cdptools.utils.throttles.Throttle
+            The rate, concurrency, and retry policy requests are made with.
+            (Default: None, requests are not limited or retried)
+        host: str
+            The scheme and host of the Legistar API.
+            (Default: LEGISTAR_HOST)
+        executor: concurrent.futures.Executor
+            Where the blocking page requests are run.
+            (Default: the event loop's default executor)
+        """
+
+        checks.check_types(city, [str], CHECK_ASYNC_BODY_CITY_ERR)
+
+        super().__init__(city, session, cache, throttle, host, executor)
+
+        self.updatable = ["_bodies",
+                          "_body_types",
+                          "_active"
+        ]
+
+        self.update()
+
+    @property
+    async def bodies(self):
+        """
+        Parameters
+        ----------
+        self: AsyncBodyPipe
+            The AsyncBodyPipe that stores which city to query data for.
+
+        Output
+        ----------
+        Returns a json object of bodies queried from the Legistar API.
+        """
+
+        return await self._get_table("_bodies", "Bodies")
+
+    @property
+    async def body_types(self):
+        """
+        Parameters
+        ----------
+        self: AsyncBodyPipe
+            The AsyncBodyPipe that stores which city to query data for.
+
+        Output
+        ----------
+        Returns a json object of body_types queried from the Legistar API.
+        """
+
+        return await self._get_table("_body_types", "BodyTypes")
+
+    @property
+    async def active(self):
+        """
+        Parameters
+        ----------
+        self: AsyncBodyPipe
+            The AsyncBodyPipe that stores which city to query data for.
+
+        Output
+        ----------
+        Returns a list of active bodies queried from the Legistar API.
+        """
+
+        # only request the active bodies when all bodies are not loaded
+        if self._active is None:
+            if self._bodies is None:
+                self._active = await self.get_legistar_object(
+                    "Bodies",
+                    pages="all",
+                    filter="BodyActiveFlag eq 1")
+            else:
+                self._active = [body for body in await self.bodies
+                                if body["BodyActiveFlag"] == 1]
+
+        return self._active
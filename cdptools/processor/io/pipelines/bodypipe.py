@@ -4,10 +4,27 @@ CHECK_CITY_ERR = """
 BodyPipe requires the "city" parameter to be a string to initialize.
 """
 
+CHECK_TTLS_ERR = """
+BodyPipe requires the "ttls" parameter to be a dictionary of table names to
+seconds or None to initialize.
+"""
+
+CHECK_PREFETCH_ERR = """
+BodyPipe requires the "prefetch" parameter to be a boolean to initialize.
+"""
+
 CHECK_SHORTENER_ERR = """
 BodyPipe requires the "name_shortener" parameter to be callable to complete.
 """
 
+def normalize_body_name(name):
+    """
+    Returns the provided body name lowercased with surrounding and repeated
+    whitespace removed so that name lookups ignore formatting differences.
+    """
+
+    return " ".join(name.lower().split())
+
 class BodyPipe(LegistarPipe):
     """
     Extends
@@ -20,9 +37,25 @@ class BodyPipe(LegistarPipe):
         A Legistar supported city to query against.
     name_shortener: function
         A custom name shortening function.
+    session: requests.Session
+        A pooled HTTP session to make requests with.
+    cache: cdptools.utils.caches.ResponseCache, SharedCache
+        Where successful page responses are stored and served from.
+    throttle: cdptools.utils.throttles.Throttle
+        The rate, concurrency, and retry policy requests are made with.
+    host: str
+        The scheme and host of the Legistar API.
+    ttls: dict
+        How many seconds the Bodies and BodyTypes tables stay fresh for
+        refresh, keyed by table name.
+    prefetch: bool
+        Should the Bodies and BodyTypes tables start downloading in the
+        background as soon as the BodyPipe is initialized.
     """
 
-    def __init__(self, city, name_shortener=None):
+    def __init__(self, city, name_shortener=None, session=None, cache=None,
+                 throttle=None, host=LEGISTAR_HOST, ttls=None,
+                 prefetch=False):
         """
         Parameters
         ----------
@@ -30,22 +63,86 @@ class BodyPipe(LegistarPipe):
             A Legistar supported city to query against.
         name_shortener: function
             A custom body name shortening function.
+        session: requests.Session
+            A pooled HTTP session to make requests with.
+            (Default: the shared session)
+        cache: cdptools.utils.caches.ResponseCache, SharedCache
+            Where successful page responses are stored and served from.
+            (Default: None, every page is requested)
+        throttle: cdptools.utils.throttles.Throttle
+            The rate, concurrency, and retry policy requests are made with.
+            (Default: None, requests are not limited or retried)
+        host: str
+            The scheme and host of the Legistar API.
+            (Default: LEGISTAR_HOST)
+        ttls: dict
+            How many seconds each table stays fresh for refresh, keyed by
+            table name, i.e. {"Bodies": 300}.
+            (Default: DEFAULT_TTL for every table)
+        prefetch: bool
+            Should the Bodies and BodyTypes tables be requested at the same
+            time in the background on initialization. Properties wait on the
+            requests in flight instead of starting their own.
+            (Default: False, tables are requested on first access)
         """
 
-        self.city = check_types(city, [str], CHECK_CITY_ERR)
-        self.shortener = check_types(name_shortener,
-                                     ['function', None],
-                                     CHECK_SHORTENER_ERR)
+        checks.check_types(city, [str], CHECK_CITY_ERR)
+        checks.check_types(host, [str], CHECK_HOST_ERR)
+        checks.check_types(cache,
+                           [caches.ResponseCache,
+                            caches.SharedCache,
+                            type(None)],
+                           CHECK_CACHE_ERR)
+        checks.check_types(throttle,
+                           [throttles.Throttle, type(None)],
+                           CHECK_THROTTLE_ERR)
+        checks.check_types(ttls, [dict, type(None)], CHECK_TTLS_ERR)
+        checks.check_types(prefetch, [bool], CHECK_PREFETCH_ERR)
+        if name_shortener is not None and not callable(name_shortener):
+            raise TypeError(CHECK_SHORTENER_ERR)
+
+        self.city = city
+        self.shortener = name_shortener
+        self.cache = cache
+        self.throttle = throttle
+        self.host = host.rstrip("/")
+        self.set_session(session)
 
         self.updatable = ["_bodies",
                           "_body_types",
                           "_active",
                           "_names",
-                          "_short_names"
+                          "_short_names",
+                          "_bodies_by_id",
+                          "_bodies_by_type",
+                          "_bodies_by_name",
+                          "_body_types_by_id",
+                          "_body_type_joins"
         ]
 
+        ttls = ttls if ttls is not None else {}
+        self.sources = {
+            "_bodies": {"query": "Bodies",
+                        "ttl": ttls.get("Bodies", DEFAULT_TTL)},
+            "_body_types": {"query": "BodyTypes",
+                            "ttl": ttls.get("BodyTypes", DEFAULT_TTL)}
+        }
+        self.dependencies = {
+            "_active": ["_bodies"],
+            "_names": ["_bodies"],
+            "_short_names": ["_bodies", "_names"],
+            "_bodies_by_id": ["_bodies"],
+            "_bodies_by_type": ["_bodies"],
+            "_bodies_by_name": ["_bodies"],
+            "_body_types_by_id": ["_body_types"],
+            "_body_type_joins": ["_bodies", "_body_types"]
+        }
+
         self.update()
 
+        if prefetch:
+            self.prefetch()
+
     @property
     def bodies(self):
         """
@@ -59,11 +156,7 @@ class BodyPipe(LegistarPipe):
         Returns a json object of bodies queried from the Legistar API.
         """
 
-        if self._bodies is None:
-            self._bodies = self.get_legistar_object("Bodies",
-                                                    pages="all")
-
-        return self._bodies
+        return self._get_source("_bodies")
 
     @property
     def body_types(self):
@@ -77,11 +170,8 @@ class BodyPipe(LegistarPipe):
         ----------
         Returns a json object of body_types queried from the Legistar API.
         """
-        if self._body_types is None:
-            self._body_types = self.get_legistar_object("BodyTypes",
-                                                        pages="all")
 
-        return self._body_types
+        return self._get_source("_body_types")
 
     @property
     def active(self):
@@ -96,11 +186,19 @@ class BodyPipe(LegistarPipe):
         Returns a list of active bodies queried from the Legistar API.
         """
 
+        # only request the active bodies when all bodies are not loaded or
+        # being prefetched
         if self._active is None:
-            self._active = list()
-            for body in self.bodies:
-                if body["BodyActiveFlag"] == 1:
-                    self._active.append(body)
+            if self._bodies is None and "_bodies" not in self._pending:
+                self._active = self._get_projection(
+                    "_active",
+                    "_bodies",
+                    filter="BodyActiveFlag eq 1")
+            else:
+                self._active = list()
+                for body in self.bodies:
+                    if body["BodyActiveFlag"] == 1:
+                        self._active.append(body)
 
         return self._active
 
@@ -117,8 +215,17 @@ class BodyPipe(LegistarPipe):
         Returns a list of body names queried from the Legistar API.
         """
 
+        # only request the name field when all bodies are not loaded or being
+        # prefetched
         if self._names is None:
-            self._names = [body["BodyName"] for body in self.bodies]
+            if self._bodies is None and "_bodies" not in self._pending:
+                bodies = self._get_projection("_names",
+                                              "_bodies",
+                                              select=["BodyName"])
+            else:
+                bodies = self.bodies
+
+            self._names = [body["BodyName"] for body in bodies]
 
         return self._names
 
@@ -144,3 +251,127 @@ class BodyPipe(LegistarPipe):
                 self._short_names = self.shortener(self.bodies)
 
         return self._short_names
+
+    def _build_body_indexes(self):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+
+        Output
+        ----------
+        Builds the BodyId, BodyTypeId, and normalized BodyName indexes of the
+        bodies in a single pass if they have not been built since the last
+        update.
+        """
+
+        if self._bodies_by_id is not None:
+            return
+
+        bodies_by_id = {}
+        bodies_by_type = {}
+        bodies_by_name = {}
+        for body in self.bodies:
+            bodies_by_id[body["BodyId"]] = body
+            bodies_by_type.setdefault(body["BodyTypeId"], []).append(body)
+            bodies_by_name[normalize_body_name(body["BodyName"])] = body
+
+        self._bodies_by_type = bodies_by_type
+        self._bodies_by_name = bodies_by_name
+        self._bodies_by_id = bodies_by_id
+
+    @property
+    def body_type_joins(self):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+
+        Output
+        ----------
+        Returns a dictionary of each body's body type keyed by BodyId. Bodies
+        whose BodyTypeId is not found in body_types map to None.
+        """
+
+        if self._body_type_joins is None:
+            if self._body_types_by_id is None:
+                self._body_types_by_id = {body_type["BodyTypeId"]: body_type
+                                          for body_type in self.body_types}
+
+            self._body_type_joins = {
+                body["BodyId"]: self._body_types_by_id.get(body["BodyTypeId"])
+                for body in self.bodies}
+
+        return self._body_type_joins
+
+    def get_body(self, body_id):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+        body_id: int
+            The BodyId to look up, i.e. an Event's EventBodyId.
+
+        Output
+        ----------
+        Returns the body with the provided BodyId or None if there is no such
+        body.
+        """
+
+        self._build_body_indexes()
+        return self._bodies_by_id.get(body_id)
+
+    def get_bodies_by_type(self, body_type_id):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+        body_type_id: int
+            The BodyTypeId to look up.
+
+        Output
+        ----------
+        Returns a list of the bodies with the provided BodyTypeId.
+        """
+
+        self._build_body_indexes()
+        return self._bodies_by_type.get(body_type_id, [])
+
+    def get_body_by_name(self, name):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+        name: str
+            The BodyName to look up. Case and whitespace are ignored.
+
+        Output
+        ----------
+        Returns the body with the provided name or None if there is no such
+        body.
+        """
+
+        self._build_body_indexes()
+        return self._bodies_by_name.get(normalize_body_name(name))
+
+    def get_body_type(self, body_id):
+        """
+        Parameters
+        ----------
+        self: BodyPipe
+            The BodyPipe that stores which city to query data for.
+        body_id: int
+            The BodyId of the body to get the body type of.
+
+        Output
+        ----------
+        Returns the body type of the body with the provided BodyId or None if
+        there is no such body or body type.
+        """
+
+        return self.body_type_joins.get(body_id)
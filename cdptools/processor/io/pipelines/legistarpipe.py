@@ -1,7 +1,23 @@
+from concurrent.futures import ThreadPoolExecutor
+from cdptools.utils import caches
 from cdptools.utils import checks
+from cdptools.utils import sessions
+from cdptools.utils import throttles
+import urllib.parse
+import collections
+import itertools
 import requests
+import hashlib
+import json
+import time
 import sys
 
+LEGISTAR_HOST = "http://webapi.legistar.com"
+LEGISTAR_URL = "{h}/v1/{c}/{q}?$skip={s}"
+LEGISTAR_DETAIL_URL = "{h}/v1/{c}/{q}"
+PAGE_SIZE = 1000
+DEFAULT_TTL = 15 * 60
+
 ERR_FOOTER = """
 Ex:
     query="Matters"
@@ -16,6 +32,26 @@ CHECK_CITY_ERR = """
 LegistarPipe requires the "city" parameter to be a string to initialize.
 """
 
+CHECK_SESSION_ERR = """
+LegistarPipe requires the "session" parameter to be a requests.Session or None
+    to initialize.
+"""
+
+CHECK_CACHE_ERR = """
+LegistarPipe requires the "cache" parameter to be a
+    cdptools.utils.caches.ResponseCache, cdptools.utils.caches.SharedCache, or
+    None to initialize.
+"""
+
+CHECK_THROTTLE_ERR = """
+LegistarPipe requires the "throttle" parameter to be a
+    cdptools.utils.throttles.Throttle or None to initialize.
+"""
+
+CHECK_HOST_ERR = """
+LegistarPipe requires the "host" parameter to be a string to initialize.
+"""
+
 CHECK_QUERY_ERR = """
 LegistarPipe requires the "query" parameter to be a string to complete.
 """ + ERR_FOOTER
@@ -29,12 +65,59 @@ LegistarPipe requires the "pages" parameter to be an integer or string
     "all" to complete.
 """ + ERR_FOOTER
 
+CHECK_FILTER_ERR = """
+LegistarPipe requires the "filter" parameter to be an OData filter string or
+    None to complete.
+""" + ERR_FOOTER
+
+CHECK_SELECT_ERR = """
+LegistarPipe requires the "select" parameter to be an OData select string, a
+    list of field names, or None to complete.
+""" + ERR_FOOTER
+
+CHECK_ORDERBY_ERR = """
+LegistarPipe requires the "orderby" parameter to be an OData orderby string or
+    None to complete.
+""" + ERR_FOOTER
+
+CHECK_TOP_ERR = """
+LegistarPipe requires the "top" parameter to be a non-negative integer or None
+    to complete.
+""" + ERR_FOOTER
+
+CHECK_USE_CACHE_ERR = """
+LegistarPipe requires the "use_cache" parameter to be a boolean to complete.
+""" + ERR_FOOTER
+
+CHECK_WORKERS_ERR = """
+LegistarPipe requires the "workers" parameter to be a positive integer to
+    complete.
+""" + ERR_FOOTER
+
+def hash_table(table):
+    """
+    Returns a hash of the content of the provided json table.
+    """
+
+    return hashlib.sha1(json.dumps(table, sort_keys=True)
+                        .encode("utf-8")).hexdigest()
+
 class LegistarPipe:
     """
     Parameters
     ----------
     city: str
         A Legistar supported city to query against.
+    session: requests.Session
+        A pooled HTTP session to make requests with. When not provided the
+        process wide session from cdptools.utils.sessions is used.
+    cache: cdptools.utils.caches.ResponseCache, SharedCache
+        Where successful page responses are stored and served from. A
+        SharedCache also shares whole source tables between processes.
+    throttle: cdptools.utils.throttles.Throttle
+        The rate, concurrency, and retry policy requests are made with.
+    host: str
+        The scheme and host of the Legistar API, i.e. a local stand-in server.
 
     Usage
     ----------
@@ -42,24 +125,66 @@ class LegistarPipe:
     By setting each attribute in the list of updatable attributes to None,
     the LegistarPipe getattr method will repull the data when requested.
 
+    Contains a refresh method for cheaper updates. Subclasses declare which
+    updatable attributes hold whole tables in sources, with the table they
+    are queried from and how long they stay fresh, and which attributes are
+    derived from them in dependencies. Refresh only requests stale sources and
+    only resets the derived attributes of sources whose content changed.
+
+    Contains a prefetch method that starts requesting sources in the background
+    so that the first getattr call on a source waits on the request in flight
+    instead of starting it.
+
     Contains a self referencing Legistar object get.
     """
 
-    def __init__(self, city):
+    def __init__(self, city, session=None, cache=None, throttle=None,
+                 host=LEGISTAR_HOST):
         """
         Parameters
         ----------
         city: str
             A Legistar supported city to query against.
+        session: requests.Session
+            A pooled HTTP session to make requests with.
+            (Default: the shared session)
+        cache: cdptools.utils.caches.ResponseCache, SharedCache
+            Where successful page responses are stored and served from. A
+            SharedCache also shares whole source tables between processes so
+            that only one process requests a stale table.
+            (Default: None, every page is requested)
+        throttle: cdptools.utils.throttles.Throttle
+            The rate, concurrency, and retry policy requests are made with.
+            (Default: None, requests are not limited or retried)
+        host: str
+            The scheme and host of the Legistar API.
+            (Default: LEGISTAR_HOST)
         """
 
         checks.check_types(city, [str], CHECK_CITY_ERR)
+        checks.check_types(host, [str], CHECK_HOST_ERR)
+        checks.check_types(cache,
+                           [caches.ResponseCache,
+                            caches.SharedCache,
+                            type(None)],
+                           CHECK_CACHE_ERR)
+        checks.check_types(throttle,
+                           [throttles.Throttle, type(None)],
+                           CHECK_THROTTLE_ERR)
         self.city = city
+        self.cache = cache
+        self.throttle = throttle
+        self.host = host.rstrip("/")
+        self.set_session(session)
 
         self.updatable = []
+        self.sources = {}
+        self.dependencies = {}
         self.update()
 
-    def get_legistar_object(self, query="Bodies", begin=0, pages=1):
+    def get_legistar_object(self, query="Bodies", begin=0, pages=1,
+                            workers=1, select=None, filter=None,
+                            orderby=None, top=None, use_cache=True):
         """
         Parameters
         ----------
@@ -75,15 +200,217 @@ class LegistarPipe:
             Due to the paging style return of the legistar api, how many pages
             should be returned from the request. Pass "all" to return all pages.
             (Default: 1)
+        workers: int
+            How many pages should be requested at the same time. Pages are
+            requested in windows of this size and the first short page in a
+            window ends the query. When the LegistarPipe has a throttle the
+            window is further limited by the throttle's concurrency limit.
+            (Default: 1)
+        select: str, list
+            Which fields the Legistar API should return for each object as an
+            OData $select expression or a list of field names, i.e.
+            ["BodyId", "BodyName"].
+            (Default: None, all fields)
+        filter: str
+            An OData $filter expression the Legistar API should apply before
+            paging, i.e. "MatterLastModifiedUtc gt datetime'2018-01-01'".
+            (Default: None)
+        orderby: str
+            An OData $orderby expression the Legistar API should sort by before
+            paging, i.e. "EventDate desc".
+            (Default: None)
+        top: int
+            The maximum number of objects to return. The final page request
+            is trimmed with $top so no extra objects are downloaded.
+            (Default: None, no limit beyond pages)
+        use_cache: bool
+            Should pages be served from the LegistarPipe's cache. When False
+            every page is requested and the cache is updated with the
+            response.
+            (Default: True)
 
         Output
         ----------
-        Returns the json object found from the successful query.
+        Returns the json object found from the successful query in page order.
         Unsuccessful queries will raise a ValueError.
         """
 
-        # TODO:
-        # cache results in _query dict
+        results = []
+        for page in self.iter_legistar_object(query,
+                                              begin,
+                                              pages,
+                                              workers,
+                                              select,
+                                              filter,
+                                              orderby,
+                                              top,
+                                              use_cache):
+            results += page
+
+        print("Objects returned:", len(results))
+        return results
+
+    def iter_legistar_object(self, query="Bodies", begin=0, pages=1,
+                             workers=1, select=None, filter=None,
+                             orderby=None, top=None, use_cache=True):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        query: str
+            Which type of data to query for.
+            (Default: "Bodies")
+        begin: int
+            What index should the results start from.
+            (Default: 0)
+        pages: int, str
+            Due to the paging style return of the legistar api, how many pages
+            should be returned from the request. Pass "all" to return all pages.
+            (Default: 1)
+        workers: int
+            How many pages should be requested at the same time. Pages are
+            requested in windows of this size and the first short page in a
+            window ends the query. When the LegistarPipe has a throttle the
+            window is further limited by the throttle's concurrency limit.
+            (Default: 1)
+        select: str, list
+            Which fields the Legistar API should return for each object as an
+            OData $select expression or a list of field names, i.e.
+            ["BodyId", "BodyName"].
+            (Default: None, all fields)
+        filter: str
+            An OData $filter expression the Legistar API should apply before
+            paging, i.e. "MatterLastModifiedUtc gt datetime'2018-01-01'".
+            (Default: None)
+        orderby: str
+            An OData $orderby expression the Legistar API should sort by before
+            paging, i.e. "EventDate desc".
+            (Default: None)
+        top: int
+            The maximum number of objects to return. The final page request
+            is trimmed with $top so no extra objects are downloaded.
+            (Default: None, no limit beyond pages)
+        use_cache: bool
+            Should pages be served from the LegistarPipe's cache. When False
+            every page is requested and the cache is updated with the
+            response.
+            (Default: True)
+
+        Output
+        ----------
+        Yields each page of the query as a json list in page order as soon as
+        it arrives so that only the current window of pages is held in memory.
+        Use itertools.chain.from_iterable to iterate over single records.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        options, process = self._plan_query(query, begin, pages, workers,
+                                            select, filter, orderby, top)
+        checks.check_types(use_cache, [bool], CHECK_USE_CACHE_ERR)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            while True:
+                window = list(itertools.islice(process,
+                                               self._get_window_size(workers)))
+                if len(window) == 0:
+                    break
+
+                # map returns the pages in offset order regardless of which
+                # request finished first
+                window_pages = executor.map(lambda offset:
+                                            self._get_legistar_page(query,
+                                                                    offset[0],
+                                                                    options,
+                                                                    offset[1],
+                                                                    use_cache),
+                                            window)
+                for (skip, size), page in zip(window, window_pages):
+                    yield page
+                    if len(page) < size:
+                        return
+
+    def get_legistar_detail(self, query):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        query: str
+            Which single object to query for, including any query options,
+            i.e. "Matters/1234" or "Events/5678?EventItems=1".
+
+        Output
+        ----------
+        Returns the json object found from the successful query. Detail
+        queries are not paged.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        checks.check_types(query, [str], CHECK_QUERY_ERR)
+
+        url = LEGISTAR_DETAIL_URL.format(h=self.host, c=self.city, q=query)
+        return self._get_legistar_json(url, (self.city, query))
+
+    def iter_legistar_details(self, queries, workers=1):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        queries: iterable
+            Any iterable of detail queries, i.e. a generator of
+            "Matters/{MatterId}" queries for every matter.
+        workers: int
+            How many detail queries should be requested at the same time. When
+            the LegistarPipe has a throttle the number in flight is further
+            limited by the throttle's concurrency limit.
+            (Default: 1)
+
+        Output
+        ----------
+        Yields a (query, json object) tuple for every provided query in the
+        order the queries were provided. Queries are only taken from the
+        iterable as workers free up, so at most the queries in flight are held
+        in memory no matter how many are provided.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        checks.check_types(workers, [int], CHECK_WORKERS_ERR)
+        if workers < 1:
+            raise ValueError(CHECK_WORKERS_ERR)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = collections.deque()
+            for query in queries:
+                while len(pending) >= self._get_window_size(workers):
+                    done, future = pending.popleft()
+                    yield done, future.result()
+
+                pending.append((query,
+                                executor.submit(self.get_legistar_detail,
+                                                query)))
+
+            while len(pending) > 0:
+                done, future = pending.popleft()
+                yield done, future.result()
+
+    def _plan_query(self, query, begin, pages, workers, select, filter,
+                    orderby, top):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        query, begin, pages, workers, select, filter, orderby, top:
+            See get_legistar_object.
+
+        Output
+        ----------
+        Checks the provided query parameters and returns a tuple of the OData
+        query options and an iterator of (skip, size) pairs for every page the
+        query may need.
+        """
 
         if pages == "all":
             pages = sys.maxsize
@@ -91,43 +418,205 @@ class LegistarPipe:
         checks.check_types(query, [str], CHECK_QUERY_ERR)
         checks.check_types(begin, [int], CHECK_BEGIN_ERR)
         checks.check_types(pages, [int], CHECK_PAGES_ERR)
+        checks.check_types(workers, [int], CHECK_WORKERS_ERR)
+        checks.check_types(select, [str, list, type(None)], CHECK_SELECT_ERR)
+        checks.check_types(filter, [str, type(None)], CHECK_FILTER_ERR)
+        checks.check_types(orderby, [str, type(None)], CHECK_ORDERBY_ERR)
+        checks.check_types(top, [int, type(None)], CHECK_TOP_ERR)
+        if workers < 1:
+            raise ValueError(CHECK_WORKERS_ERR)
+        if top is not None and top < 0:
+            raise ValueError(CHECK_TOP_ERR)
 
-        url = "http://webapi.legistar.com/v1/{c}/{q}?$skip={s}"
-        results = []
+        if isinstance(select, list):
+            select = ",".join(select)
 
-        process = range(begin, begin + (pages*1000), 1000)
-        for skip in process:
-            print("Requesting:", url.format(c=self.city, q=query, s=skip))
-            try:
-                r = requests.get(url.format(c=self.city, q=query, s=skip))
+        options = tuple((name, value)
+                        for name, value in [("$select", select),
+                                            ("$filter", filter),
+                                            ("$orderby", orderby)]
+                        if value is not None)
 
-                if r.status_code == 200:
-                    results += r.json()
-                    if len(results) % 1000 != 0 or len(results) == 0:
-                        break
+        end = begin + (pages*PAGE_SIZE)
+        if top is not None:
+            end = min(end, begin + top)
 
-                else:
-                    raise ValueError("""
-Something went wrong with legistar get.
-Status Code: {err}
-Attempted Url: {url}
-""".format(err=r.status_code, url=url.format(c=self.city, q=query, s=skip)))
+        process = ((skip, min(PAGE_SIZE, end - skip))
+                   for skip in range(begin, end, PAGE_SIZE))
+
+        return options, process
+
+    def _get_window_size(self, workers):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        workers: int
+            The most pages that may be requested at the same time.
+
+        Output
+        ----------
+        Returns how many pages the next window should request.
+        """
+
+        if self.throttle is None:
+            return workers
+
+        return max(1, min(workers, self.throttle.limit))
+
+    def _get_legistar_page(self, query, skip, options=(), size=PAGE_SIZE,
+                           use_cache=True):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        query: str
+            Which type of data to query for.
+        skip: int
+            How many results should be skipped before the returned page.
+        options: tuple
+            (name, value) pairs of OData query options, i.e.
+            (("$select", "BodyName"),).
+            (Default: no options)
+        size: int
+            How many objects the page should hold at most.
+            (Default: PAGE_SIZE)
+        use_cache: bool
+            Should the page be served from the cache.
+            (Default: True)
 
+        Output
+        ----------
+        Returns the json list of a single page of the query, from the cache if
+        the LegistarPipe has one and it holds a fresh copy of the page.
+        When the LegistarPipe has a throttle, throttled, server error, and
+        connection failures are retried with backoff.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        url = LEGISTAR_URL.format(h=self.host, c=self.city, q=query, s=skip)
+        for name, value in options:
+            url += "&{n}={v}".format(n=name, v=urllib.parse.quote(value))
+        if size < PAGE_SIZE:
+            url += "&$top={t}".format(t=size)
+
+        key = (self.city, query, skip, options, size)
+        return self._get_legistar_json(url, key, use_cache)
+
+    def _get_legistar_json(self, url, key, use_cache=True):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        url: str
+            The full url to request.
+        key: tuple
+            The cache key the response is stored and served at.
+        use_cache: bool
+            Should the response be served from the cache. The cache is
+            updated with the response either way.
+            (Default: True)
+
+        Output
+        ----------
+        Returns the json response of the url, from the cache if the
+        LegistarPipe has one and it holds a fresh copy of the response.
+        When the LegistarPipe has a throttle, throttled, server error, and
+        connection failures are retried with backoff.
+        Unsuccessful queries will raise a ValueError.
+        """
+
+        if self.cache is not None and use_cache:
+            response = self.cache.get(key)
+            if response is not None:
+                return response
+
+        retries = 0 if self.throttle is None else self.throttle.retries
+        for attempt in range(retries + 1):
+            if self.throttle is not None:
+                self.throttle.acquire()
+
+            print("Requesting:", url)
+            try:
+                r = self.session.get(url)
             except requests.exceptions.ConnectionError:
+                r = None
+            finally:
+                # backoff waits do not hold a concurrency slot
+                if self.throttle is not None:
+                    self.throttle.release()
+
+            if r is None:
+                if self.throttle is not None:
+                    self.throttle.record_failure()
+                if attempt < retries:
+                    self.throttle.wait(attempt)
+                    continue
+
                 raise requests.exceptions.ConnectionError("""
 Something went wrong with legistar connection.
 Could not connect to server.
 """)
 
-        print("Objects returned:", len(results))
-        return results
+            if r.status_code == 200:
+                response = r.json()
+                if self.throttle is not None:
+                    self.throttle.record_success()
+                if self.cache is not None:
+                    self.cache.set(key, response)
+
+                return response
 
-    def update(self):
+            if (self.throttle is not None
+                    and self.throttle.should_retry(r.status_code)):
+                self.throttle.record_failure()
+                if attempt < retries:
+                    self.throttle.wait(attempt, r.headers.get("Retry-After"))
+                    continue
+
+            raise ValueError("""
+Something went wrong with legistar get.
+Status Code: {err}
+Attempted Url: {url}
+""".format(err=r.status_code, url=url))
+
+    def set_session(self, session=None):
         """
         Parameters
         ----------
         self: LegistarPipe
             The LegistarPipe that stores which city to query data for.
+        session: requests.Session
+            A pooled HTTP session to make requests with.
+            (Default: the shared session)
+
+        Output
+        ----------
+        Sets the session all following requests of the LegistarPipe are made
+        with.
+        """
+
+        checks.check_types(session,
+                           [requests.Session, type(None)],
+                           CHECK_SESSION_ERR)
+        if session is None:
+            session = sessions.get_shared_session()
+
+        self.session = session
+
+    def update(self, attrs=None):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attrs: list
+            Which updatable attributes to reset. Every attribute derived from
+            them is reset as well.
+            (Default: None, reset every updatable attribute)
 
         Output
         ----------
@@ -136,5 +625,313 @@ Could not connect to server.
         attribute to reinitialize the desired attribute.
         """
 
-        for attr in self.updatable:
+        if attrs is None:
+            attrs = self.updatable
+            self._fetched = {}
+            self._hashes = {}
+            self._projections = {}
+
+            # a request in flight would store the table from before the reset,
+            # the first update of a pipe has no requests in flight
+            for future in getattr(self, "_pending", {}).values():
+                future.cancel()
+            self._pending = {}
+        else:
+            attrs = list(attrs) + self.get_dependents(attrs)
+
+        for attr in attrs:
             setattr(self, attr, None)
+            self._fetched.pop(attr, None)
+            self._hashes.pop(attr, None)
+            self._projections.pop(attr, None)
+
+            # a request in flight would store the table from before the reset
+            future = self._pending.pop(attr, None)
+            if future is not None:
+                future.cancel()
+
+    def prefetch(self, attrs=None):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attrs: list
+            Which source attributes to start requesting.
+            (Default: None, every source attribute)
+
+        Output
+        ----------
+        Starts requesting every provided source attribute that is not loaded
+        at the same time in background threads and returns a dictionary of
+        the request futures keyed by attribute. The first getattr call on a
+        prefetched source waits on its future instead of starting a new
+        request, and raises any error the request raised.
+        """
+
+        if attrs is None:
+            attrs = list(self.sources.keys())
+
+        checks.check_types(attrs, [list])
+
+        start = [attr for attr in attrs
+                 if getattr(self, attr) is None and attr not in self._pending]
+        if len(start) > 0:
+            executor = ThreadPoolExecutor(max_workers=len(start))
+            for attr in start:
+                self._pending[attr] = executor.submit(self._fetch_source, attr)
+
+            # the threads finish their requests without the executor
+            executor.shutdown(wait=False)
+
+        return {attr: self._pending[attr]
+                for attr in attrs if attr in self._pending}
+
+    def refresh(self, force=False):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        force: bool
+            Should every loaded source be requested regardless of its ttl.
+            (Default: False)
+
+        Output
+        ----------
+        Requests every loaded source attribute that is older than its ttl and
+        compares a hash of the new content to the old content. Attributes
+        derived from a changed source are reset, attributes derived from an
+        unchanged source are kept. When a source is not loaded, attributes
+        loaded from a projection of it are checked the same way by requesting
+        the same projection again. A source that is not loaded but has other
+        loaded derived attributes is requested so that they can be checked in
+        the future and its derived attributes are reset.
+        Returns the list of source and projected attributes that changed.
+        """
+
+        now = time.time()
+        changed = []
+        for attr, source in self.sources.items():
+            # a prefetched source is as fresh as it gets
+            if attr in self._pending:
+                continue
+
+            dependents = self.get_dependents([attr])
+
+            if getattr(self, attr) is None:
+                projected = [d for d in dependents if d in self._projections]
+                for projection in projected:
+                    if self._refresh_projection(projection, force, now):
+                        changed.append(projection)
+
+                # attributes derived from a projection are checked with it
+                dependents = [d for d in dependents
+                              if d not in projected
+                              and d not in self.get_dependents(projected)]
+                if any(getattr(self, d) is not None for d in dependents):
+                    self._set_source(attr,
+                                     self._fetch_source(attr, refresh=True))
+                    self.update(dependents)
+                    changed.append(attr)
+
+                continue
+
+            if not force and now - self._fetched[attr] < source["ttl"]:
+                continue
+
+            if self._set_source(attr,
+                                self._fetch_source(attr, force, True)):
+                self.update(dependents)
+                changed.append(attr)
+
+        return changed
+
+    def get_dependents(self, attrs):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attrs: list
+            The attributes to find the dependents of.
+
+        Output
+        ----------
+        Returns the list of every attribute derived, directly or through other
+        derived attributes, from the provided attributes.
+        """
+
+        found = []
+        pending = list(attrs)
+        while len(pending) > 0:
+            attr = pending.pop()
+            for dependent, sources in self.dependencies.items():
+                if attr in sources and dependent not in found:
+                    found.append(dependent)
+                    pending.append(dependent)
+
+        return found
+
+    def _get_source(self, attr):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attr: str
+            The source attribute to get.
+
+        Output
+        ----------
+        Returns the source attribute, requesting it first if it is not loaded
+        or waiting on its request if it is being prefetched.
+        """
+
+        if getattr(self, attr) is None:
+            future = self._pending.pop(attr, None)
+            if future is not None:
+                value = future.result()
+            else:
+                value = self._fetch_source(attr)
+
+            self._set_source(attr, value)
+
+        return getattr(self, attr)
+
+    def _fetch_source(self, attr, force=False, refresh=False):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attr: str
+            The source attribute to request.
+        force: bool
+            Should a table stored in a SharedCache be requested again even if
+            it is fresh.
+            (Default: False)
+        refresh: bool
+            Is the table requested because its loaded copy is older than the
+            source's ttl, so that cached pages must not be served.
+            (Default: False)
+
+        Output
+        ----------
+        Returns the full table the source attribute is queried from. When the
+        LegistarPipe has a SharedCache, the table is read from it if any
+        process stored it within the source's ttl, otherwise it is requested
+        by this process while every other process waits to read it.
+        The source's ttl only applies to the table, so the pages of a table
+        requested for a SharedCache or for a refresh are never served from
+        the page cache.
+        """
+
+        source = self.sources[attr]
+
+        def fetch(use_cache=True):
+            return self.get_legistar_object(source["query"],
+                                            pages="all",
+                                            use_cache=use_cache)
+
+        if isinstance(self.cache, caches.SharedCache):
+            return self.cache.get_or_fetch((self.city, source["query"], "all"),
+                                           lambda: fetch(False),
+                                           ttl=source["ttl"],
+                                           force=force)
+
+        return fetch(not (force or refresh))
+
+    def _get_projection(self, attr, source, **options):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attr: str
+            The derived attribute the projection is loaded for.
+        source: str
+            The source attribute the projection is queried from.
+        **options:
+            The select and filter options of the projection, see
+            get_legistar_object.
+
+        Output
+        ----------
+        Requests the projection of the source's table and returns it. The
+        projection is recorded with its fetch time and content hash so that
+        refresh can check the derived attribute without requesting the whole
+        source.
+        """
+
+        table = self.get_legistar_object(self.sources[source]["query"],
+                                         pages="all",
+                                         **options)
+
+        self._projections[attr] = {"source": source, "options": options}
+        self._fetched[attr] = time.time()
+        self._hashes[attr] = hash_table(table)
+
+        return table
+
+    def _refresh_projection(self, attr, force, now):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attr: str
+            The derived attribute loaded from a projection.
+        force: bool
+            Should the projection be requested regardless of its source's ttl.
+        now: float
+            The time the refresh started.
+
+        Output
+        ----------
+        Requests the projection again when it is older than its source's ttl
+        and resets the derived attribute and its dependents if the projection
+        changed. Returns True if it changed.
+        """
+
+        projection = self._projections[attr]
+        source = self.sources[projection["source"]]
+        if not force and now - self._fetched[attr] < source["ttl"]:
+            return False
+
+        table = self.get_legistar_object(source["query"],
+                                         pages="all",
+                                         use_cache=False,
+                                         **projection["options"])
+        self._fetched[attr] = time.time()
+        if hash_table(table) == self._hashes[attr]:
+            return False
+
+        self.update([attr])
+        return True
+
+    def _set_source(self, attr, value):
+        """
+        Parameters
+        ----------
+        self: LegistarPipe
+            The LegistarPipe that stores which city to query data for.
+        attr: str
+            The source attribute to set.
+        value: list
+            The table to store at the source attribute.
+
+        Output
+        ----------
+        Stores the table with its fetch time and content hash and returns True
+        if the content hash differs from the previously stored table.
+        """
+
+        digest = hash_table(value)
+        changed = self._hashes.get(attr) != digest
+
+        setattr(self, attr, value)
+        self._fetched[attr] = time.time()
+        self._hashes[attr] = digest
+
+        return changed
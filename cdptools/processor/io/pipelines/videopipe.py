@@ -1,5 +1,14 @@
+from cdptools.utils import checks
+from cdptools.utils import sessions
+import requests
+
+CHECK_SESSION_ERR = """
+VideoPipe requires the "session" parameter to be a requests.Session or None to
+initialize.
+"""
+
 class VideoPipe:
-    def __init__(self, func=None):
+    def __init__(self, func=None, session=None):
         if not callable(func):
             raise TypeError("""
 VideoPipe requires a video url collection function to initialize.
@@ -7,4 +16,30 @@ Given: {func_type}
 Please view our documentation for an example.
 """.format(func_type=type(func)))
 
+        checks.check_types(session,
+                           [requests.Session, type(None)],
+                           CHECK_SESSION_ERR)
+        if session is None:
+            session = sessions.get_shared_session()
+
         self.getter = func
+        self.session = session
+
+    def get_videos(self, *args, **kwargs):
+        """
+        Parameters
+        ----------
+        self: VideoPipe
+            The VideoPipe that stores the video url collection function.
+        *args, **kwargs:
+            Any arguments the video url collection function takes.
+
+        Output
+        ----------
+        Returns what the video url collection function returns when called
+        with the provided arguments and the VideoPipe's session as the
+        "session" keyword argument, so that every page request reuses the
+        pooled connections.
+        """
+
+        return self.getter(*args, session=self.session, **kwargs)
@@ -0,0 +1,104 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.processor.io.pipelines.bodypipe import BodyPipe
+from cdptools.utils import caches
+import threading
+import time
+import os
+
+import pytest
+
+KEY = ("seattle", "Bodies", 0)
+
+@pytest.fixture
+def stand_in():
+    with LegistarStandIn(rows={"Bodies": 15}) as stand_in:
+        yield stand_in
+
+def test_response_cache_serves_disk_after_memory(tmp_path):
+    caches.ResponseCache(tmp_path).set(KEY, [1, 2])
+
+    cache = caches.ResponseCache(tmp_path)
+    assert cache.get(KEY) == [1, 2]
+    assert cache.get(KEY) == [1, 2]
+    assert cache.stats["disk_hits"] == 1
+    assert cache.stats["memory_hits"] == 1
+
+def test_response_cache_expires_entries(tmp_path):
+    cache = caches.ResponseCache(tmp_path, ttl=60, ttls={"Bodies": 0})
+    cache.set(KEY, [1])
+    cache.set(("seattle", "Matters", 0), [2])
+    time.sleep(0.01)
+
+    assert cache.get(KEY) is None
+    assert cache.get(("seattle", "Matters", 0)) == [2]
+
+def test_response_cache_evicts_only_its_own_files(tmp_path):
+    (tmp_path / "keep.json").write_text("{}")
+    cache = caches.ResponseCache(tmp_path, memory_entries=2, disk_entries=5)
+    for i in range(20):
+        cache.set(("seattle", "Bodies", i), [i])
+
+    files = os.listdir(tmp_path)
+    assert "keep.json" in files
+    assert len([f for f in files if f.endswith(".response.json")]) == 5
+    assert cache.get(("seattle", "Bodies", 0)) is None
+    assert cache.get(("seattle", "Bodies", 19)) == [19]
+
+    cache.invalidate(("seattle", "Bodies", 19))
+    reopened = caches.ResponseCache(tmp_path)
+    assert reopened.get(("seattle", "Bodies", 19)) is None
+
+def test_shared_cache_fetches_once_across_threads(tmp_path):
+    cache = caches.SharedCache(tmp_path / "shared.db", poll=0.01)
+    calls = []
+
+    def fetch():
+        calls.append(1)
+        time.sleep(0.2)
+        return [1, 2, 3]
+
+    results = []
+    threads = [threading.Thread(
+        target=lambda: results.append(cache.get_or_fetch(KEY, fetch)))
+        for i in range(4)]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert len(calls) == 1
+    assert results == [[1, 2, 3]] * 4
+    assert cache.stats["fetches"] == 1
+    assert cache.stats["waits"] == 3
+
+def test_shared_cache_force_and_ttl(tmp_path):
+    cache = caches.SharedCache(tmp_path / "shared.db")
+    cache.set(KEY, [1])
+
+    assert cache.get_or_fetch(KEY, lambda: [2]) == [1]
+    assert cache.get_or_fetch(KEY, lambda: [2], force=True) == [2]
+    assert cache.get_or_fetch(KEY, lambda: [3], ttl=0) == [3]
+    assert cache.get_entry(KEY)["expires"] == cache.get_entry(KEY)["stored"]
+
+def test_shared_cache_shares_sources_between_pipes(stand_in, tmp_path, capsys):
+    cache = caches.SharedCache(tmp_path / "shared.db")
+    pipes = [BodyPipe("seattle", host=stand_in.host, cache=cache)
+             for i in range(4)]
+
+    threads = [threading.Thread(target=lambda pipe=pipe: pipe.bodies)
+               for pipe in pipes]
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert all(len(pipe.bodies) == 15 for pipe in pipes)
+    assert stand_in.stats["requests"] == 1
+
+@pytest.mark.parametrize("cache", [
+    lambda path: caches.ResponseCache(),
+    lambda path: caches.SharedCache(path / "shared.db")])
+def test_refresh_bypasses_cache(stand_in, tmp_path, cache, capsys):
+    pipe = BodyPipe("seattle", host=stand_in.host, cache=cache(tmp_path),
+                    ttls={"Bodies": 0})
+    pipe.bodies
+    stand_in.get_tables("seattle")["Bodies"][0]["BodyName"] = "Changed"
+
+    assert pipe.refresh() == ["_bodies"]
+    assert pipe.bodies[0]["BodyName"] == "Changed"
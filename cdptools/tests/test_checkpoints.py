@@ -0,0 +1,46 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.processor.io.pipelines.legistarpipe import LegistarPipe
+from cdptools.utils.checkpoints import Checkpoint
+import itertools
+
+import pytest
+
+def interrupt(pages, after):
+    for page in itertools.islice(pages, after):
+        yield page
+
+    raise ConnectionError("Interrupted")
+
+def test_resume_interrupted_pages(tmp_path, capsys):
+    with LegistarStandIn(rows={"Matters": 2500}) as stand_in:
+        pipe = LegistarPipe("seattle", host=stand_in.host)
+        requested = []
+
+        def request(begin):
+            requested.append(begin)
+            return pipe.iter_legistar_object("Matters", begin=begin,
+                                             pages="all")
+
+        checkpoint = Checkpoint(tmp_path)
+        pages = checkpoint.resume_pages(lambda begin: interrupt(request(begin),
+                                                                2))
+        with pytest.raises(ConnectionError):
+            list(itertools.chain.from_iterable(pages))
+
+        checkpoint = Checkpoint(tmp_path)
+        assert checkpoint.next_skip == 2000
+        assert not checkpoint.complete
+
+        stand_in.reset_stats()
+        pages = checkpoint.resume_pages(request)
+        matters = list(itertools.chain.from_iterable(pages))
+
+        assert requested == [0, 2000]
+        assert stand_in.stats["requests"] == 1
+        assert [m["MatterId"] for m in matters] == [
+            m["MatterId"] for m in stand_in.get_tables("seattle")["Matters"]]
+        assert Checkpoint(tmp_path).complete
+
+        # a complete pull is not requested again
+        list(Checkpoint(tmp_path).resume_pages(request))
+        assert requested == [0, 2000]
@@ -0,0 +1,53 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.generator.staging import get_legistar_tables
+from importlib.machinery import SourceFileLoader
+import importlib.util
+import functools
+import pathlib
+import sqlite3
+import sys
+
+import pytest
+
+ROWS = {"Actions": 20,
+        "Bodies": 15,
+        "BodyTypes": 5,
+        "CodeSections": 0,
+        "Events": 60,
+        "Indexes": 10,
+        "Matters": 300}
+
+SCRIPT = (pathlib.Path(__file__).parent.parent
+          / "generator" / "bin" / "create_cdp_staging")
+
+def load_script():
+    loader = SourceFileLoader("create_cdp_staging", str(SCRIPT))
+    spec = importlib.util.spec_from_loader(loader.name, loader)
+    script = importlib.util.module_from_spec(spec)
+    loader.exec_module(script)
+    return script
+
+@pytest.fixture
+def stand_in():
+    with LegistarStandIn(rows=ROWS) as stand_in:
+        yield stand_in
+
+def test_delta_rerun(stand_in, tmp_path, monkeypatch):
+    script = load_script()
+    monkeypatch.setattr(script,
+                        "get_legistar_tables",
+                        functools.partial(get_legistar_tables,
+                                          host=stand_in.host))
+    monkeypatch.setattr(sys,
+                        "argv",
+                        ["create_cdp_staging", "-d", "-s", "seattle",
+                         str(tmp_path)])
+
+    script.main()
+    script.main()
+
+    database = tmp_path / "seattle" / "staging.db"
+    with sqlite3.connect(str(database)) as connection:
+        count = connection.execute("SELECT COUNT(*) FROM Matters").fetchone()
+    assert count == (ROWS["Matters"],)
+    assert (tmp_path / "seattle" / "event_documents.json").exists()
@@ -0,0 +1,73 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.generator.staging import create_staging_db
+from cdptools.generator.staging import get_legistar_tables
+from cdptools.utils import stores
+import sqlite3
+import os
+
+import pytest
+
+ROWS = {"Actions": 20,
+        "Bodies": 15,
+        "BodyTypes": 5,
+        "CodeSections": 0,
+        "Events": 60,
+        "Indexes": 10,
+        "Matters": 300}
+
+@pytest.fixture
+def stand_in():
+    with LegistarStandIn(rows=ROWS) as stand_in:
+        yield stand_in
+
+def pull(stand_in, storage, **kwargs):
+    return get_legistar_tables("seattle",
+                               str(storage),
+                               host=stand_in.host,
+                               **kwargs)
+
+def count_matters(database, where="1"):
+    with sqlite3.connect(str(database)) as connection:
+        return connection.execute(
+            "SELECT COUNT(*) FROM Matters WHERE " + where).fetchone()[0]
+
+def test_staging_after_switching_table_format(stand_in, tmp_path):
+    pull(stand_in, tmp_path, extended=False)
+
+    matter = stand_in.get_tables("seattle")["Matters"][0]
+    matter["MatterFile"] = "CHANGED"
+    pull(stand_in, tmp_path, update=True, extended=False,
+         table_format="ndjson", compression="gzip")
+
+    # the stale json copy comes first in format order
+    os.utime(tmp_path / "seattle" / "Matters.json", (1, 1))
+
+    database = create_staging_db("seattle", str(tmp_path))
+    assert count_matters(database, "MatterFile = 'CHANGED'") == 1
+
+def test_incremental_staging_upserts_changed_rows(stand_in, tmp_path):
+    pull(stand_in, tmp_path, extended=True, table_format="ndjson")
+    database = create_staging_db("seattle", str(tmp_path))
+    assert count_matters(database) == ROWS["Matters"]
+
+    storage = tmp_path / "seattle"
+    records = list(stores.read_records(storage / "Matters.ndjson"))
+    records[5]["MatterFile"] = "CHANGED"
+    records[5]["MatterLastModifiedUtc"] = "2099-01-01T00:00:00"
+    del records[7]
+    stores.store_ndjson_stream(iter(records), storage / "Matters", True)
+
+    create_staging_db("seattle", str(tmp_path), incremental=True)
+    assert count_matters(database) == ROWS["Matters"] - 1
+    assert count_matters(database, "MatterFile = 'CHANGED'") == 1
+
+def test_skip_unchanged_staging(stand_in, tmp_path):
+    for i in range(2):
+        pull(stand_in, tmp_path, update=True, extended=True,
+             skip_unchanged=True)
+        database = create_staging_db("seattle", str(tmp_path), update=True,
+                                     skip_unchanged=True)
+        if i == 0:
+            built = os.path.getmtime(database)
+
+    assert os.path.getmtime(database) == built
@@ -0,0 +1,108 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.generator.staging import get_legistar_tables
+from cdptools.utils import stores
+import requests
+import os
+
+import pytest
+
+ROWS = {"Actions": 20,
+        "Bodies": 15,
+        "BodyTypes": 5,
+        "CodeSections": 0,
+        "Events": 60,
+        "Indexes": 10,
+        "Matters": 300}
+
+@pytest.fixture
+def stand_in():
+    with LegistarStandIn(rows=ROWS) as stand_in:
+        yield stand_in
+
+class CountingSession(requests.Session):
+    """
+    A session that counts detail requests and fails once it made as many as
+    its limit.
+    """
+
+    def __init__(self, limit=None):
+        super().__init__()
+        self.limit = limit
+        self.details = 0
+
+    def get(self, url, *args, **kwargs):
+        if "/Matters/" in url:
+            if self.details == self.limit:
+                raise requests.ConnectionError("Interrupted")
+            self.details += 1
+
+        return super().get(url, *args, **kwargs)
+
+def pull(stand_in, storage, **kwargs):
+    return get_legistar_tables("seattle",
+                               str(storage),
+                               host=stand_in.host,
+                               extended=False,
+                               **kwargs)
+
+@pytest.mark.parametrize("table_format", ["json", "ndjson"])
+def test_delta_rerun_with_empty_table(stand_in, tmp_path, table_format):
+    pull(stand_in, tmp_path, delta=True, table_format=table_format)
+    tables = pull(stand_in, tmp_path, delta=True, table_format=table_format)
+
+    assert tables["CodeSections"] == []
+    assert len(tables["Matters"]) == ROWS["Matters"]
+
+def test_delta_rerun_merges_modified_rows(stand_in, tmp_path):
+    pull(stand_in, tmp_path, delta=True)
+
+    matter = stand_in.get_tables("seattle")["Matters"][3]
+    matter["MatterFile"] = "CHANGED"
+    matter["MatterLastModifiedUtc"] = "2099-01-01T00:00:00"
+    stand_in.reset_stats()
+    tables = pull(stand_in, tmp_path, delta=True)
+
+    matters = {row["MatterId"]: row for row in tables["Matters"]}
+    assert len(matters) == ROWS["Matters"]
+    assert matters[matter["MatterId"]]["MatterFile"] == "CHANGED"
+
+    stored = list(stores.read_records(tmp_path / "seattle" / "Matters.json"))
+    assert stored == tables["Matters"]
+    assert stand_in.stats["requests"] < 20
+
+def test_detail_batches_kept_when_unchanged(stand_in, tmp_path, capsys):
+    tables = get_legistar_tables("seattle", str(tmp_path),
+                                 host=stand_in.host, batch_size=50,
+                                 skip_unchanged=True)
+    assert len(tables["Matters@MatterId"]) == ROWS["Matters"]
+
+    details_store = tmp_path / "seattle" / "Matters@MatterId"
+    batches = sorted(details_store.glob("*.json"))
+    assert len(batches) == ROWS["Matters"] // 50
+    for batch in batches:
+        os.utime(batch, (1, 1))
+
+    tables = get_legistar_tables("seattle", str(tmp_path),
+                                 host=stand_in.host, batch_size=50,
+                                 update=True, skip_unchanged=True)
+    assert len(tables["Matters@MatterId"]) == ROWS["Matters"]
+    assert [os.path.getmtime(batch) for batch in batches] == [1] * len(batches)
+
+def test_resume_interrupted_detail_pull(stand_in, tmp_path, capsys):
+    interrupted = CountingSession(limit=120)
+    with pytest.raises(requests.ConnectionError):
+        get_legistar_tables("seattle", str(tmp_path), host=stand_in.host,
+                            session=interrupted, detail_workers=1,
+                            batch_size=50, resume=True)
+
+    resumed = CountingSession()
+    tables = get_legistar_tables("seattle", str(tmp_path),
+                                 host=stand_in.host, session=resumed,
+                                 detail_workers=1, batch_size=50, resume=True)
+
+    # the stored simple tables are loaded and the stored details are kept
+    assert resumed.details == ROWS["Matters"] - interrupted.limit
+    assert len(tables["Matters"]) == ROWS["Matters"]
+    assert len(tables["Matters@MatterId"]) == ROWS["Matters"]
+    assert not (tmp_path / "seattle" / ".checkpoints" / "Matters@MatterId"
+                / "manifest.json").exists()
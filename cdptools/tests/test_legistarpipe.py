@@ -0,0 +1,97 @@
+from cdptools.benchmarks import LegistarStandIn
+from cdptools.processor.io.pipelines.asynclegistarpipe import AsyncBodyPipe
+from cdptools.processor.io.pipelines.bodypipe import BodyPipe
+from cdptools.processor.io.pipelines.legistarpipe import LegistarPipe
+from cdptools.utils.throttles import Throttle
+import asyncio
+
+import pytest
+
+ROWS = {"Bodies": 15, "BodyTypes": 5, "Matters": 2500}
+
+@pytest.fixture
+def stand_in():
+    with LegistarStandIn(rows=ROWS) as stand_in:
+        yield stand_in
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_paging_with_workers(stand_in, workers, capsys):
+    pipe = LegistarPipe("seattle", host=stand_in.host)
+    matters = pipe.get_legistar_object("Matters", pages="all",
+                                       workers=workers)
+
+    assert [m["MatterId"] for m in matters] == [
+        m["MatterId"] for m in stand_in.get_tables("seattle")["Matters"]]
+
+def test_throttle_retries_failed_pages(capsys):
+    with LegistarStandIn(rows=ROWS, error_rate=0.3, seed=1) as stand_in:
+        throttle = Throttle(rate=1000, initial=4, retries=10, backoff=0)
+        pipe = LegistarPipe("seattle", host=stand_in.host, throttle=throttle)
+        matters = pipe.get_legistar_object("Matters", pages="all", workers=4)
+
+        assert len(matters) == ROWS["Matters"]
+        assert stand_in.stats["errors"] > 0
+        assert throttle.controller.in_flight == 0
+
+def test_failed_page_without_retries(capsys):
+    with LegistarStandIn(rows=ROWS, error_rate=1.0) as stand_in:
+        throttle = Throttle(rate=1000, initial=4, retries=0, backoff=0)
+        pipe = LegistarPipe("seattle", host=stand_in.host, throttle=throttle)
+        with pytest.raises(ValueError):
+            pipe.get_legistar_object("Matters", pages="all", workers=4)
+
+        assert throttle.limit == 1
+        assert throttle.controller.in_flight == 0
+
+def test_projection_refresh_keeps_unchanged_projections(stand_in, capsys):
+    pipe = BodyPipe("seattle", host=stand_in.host, ttls={"Bodies": 0})
+    names = pipe.names
+    active = pipe.active
+
+    stand_in.reset_stats()
+    assert pipe.refresh() == []
+    assert pipe._bodies is None
+    assert pipe.names is names
+    assert pipe.active is active
+    assert stand_in.stats["requests"] == 2
+
+    inactive = [body for body in stand_in.get_tables("seattle")["Bodies"]
+                if body["BodyActiveFlag"] != 1]
+    inactive[0]["BodyName"] = "Renamed"
+    assert pipe.refresh() == ["_names"]
+    assert "Renamed" in pipe.names
+    assert pipe.active is active
+
+def test_async_pipe_across_event_loops(stand_in, capsys):
+    pipe = AsyncBodyPipe("seattle", host="http://127.0.0.1:9")
+    with pytest.raises(Exception):
+        asyncio.run(pipe.bodies)
+
+    pipe.host = stand_in.host
+    assert len(asyncio.run(pipe.bodies)) == ROWS["Bodies"]
+
+    async def gather():
+        pipe.update()
+        return await asyncio.gather(pipe.bodies, pipe.bodies, pipe.active)
+
+    stand_in.reset_stats()
+    bodies, again, active = asyncio.run(gather())
+    assert bodies is again
+    assert len(active) > 0
+    # the bodies once and the active bodies projection
+    assert stand_in.stats["requests"] == 2
+
+def test_async_update_cancels_pending_fetches(stand_in, capsys):
+    pipe = AsyncBodyPipe("seattle", host=stand_in.host)
+
+    async def update_while_fetching():
+        task = asyncio.ensure_future(pipe.bodies)
+        await asyncio.sleep(0)
+        pipe.update()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(update_while_fetching())
+    assert pipe._bodies is None
+    with pytest.raises(NotImplementedError):
+        pipe.refresh()
@@ -0,0 +1,90 @@
+from cdptools.utils import stores
+import random
+import json
+import gzip
+
+import pytest
+
+CASES = [[],
+         {},
+         [1, 2, 3],
+         {"a": 12.5, "b": 1e5, "c": -3, "d": 2.5e-7, "e": -0.0},
+         [1.5e10, -3, True, False, None, "é€😀", {"a": [1, {"b": "]}"}]}],
+         {"k\"1": [1, 2], "é": {"x": "y"}, "n": 123456789},
+         [{"MatterId": i, "MatterTitle": "x" * i} for i in range(40)]]
+
+def write_case(path, data, ensure_ascii=True):
+    with open(path, "w", encoding="utf-8") as outfile:
+        json.dump(data, outfile, ensure_ascii=ensure_ascii, indent=1)
+
+def expected(path):
+    with open(path, "r", encoding="utf-8") as infile:
+        data = json.load(infile)
+
+    if isinstance(data, dict):
+        return list(data.items())
+
+    return data
+
+@pytest.mark.parametrize("data", CASES)
+@pytest.mark.parametrize("memory_map", [False, True])
+def test_read_json_stream_every_chunk_size(tmp_path, data, memory_map):
+    path = tmp_path / "case.json"
+    write_case(path, data, ensure_ascii=False)
+    size = len(path.read_text(encoding="utf-8"))
+
+    for chunk_size in range(1, size + 2):
+        streamed = list(stores.read_json_stream(path,
+                                                memory_map=memory_map,
+                                                chunk_size=chunk_size))
+        assert streamed == expected(path), chunk_size
+
+def test_read_json_stream_floats_across_default_chunks(tmp_path):
+    generator = random.Random(0)
+    data = {"word{i}".format(i=i):
+            generator.random() * 10 ** generator.randint(-8, 8)
+            for i in range(200000)}
+    path = tmp_path / "tfidf.json"
+    write_case(path, data)
+
+    assert list(stores.read_json_stream(path)) == expected(path)
+
+def test_read_json_stream_gzip(tmp_path):
+    data = [{"a": i / 7} for i in range(1000)]
+    path = tmp_path / "records.json.gz"
+    with gzip.open(path, "wt") as outfile:
+        json.dump(data, outfile)
+
+    assert list(stores.read_json_stream(path, chunk_size=5)) == data
+
+@pytest.mark.parametrize("text", ["[1, 2", "[1 2]", "5", "{1: 2}", "", "[1.]"])
+def test_read_json_stream_malformed(tmp_path, text):
+    path = tmp_path / "bad.json"
+    path.write_text(text)
+
+    with pytest.raises(ValueError):
+        list(stores.read_json_stream(path, chunk_size=2))
+
+def test_store_data_if_changed(tmp_path):
+    path, written = stores.store_data_if_changed({"a": 1}, tmp_path / "x")
+    assert written
+    assert stores.store_data_if_changed({"a": 1}, tmp_path / "x") == (path,
+                                                                      False)
+    assert stores.store_data({"a": 2}, tmp_path / "x", True) == path
+
+    # a plain write clears the digest so it is never mistaken for unchanged
+    assert stores.read_digest(path) is None
+    assert stores.store_data_if_changed({"a": 1}, tmp_path / "x", True)[1]
+    assert stores.read_data(path) == {"a": 1}
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["x.json",
+                                                          "x.json.sha1"]
+
+def test_store_data_keeps_stored_file_on_failure(tmp_path):
+    path = stores.store_data({"a": 1}, tmp_path / "x")
+    with pytest.raises(FileExistsError):
+        stores.store_data({"a": 2}, path)
+    with pytest.raises(TypeError):
+        stores.store_data({"a": object()}, path, True)
+
+    assert stores.read_data(path) == {"a": 1}
+    assert [p.name for p in tmp_path.iterdir()] == ["x.json"]
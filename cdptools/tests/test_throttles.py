@@ -0,0 +1,58 @@
+from cdptools.utils import throttles
+import threading
+import time
+
+import pytest
+
+@pytest.mark.parametrize("rate", [0, -1, -0.5])
+def test_token_bucket_rejects_non_positive_rate(rate):
+    with pytest.raises(ValueError):
+        throttles.TokenBucket(rate=rate)
+
+@pytest.mark.parametrize("minimum, maximum", [(4, 2), (0, 2)])
+def test_aimd_controller_rejects_bad_bounds(minimum, maximum):
+    with pytest.raises(ValueError):
+        throttles.AIMDController(minimum=minimum, maximum=maximum)
+
+def test_token_bucket_rate():
+    bucket = throttles.TokenBucket(rate=50, burst=1)
+    start = time.monotonic()
+    for i in range(11):
+        bucket.acquire()
+
+    assert time.monotonic() - start >= 0.19
+
+def test_aimd_controller_limit():
+    controller = throttles.AIMDController(initial=2, maximum=3)
+    for i in range(3):
+        controller.record_success()
+    assert controller.limit == 3
+
+    for i in range(10):
+        controller.record_success()
+    assert controller.limit == 3
+
+    controller.record_failure()
+    assert controller.limit == 1
+
+def test_throttle_limits_requests_in_flight():
+    throttle = throttles.Throttle(rate=1000, initial=3, maximum=3)
+    peak = []
+    lock = threading.Lock()
+
+    def request():
+        for i in range(10):
+            throttle.acquire()
+            with lock:
+                peak.append(throttle.controller.in_flight)
+            time.sleep(0.002)
+            throttle.release()
+
+    threads = [threading.Thread(target=request) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert max(peak) == 3
+    assert throttle.controller.in_flight == 0
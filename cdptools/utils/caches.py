@@ -0,0 +1,538 @@
+from cdptools.utils import checks
+from collections import OrderedDict
+import contextlib
+import threading
+import hashlib
+import pathlib
+import sqlite3
+import json
+import time
+import os
+
+DEFAULT_TTL = 60 * 60
+DEFAULT_MEMORY_ENTRIES = 256
+DEFAULT_DISK_ENTRIES = 4096
+DEFAULT_LEASE = 60
+DEFAULT_POLL = 0.05
+DEFAULT_TIMEOUT = 30
+DISK_SUFFIX = ".response.json"
+
+SHARED_ENTRIES_TABLE = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    stored REAL NOT NULL,
+    ttl REAL NOT NULL,
+    digest TEXT NOT NULL,
+    value TEXT NOT NULL
+)
+"""
+
+SHARED_LEASES_TABLE = """
+CREATE TABLE IF NOT EXISTS leases (
+    key TEXT PRIMARY KEY,
+    expires REAL NOT NULL
+)
+"""
+
+class ResponseCache:
+    """
+    Two tier cache for Legistar responses.
+
+    Example:
+    ==========
+    ```
+        >>> cache = ResponseCache("/cdp/cache/", ttls={"Bodies": 24 * 60 * 60})
+        >>> cache.set(("seattle", "Bodies", 0), [{"BodyId": 1}])
+        >>> cache.get(("seattle", "Bodies", 0))
+        [{'BodyId': 1}]
+
+        >>> cache.get(("seattle", "Matters", 0))
+        None
+
+        >>> cache.stats
+        {'memory_hits': 1, 'disk_hits': 0, 'misses': 1, 'evictions': 0}
+    ```
+
+    Parameters
+    ==========
+    directory: str, pathlib.Path
+        Where the on disk tier should store responses. When not provided only
+        the in memory tier is used.
+    ttl: int, float
+        How many seconds a response is served from the cache before it is
+        treated as a miss.
+    ttls: dict
+        Per query overrides of ttl, keyed by query. The query is the second
+        element of every cache key.
+    memory_entries: int
+        How many responses the in memory tier holds before evicting the least
+        recently used.
+    disk_entries: int
+        How many responses the on disk tier holds before evicting the oldest.
+
+    Usage
+    ==========
+    Keys are tuples of (city, query, skip) optionally followed by any query
+    options such as an OData filter. The in memory tier is checked first,
+    then the on disk tier, and on disk hits are promoted back into memory. Sets
+    are written through to both tiers. The on disk tier only manages files
+    ending in ".response.json" and tracks them in memory, so that it is only
+    listed once. The cache is safe to share between threads and between
+    pipes, files are read and written outside of its lock.
+    """
+
+    def __init__(self,
+                 directory=None,
+                 ttl=DEFAULT_TTL,
+                 ttls=None,
+                 memory_entries=DEFAULT_MEMORY_ENTRIES,
+                 disk_entries=DEFAULT_DISK_ENTRIES):
+
+        # enforce types
+        checks.check_types(directory, [str, pathlib.Path, type(None)])
+        checks.check_types(ttl, [int, float])
+        checks.check_types(ttls, [dict, type(None)])
+        checks.check_types(memory_entries, int)
+        checks.check_types(disk_entries, int)
+
+        # ensure the disk tier exists
+        if directory is not None:
+            directory = pathlib.Path(directory)
+            if not os.path.isdir(directory):
+                os.makedirs(directory)
+
+        self.directory = directory
+        self.ttl = ttl
+        self.ttls = ttls if ttls is not None else {}
+        self.memory_entries = memory_entries
+        self.disk_entries = disk_entries
+
+        self._memory = OrderedDict()
+        self._disk = OrderedDict()
+        self._lock = threading.Lock()
+        self.clear_stats()
+
+        # track the entries a previous cache left on disk, oldest first
+        if directory is not None:
+            entries = [(os.path.getmtime(path), path)
+                       for path in directory.glob("*" + DISK_SUFFIX)]
+            for stored, path in sorted(entries):
+                self._disk[path] = stored
+
+    @property
+    def stats(self):
+        """
+        Returns a dictionary of the hit, miss, and eviction counters.
+        """
+
+        return {"memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "evictions": self.evictions}
+
+    def clear_stats(self):
+        """
+        Reset the hit, miss, and eviction counters to zero.
+        """
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get_ttl(self, key):
+        """
+        Returns how many seconds the response stored at the provided key is
+        fresh for.
+        """
+
+        return self.ttls.get(key[1], self.ttl)
+
+    def get(self, key):
+        """
+        Returns the fresh response stored at the provided key or None if there
+        is no fresh response in either tier.
+        """
+
+        now = time.time()
+        ttl = self.get_ttl(key)
+
+        with self._lock:
+            # memory tier
+            if key in self._memory:
+                stored, value = self._memory[key]
+                if now - stored <= ttl:
+                    self._memory.move_to_end(key)
+                    self.memory_hits += 1
+                    return value
+
+                del self._memory[key]
+
+            if self.directory is None:
+                self.misses += 1
+                return None
+
+        # disk tier
+        path = self._get_path(key)
+        try:
+            with open(path, "r") as infile:
+                entry = json.load(infile)
+        except (OSError, ValueError):
+            entry = None
+
+        if entry is not None and now - entry["stored"] <= ttl:
+            with self._lock:
+                self._set_memory(key, entry["stored"], entry["value"])
+                self.disk_hits += 1
+
+            return entry["value"]
+
+        if entry is not None:
+            self._remove(path)
+
+        with self._lock:
+            self.misses += 1
+
+        return None
+
+    def set(self, key, value):
+        """
+        Store the provided response at the provided key in both tiers.
+        """
+
+        now = time.time()
+
+        if self.directory is None:
+            with self._lock:
+                self._set_memory(key, now, value)
+
+            return
+
+        # write to a partial file so a concurrent get never reads half a file,
+        # and before tracking it so an eviction never precedes the write
+        path = self._get_path(key)
+        partial_path = path.with_name("{n}.{p}.{t}.partial".format(
+            n=path.name, p=os.getpid(), t=threading.get_ident()))
+        with open(partial_path, "w") as outfile:
+            json.dump({"key": list(key),
+                       "stored": now,
+                       "value": value},
+                      outfile)
+
+        os.replace(partial_path, path)
+
+        with self._lock:
+            self._set_memory(key, now, value)
+            self._disk[path] = now
+            self._disk.move_to_end(path)
+
+            evicted = []
+            while len(self._disk) > self.disk_entries:
+                evicted.append(self._disk.popitem(last=False)[0])
+                self.evictions += 1
+
+        for evicted_path in evicted:
+            self._remove(evicted_path)
+
+    def invalidate(self, key):
+        """
+        Remove the response stored at the provided key from both tiers.
+        """
+
+        with self._lock:
+            self._memory.pop(key, None)
+
+            if self.directory is None:
+                return
+
+            path = self._get_path(key)
+            self._disk.pop(path, None)
+
+        self._remove(path)
+
+    def _get_path(self, key):
+        digest = hashlib.sha1(json.dumps(list(key)).encode("utf-8"))
+        return self.directory / (digest.hexdigest() + DISK_SUFFIX)
+
+    def _remove(self, path):
+        # another thread or process may have removed the entry already
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def _set_memory(self, key, stored, value):
+        self._memory[key] = (stored, value)
+        self._memory.move_to_end(key)
+
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+            self.evictions += 1
+
+class SharedCache:
+    """
+    Cross process cache for Legistar responses and whole tables backed by a
+    local SQLite database.
+
+    Example:
+    ==========
+    ```
+        >>> cache = SharedCache("/cdp/cache/legistar.db")
+        >>> pipe = BodyPipe("seattle", cache=cache)
+        >>> bodies = pipe.bodies
+
+        >>> cache.get_or_fetch(("seattle", "Bodies", "all"),
+        ...                    lambda: pipe.get_legistar_object("Bodies",
+        ...                                                     pages="all"))
+        [{'BodyId': 1, ...}, ...]
+
+        >>> cache.get_entry(("seattle", "Bodies", "all"))
+        {'stored': 1539856828.1, 'expires': 1539860428.1, 'digest': '6f1e...'}
+    ```
+
+    Parameters
+    ==========
+    path: str, pathlib.Path
+        The SQLite database file every process shares.
+    ttl: int, float
+        How many seconds a response is served from the cache before it is
+        treated as a miss.
+    ttls: dict
+        Per query overrides of ttl, keyed by query. The query is the second
+        element of every cache key.
+    lease: int, float
+        How many seconds a process may hold the right to fetch a key before
+        another process may take it over, i.e. after the first process died.
+    poll: int, float
+        How many seconds a process waiting on another process's fetch sleeps
+        between checks.
+    timeout: int, float
+        How many seconds a statement waits on a locked database before
+        failing.
+
+    Usage
+    ==========
+    Supports the get, set, and invalidate methods of ResponseCache so it can
+    be passed to any pipe as its cache, and adds get_or_fetch for whole
+    tables. When many processes call get_or_fetch for the same stale key only
+    the first takes a lease and fetches, the others wait for the lease to be
+    released and read what it stored. Every entry records when it was stored
+    and a digest of its content so that every process agrees on when a table
+    is stale and whether it changed. The database is opened in WAL mode so
+    readers never block on the writer, and every thread uses its own
+    connection.
+    """
+
+    def __init__(self,
+                 path,
+                 ttl=DEFAULT_TTL,
+                 ttls=None,
+                 lease=DEFAULT_LEASE,
+                 poll=DEFAULT_POLL,
+                 timeout=DEFAULT_TIMEOUT):
+
+        # enforce types
+        checks.check_types(path, [str, pathlib.Path])
+        checks.check_types(ttl, [int, float])
+        checks.check_types(ttls, [dict, type(None)])
+        checks.check_types(lease, [int, float])
+        checks.check_types(poll, [int, float])
+        checks.check_types(timeout, [int, float])
+
+        # ensure the database directory exists
+        path = pathlib.Path(path)
+        if not os.path.isdir(path.parent):
+            os.makedirs(path.parent)
+
+        self.path = path
+        self.ttl = ttl
+        self.ttls = ttls if ttls is not None else {}
+        self.lease = lease
+        self.poll = poll
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self.clear_stats()
+
+        connection = self._get_connection()
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(SHARED_ENTRIES_TABLE)
+        connection.execute(SHARED_LEASES_TABLE)
+
+    @property
+    def stats(self):
+        """
+        Returns a dictionary of the hit, miss, fetch, and wait counters.
+        """
+
+        return {"hits": self.hits,
+                "misses": self.misses,
+                "fetches": self.fetches,
+                "waits": self.waits}
+
+    def clear_stats(self):
+        """
+        Reset the hit, miss, fetch, and wait counters to zero.
+        """
+
+        self.hits = 0
+        self.misses = 0
+        self.fetches = 0
+        self.waits = 0
+
+    def get_ttl(self, key):
+        """
+        Returns how many seconds the response stored at the provided key is
+        fresh for.
+        """
+
+        return self.ttls.get(key[1], self.ttl)
+
+    def get_entry(self, key):
+        """
+        Returns a dictionary of when the response stored at the provided key
+        was stored, when it expires, and the digest of its content, or None if
+        there is no stored response.
+        """
+
+        row = self._get_connection().execute(
+            "SELECT stored, ttl, digest FROM entries WHERE key = ?",
+            (self._get_name(key),)).fetchone()
+        if row is None:
+            return None
+
+        return {"stored": row[0], "expires": row[0] + row[1], "digest": row[2]}
+
+    def get(self, key):
+        """
+        Returns the fresh response stored at the provided key or None if there
+        is no fresh response.
+        """
+
+        row = self._get_row(self._get_connection(), self._get_name(key))
+        if row is not None and time.time() - row[0] <= self.get_ttl(key):
+            self._count("hits")
+            return json.loads(row[1])
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value, ttl=None):
+        """
+        Store the provided response at the provided key. The ttl is recorded
+        with the response so that every process treats it as fresh for the
+        same amount of time.
+        """
+
+        if ttl is None:
+            ttl = self.get_ttl(key)
+
+        content = json.dumps(value, sort_keys=True)
+        connection = self._get_connection()
+        with self._transaction(connection):
+            connection.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?)",
+                (self._get_name(key),
+                 time.time(),
+                 ttl,
+                 hashlib.sha1(content.encode("utf-8")).hexdigest(),
+                 content))
+
+    def invalidate(self, key):
+        """
+        Remove the response stored at the provided key.
+        """
+
+        connection = self._get_connection()
+        with self._transaction(connection):
+            connection.execute("DELETE FROM entries WHERE key = ?",
+                               (self._get_name(key),))
+
+    def get_or_fetch(self, key, fetch, ttl=None, force=False):
+        """
+        Returns the fresh response stored at the provided key. When there is
+        none, the first process to ask takes a lease on the key, calls fetch,
+        and stores what it returns while every other process waits for the
+        lease to be released and then reads the stored response. With force,
+        responses stored before the call are treated as stale.
+        """
+
+        if ttl is None:
+            ttl = self.get_ttl(key)
+
+        name = self._get_name(key)
+        connection = self._get_connection()
+        started = time.time()
+        waited = False
+
+        while True:
+            with self._transaction(connection):
+                now = time.time()
+                row = self._get_row(connection, name)
+                if (row is not None
+                        and now - row[0] <= ttl
+                        and (not force or row[0] >= started)):
+                    self._count("hits")
+                    return json.loads(row[1])
+
+                lease = connection.execute(
+                    "SELECT expires FROM leases WHERE key = ?",
+                    (name,)).fetchone()
+                if lease is None or lease[0] < now:
+                    connection.execute(
+                        "INSERT OR REPLACE INTO leases VALUES (?, ?)",
+                        (name, now + self.lease))
+                    break
+
+            if not waited:
+                waited = True
+                self._count("waits")
+
+            time.sleep(self.poll)
+
+        self._count("fetches")
+        try:
+            value = fetch()
+            self.set(key, value, ttl)
+        finally:
+            with self._transaction(connection):
+                connection.execute("DELETE FROM leases WHERE key = ?",
+                                   (name,))
+
+        return value
+
+    def _get_connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(str(self.path),
+                                         timeout=self.timeout,
+                                         isolation_level=None)
+            self._local.connection = connection
+
+        return connection
+
+    @contextlib.contextmanager
+    def _transaction(self, connection):
+        # immediate transactions take the write lock up front so that a read
+        # followed by a write can not interleave with another process
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            yield
+        except BaseException:
+            connection.execute("ROLLBACK")
+            raise
+
+        connection.execute("COMMIT")
+
+    def _get_name(self, key):
+        return json.dumps(list(key))
+
+    def _get_row(self, connection, name):
+        return connection.execute(
+            "SELECT stored, value FROM entries WHERE key = ?",
+            (name,)).fetchone()
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
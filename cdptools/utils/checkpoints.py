@@ -0,0 +1,180 @@
+from cdptools.utils import checks
+import pathlib
+import shutil
+import json
+import os
+
+MANIFEST = "manifest.json"
+PAGE = "{skip:09d}.json"
+
+class Checkpoint:
+    """
+    Resumable progress of a single long Legistar pull.
+
+    Example:
+    ==========
+    ```
+        >>> checkpoint = Checkpoint("/cdp/stg/seattle/.checkpoints/Matters")
+        >>> pages = checkpoint.resume_pages(
+        ...     lambda begin: pipe.iter_legistar_object("Matters",
+        ...                                             begin=begin,
+        ...                                             pages="all"))
+        >>> matters = list(itertools.chain.from_iterable(pages))
+        ValueError: Something went wrong with legistar get. ...
+
+        >>> checkpoint = Checkpoint("/cdp/stg/seattle/.checkpoints/Matters")
+        >>> checkpoint.next_skip
+        12000
+        >>> pages = checkpoint.resume_pages(
+        ...     lambda begin: pipe.iter_legistar_object("Matters",
+        ...                                             begin=begin,
+        ...                                             pages="all"))
+        >>> matters = list(itertools.chain.from_iterable(pages))
+        >>> checkpoint.clear()
+    ```
+
+    Parameters
+    ==========
+    directory: str, pathlib.Path
+        Where the manifest and the completed pages of the pull are stored.
+        Every pull needs its own directory.
+
+    Usage
+    ==========
+    The manifest records the offset and size of every completed page, whether
+    the paged pull reached its last page, and the ids of every stored detail
+    batch. It is rewritten atomically after every page and batch so that a
+    pull that dies at any point can be continued from its last completed page
+    or batch. Clear the checkpoint once whatever the pull fed is stored.
+    """
+
+    def __init__(self, directory):
+
+        # enforce types
+        checks.check_types(directory, [str, pathlib.Path])
+
+        # ensure the checkpoint directory exists
+        directory = pathlib.Path(directory)
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self.directory = directory
+        self.manifest = {"pages": [], "complete": False, "batches": {}}
+
+        manifest_path = directory / MANIFEST
+        if os.path.exists(manifest_path):
+            with open(manifest_path, "r") as manifest_file:
+                self.manifest.update(json.load(manifest_file))
+
+    @property
+    def next_skip(self):
+        """
+        Returns the offset the next page of the pull starts at.
+        """
+
+        if len(self.manifest["pages"]) == 0:
+            return 0
+
+        skip, size = self.manifest["pages"][-1]
+        return skip + size
+
+    @property
+    def complete(self):
+        """
+        Returns True if the paged pull reached its last page.
+        """
+
+        return self.manifest["complete"]
+
+    @property
+    def ids(self):
+        """
+        Returns the set of ids stored in every recorded batch.
+        """
+
+        ids = set()
+        for batch_ids in self.manifest["batches"].values():
+            ids.update(batch_ids)
+
+        return ids
+
+    @property
+    def batches(self):
+        """
+        Returns the sorted list of every recorded batch number.
+        """
+
+        return sorted(int(number) for number in self.manifest["batches"])
+
+    def iter_pages(self):
+        """
+        Yields every completed page in offset order.
+        """
+
+        for skip, size in self.manifest["pages"]:
+            with open(self.directory / PAGE.format(skip=skip), "r") as infile:
+                yield json.load(infile)
+
+    def track_pages(self, pages, begin):
+        """
+        Yields the provided pages unchanged after storing each of them and
+        recording it in the manifest. The pull is recorded as complete once
+        the pages are exhausted.
+        """
+
+        skip = begin
+        for page in pages:
+            path = self.directory / PAGE.format(skip=skip)
+            self._write(path, page)
+            self.manifest["pages"].append([skip, len(page)])
+            self.save()
+
+            yield page
+            skip += len(page)
+
+        self.manifest["complete"] = True
+        self.save()
+
+    def resume_pages(self, request):
+        """
+        Yields every completed page followed by the pages of
+        request(next_skip), which are checkpointed as they arrive. request is
+        not called when the pull is already complete.
+        """
+
+        begin = self.next_skip
+        yield from self.iter_pages()
+
+        if not self.complete:
+            yield from self.track_pages(request(begin), begin)
+
+    def record_batch(self, number, ids):
+        """
+        Record that the detail batch with the provided number stores the
+        provided ids.
+        """
+
+        self.manifest["batches"][str(number)] = [str(id) for id in ids]
+        self.save()
+
+    def save(self):
+        """
+        Atomically rewrite the manifest.
+        """
+
+        self._write(self.directory / MANIFEST, self.manifest)
+
+    def clear(self):
+        """
+        Remove the manifest and every completed page.
+        """
+
+        if os.path.isdir(self.directory):
+            shutil.rmtree(self.directory)
+
+    def _write(self, path, data):
+        partial_path = path.with_name(path.name + ".partial")
+        with open(partial_path, "w") as outfile:
+            json.dump(data, outfile)
+
+        os.replace(partial_path, path)
@@ -0,0 +1,132 @@
+from cdptools.utils import checks
+from requests.adapters import HTTPAdapter
+import threading
+import requests
+
+DEFAULT_HOSTS = 10
+DEFAULT_HOST_CONNECTIONS = 10
+DEFAULT_HEADERS = {"Accept-Encoding": "gzip, deflate",
+                   "Connection": "keep-alive"}
+
+_shared_session = None
+_shared_session_lock = threading.Lock()
+
+def create_session(hosts=DEFAULT_HOSTS,
+                   host_connections=DEFAULT_HOST_CONNECTIONS,
+                   block=True,
+                   headers=None):
+    """
+    Create a pooled HTTP session.
+
+    Example:
+    ==========
+    ```
+        >>> session = create_session(host_connections=4)
+        >>> r = session.get("http://webapi.legistar.com/v1/seattle/Bodies")
+        >>> r.status_code
+        200
+
+    ```
+
+    Parameters
+    ==========
+    hosts: int
+        How many hosts should have a connection pool kept alive at once.
+    host_connections: int
+        The maximum number of open connections to keep to a single host.
+    block: bool
+        Should requests wait for a free connection once a host has reached
+        host_connections instead of opening a throwaway connection.
+    headers: dict
+        Additional headers to send with every request. Keep-alive and gzip
+        negotiation headers are always sent.
+
+    Returns
+    ==========
+    session: requests.Session
+        A session that reuses connections between requests.
+
+    Errors
+    ==========
+    TypeError:
+        One of the provided parameters was not of the correct type.
+    """
+
+    # enforce types
+    checks.check_types(hosts, int)
+    checks.check_types(host_connections, int)
+    checks.check_types(block, bool)
+    checks.check_types(headers, [dict, type(None)])
+
+    # mount the pooled adapter for both schemes
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=hosts,
+                          pool_maxsize=host_connections,
+                          pool_block=block)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    # negotiate compressed and persistent connections
+    session.headers.update(DEFAULT_HEADERS)
+    if headers is not None:
+        session.headers.update(headers)
+
+    return session
+
+def get_shared_session():
+    """
+    Get the process wide pooled HTTP session, creating it with the default
+    pool limits on first use.
+
+    Example:
+    ==========
+    ```
+        >>> get_shared_session() is get_shared_session()
+        True
+
+    ```
+
+    Returns
+    ==========
+    session: requests.Session
+        The session shared by every pipe that was not given its own session.
+    """
+
+    global _shared_session
+
+    with _shared_session_lock:
+        if _shared_session is None:
+            _shared_session = create_session()
+
+    return _shared_session
+
+def set_shared_session(session):
+    """
+    Replace the process wide pooled HTTP session, for example with one created
+    with different pool limits.
+
+    Example:
+    ==========
+    ```
+        >>> set_shared_session(create_session(host_connections=32))
+
+    ```
+
+    Parameters
+    ==========
+    session: requests.Session
+        The session to share between every pipe that was not given its own
+        session.
+
+    Errors
+    ==========
+    TypeError:
+        The provided session was not a requests.Session.
+    """
+
+    global _shared_session
+
+    checks.check_types(session, requests.Session)
+
+    with _shared_session_lock:
+        _shared_session = session
@@ -1,11 +1,310 @@
 from cdptools.utils import checks
 import pathlib
+import hashlib
+import codecs
+import mmap
+import re
+import gzip
 import json
+import io
 import os
 
-def store_json_data(data, store_path, overwrite=False):
+COMPRESSIONS = {None: "",
+                "gzip": ".gz",
+                "zstd": ".zst"}
+NDJSON_SUFFIXES = [".json", ".ndjson", ".gz", ".zst"]
+DEFAULT_CHUNK_SIZE = 2 ** 16
+WHITESPACE = re.compile(r"[ \t\n\r]*")
+NUMBER_TAIL = re.compile(r"[0-9.eE+-]*")
+DEFAULT_SERIALIZER = "json"
+DIGEST_SUFFIX = ".sha1"
+
+class Serializer:
     """
-    Store the provided data at the provided path.
+    A named way of turning stored data into bytes and back.
+
+    Example:
+    ==========
+    ```
+        >>> serializer = get_serializer("orjson")
+        >>> serializer.dumps({"MatterId": 1})
+        b'{"MatterId":1}'
+        >>> serializer.loads(b'{"MatterId":1}')
+        {'MatterId': 1}
+    ```
+
+    Parameters
+    ==========
+    name: str
+        The name the serializer is selected by.
+    suffix: str
+        The file suffix of data stored with the serializer.
+    dumps: function
+        Returns the provided data as bytes.
+    loads: function
+        Returns the data of the provided bytes.
+
+    Usage
+    ==========
+    Every serializer whose suffix is ".json" writes plain json that every
+    other json serializer, and read_json_stream, can read back, so they can
+    be swapped freely. Other serializers are only meant for artifacts that
+    are read back by cdptools.
+    """
+
+    def __init__(self, name, suffix, dumps, loads):
+        self.name = name
+        self.suffix = suffix
+        self.dumps = dumps
+        self.loads = loads
+
+    @property
+    def is_json(self):
+        """
+        Returns True if the serializer writes plain json.
+        """
+
+        return self.suffix == ".json"
+
+    def dumps_text(self, data):
+        """
+        Returns the provided data serialized as a json string.
+        """
+
+        return self.dumps(data).decode("utf-8")
+
+def create_json_serializer():
+    """
+    Returns a serializer that uses the standard library json module.
+    """
+
+    return Serializer("json",
+                      ".json",
+                      lambda data: json.dumps(data).encode("utf-8"),
+                      json.loads)
+
+def create_orjson_serializer():
+    """
+    Returns a serializer that uses the optional orjson package. Non string
+    dictionary keys are converted to strings like the json module does.
+    """
+
+    try:
+        import orjson
+    except ImportError:
+        raise ImportError("The orjson serializer requires the orjson package")
+
+    return Serializer("orjson",
+                      ".json",
+                      lambda data: orjson.dumps(
+                          data,
+                          option=orjson.OPT_NON_STR_KEYS),
+                      orjson.loads)
+
+def create_msgpack_serializer():
+    """
+    Returns a serializer that uses the optional msgpack package. Its output
+    is not json and should only be used for artifacts read back by cdptools.
+    """
+
+    try:
+        import msgpack
+    except ImportError:
+        raise ImportError("The msgpack serializer requires the msgpack "
+                          "package")
+
+    return Serializer("msgpack",
+                      ".msgpack",
+                      lambda data: msgpack.packb(data, use_bin_type=True),
+                      lambda payload: msgpack.unpackb(payload,
+                                                      raw=False,
+                                                      strict_map_key=False))
+
+SERIALIZERS = {"json": create_json_serializer,
+               "orjson": create_orjson_serializer,
+               "msgpack": create_msgpack_serializer}
+
+def get_serializer(serializer=DEFAULT_SERIALIZER):
+    """
+    Returns the serializer with the provided name. Serializers are returned
+    unchanged. Raises an ImportError if the package the serializer needs is
+    not installed.
+    """
+
+    if isinstance(serializer, Serializer):
+        return serializer
+
+    # enforce types
+    checks.check_types(serializer, str)
+    if serializer not in SERIALIZERS:
+        raise ValueError("Unknown serializer: {s}".format(s=serializer))
+
+    return SERIALIZERS[serializer]()
+
+def get_json_serializer(serializer=DEFAULT_SERIALIZER):
+    """
+    Returns the serializer with the provided name and raises a ValueError if
+    it does not write plain json.
+    """
+
+    serializer = get_serializer(serializer)
+    if not serializer.is_json:
+        raise ValueError("Serializer does not write json: {s}".format(
+            s=serializer.name))
+
+    return serializer
+
+def get_available_serializers():
+    """
+    Returns the names of every serializer whose package is installed.
+    """
+
+    available = []
+    for name in SERIALIZERS:
+        try:
+            get_serializer(name)
+        except ImportError:
+            continue
+
+        available.append(name)
+
+    return available
+
+def get_digest_path(store_path):
+    """
+    Returns the path of the digest sidecar of the provided path, i.e.
+    "/foo/bar/Matters.json.sha1" for "/foo/bar/Matters.json".
+    """
+
+    store_path = pathlib.Path(store_path)
+    return store_path.with_name(store_path.name + DIGEST_SUFFIX)
+
+def read_digest(store_path):
+    """
+    Returns the digest recorded for the file at the provided path, or None if
+    the file or its digest is not stored.
+    """
+
+    digest_path = get_digest_path(store_path)
+    if not os.path.exists(store_path) or not os.path.exists(digest_path):
+        return None
+
+    with open(digest_path, "r") as digest_file:
+        return digest_file.read().strip()
+
+def write_digest(store_path, digest):
+    """
+    Atomically record the provided digest for the file at the provided path.
+    """
+
+    digest_path = get_digest_path(store_path)
+    partial_path = digest_path.with_name(digest_path.name + ".partial")
+    with open(partial_path, "w") as digest_file:
+        digest_file.write(digest)
+
+    os.replace(partial_path, digest_path)
+
+def clear_digest(store_path):
+    """
+    Remove the digest recorded for the file at the provided path so that a
+    write that does not record a digest is never mistaken for unchanged.
+    """
+
+    digest_path = get_digest_path(store_path)
+    if os.path.exists(digest_path):
+        os.remove(digest_path)
+
+def get_checked_time(store_path):
+    """
+    Returns the last time the file at the provided path was written or found
+    unchanged by a skip_unchanged write, as seconds since the epoch.
+    """
+
+    checked = os.path.getmtime(store_path)
+    digest_path = get_digest_path(store_path)
+    if os.path.exists(digest_path):
+        checked = max(checked, os.path.getmtime(digest_path))
+
+    return checked
+
+def get_digest(data, serializer=DEFAULT_SERIALIZER):
+    """
+    Returns the digest store_data records for the provided data when it is
+    stored with the provided serializer and skip_unchanged.
+    """
+
+    return hashlib.sha1(get_serializer(serializer).dumps(data)).hexdigest()
+
+def is_unchanged(store_path, digest):
+    """
+    Returns True if the file at the provided path was stored with the
+    provided digest. The digest sidecar is touched so that the check is
+    recorded by get_checked_time without touching the stored file.
+    """
+
+    if read_digest(store_path) != digest:
+        return False
+
+    os.utime(get_digest_path(store_path))
+    print("Unchanged:", store_path)
+    return True
+
+class HashingWriter:
+    """
+    A text file wrapper that hashes everything written through it.
+    """
+
+    def __init__(self, outfile):
+        self.outfile = outfile
+        self.hash = hashlib.sha1()
+
+    @property
+    def digest(self):
+        """
+        Returns the hex digest of everything written so far.
+        """
+
+        return self.hash.hexdigest()
+
+    def write(self, text):
+        """
+        Write the provided text to the wrapped file and hash it.
+        """
+
+        self.hash.update(text.encode("utf-8"))
+        return self.outfile.write(text)
+
+def replace_partial(partial_path, store_path, overwrite, digest=None):
+    """
+    Replace the file at the provided path with the completed partial file and
+    return True. When a digest is provided and matches the digest recorded for
+    the stored file the partial file is discarded instead and False is
+    returned. Raises a FileExistsError if the stored file would be replaced
+    and overwrite is False.
+    """
+
+    if digest is not None and is_unchanged(store_path, digest):
+        os.remove(partial_path)
+        return False
+
+    if os.path.exists(store_path) and not overwrite:
+        os.remove(partial_path)
+        raise FileExistsError("File exists already and overwrite is False")
+
+    # the old digest is cleared first so that a failure before the new
+    # digest is written never matches the replaced file
+    clear_digest(store_path)
+    os.replace(partial_path, store_path)
+    if digest is not None:
+        write_digest(store_path, digest)
+
+    print("Stored:", store_path)
+    return True
+
+def store_json_data(data, store_path, overwrite=False,
+                    serializer=DEFAULT_SERIALIZER, skip_unchanged=False):
+    """
+    Store the provided data as json at the provided path.
 
     Example:
     ==========
@@ -27,6 +326,9 @@ def store_json_data(data, store_path, overwrite=False):
 
         >>> print(real_path)
         /foo/bar/baz.json
+
+        >>> store_json_data(data, path, True, serializer="orjson")
+        Stored: /foo/bar/baz.json
     ```
 
     Parameters
@@ -38,6 +340,11 @@ def store_json_data(data, store_path, overwrite=False):
     overwrite: bool
         Should the file be overwritten if a file already exists at the provided
         path.
+    serializer: str, Serializer
+        Which json serializer to write with, "json" or "orjson".
+    skip_unchanged: bool
+        Should the write be skipped when the serialized data is identical to
+        what is stored, see store_data.
 
     Returns
     ==========
@@ -50,10 +357,269 @@ def store_json_data(data, store_path, overwrite=False):
         A file already exists at the provided path and overwrite is False.
     """
 
+    return store_data(data,
+                      store_path,
+                      overwrite,
+                      get_json_serializer(serializer),
+                      skip_unchanged)
+
+def store_json_data_if_changed(data, store_path, overwrite=False,
+                               serializer=DEFAULT_SERIALIZER):
+    """
+    Store the provided data as json at the provided path unless it is
+    identical to what is stored, see store_json_data with skip_unchanged.
+    Returns the true path of where the data was stored and whether the file
+    was written.
+    """
+
+    return store_data_if_changed(data,
+                                 store_path,
+                                 overwrite,
+                                 get_json_serializer(serializer))
+
+def store_data(data, store_path, overwrite=False,
+               serializer=DEFAULT_SERIALIZER, skip_unchanged=False):
+    """
+    Store the provided data at the provided path with the provided
+    serializer.
+
+    Example:
+    ==========
+    ```
+        >>> store_data(tfidf, "/foo/bar/tfidf", serializer="msgpack")
+        Stored: /foo/bar/tfidf.msgpack
+
+        >>> read_data("/foo/bar/tfidf.msgpack") == tfidf
+        True
+
+        >>> store_data(tfidf, "/foo/bar/tfidf", True, "msgpack",
+        ...            skip_unchanged=True)
+        Unchanged: /foo/bar/tfidf.msgpack
+    ```
+
+    Parameters
+    ==========
+    data: list, dict
+        The data to store at the provided path.
+    store_path: str, pathlib.Path
+        Where to store the provided data. The suffix of the serializer is
+        added if it is missing.
+    overwrite: bool
+        Should the file be overwritten if a file already exists at the provided
+        path.
+    serializer: str, Serializer
+        Which serializer to write with, "json", "orjson", or "msgpack".
+    skip_unchanged: bool
+        Should the write be skipped when the serialized data is identical to
+        what is stored. The sha1 of every skip_unchanged write is recorded in
+        a ".sha1" sidecar next to the file and compared before writing.
+        Unchanged data is not written even if overwrite is False, and the
+        stored file keeps its modification time so later stages can compare
+        it against their own outputs.
+
+    Returns
+    ==========
+    real_path: pathlib.Path
+        Returns the true path of where the data was stored.
+
+    Errors
+    ==========
+    FileExistsError:
+        A file already exists at the provided path and overwrite is False.
+    """
+
+    return _store_data(data, store_path, overwrite, serializer,
+                       skip_unchanged)[0]
+
+def store_data_if_changed(data, store_path, overwrite=False,
+                          serializer=DEFAULT_SERIALIZER):
+    """
+    Store the provided data at the provided path with the provided serializer
+    unless it is identical to what is stored, see store_data with
+    skip_unchanged.
+
+    Example:
+    ==========
+    ```
+        >>> store_data_if_changed(tfidf, "/foo/bar/tfidf", True, "msgpack")
+        Unchanged: /foo/bar/tfidf.msgpack
+        (PosixPath('/foo/bar/tfidf.msgpack'), False)
+    ```
+
+    Returns
+    ==========
+    real_path: pathlib.Path
+        Returns the true path of where the data was stored.
+    written: bool
+        Whether the file was written.
+    """
+
+    return _store_data(data, store_path, overwrite, serializer, True)
+
+def _store_data(data, store_path, overwrite, serializer, skip_unchanged):
+    """
+    Store the provided data for store_data and store_data_if_changed and
+    return the true path of where it was stored and whether it was written.
+    """
+
     # enforce types
     checks.check_types(data, [list, dict])
     checks.check_types(store_path, [str, pathlib.Path])
     checks.check_types(overwrite, bool)
+    checks.check_types(skip_unchanged, bool)
+
+    serializer = get_serializer(serializer)
+
+    # convert to pathlib.Path
+    if not isinstance(store_path, pathlib.Path):
+        store_path = pathlib.Path(store_path)
+
+    # ensure the file will be stored with the serializer suffix
+    if serializer.suffix not in store_path.suffixes:
+        store_path = store_path.with_suffix(serializer.suffix)
+
+    payload = serializer.dumps(data)
+
+    # skip the write when the same payload is already stored
+    digest = None
+    if skip_unchanged:
+        digest = hashlib.sha1(payload).hexdigest()
+        if is_unchanged(store_path, digest):
+            return store_path, False
+
+    # raise error
+    if os.path.exists(store_path) and not overwrite:
+        raise FileExistsError("File exists already and overwrite is False")
+
+    # write to a partial file so a failed write never replaces a good store
+    partial_path = store_path.with_name(store_path.name + ".partial")
+    try:
+        with open(partial_path, 'wb') as outfile:
+            outfile.write(payload)
+    except BaseException:
+        os.remove(partial_path)
+        raise
+
+    return store_path, replace_partial(partial_path,
+                                       store_path,
+                                       overwrite,
+                                       digest)
+
+def read_data(store_path, serializer=None):
+    """
+    Returns the data stored at the provided path by store_data or
+    store_json_data, read whole.
+
+    Example:
+    ==========
+    ```
+        >>> read_data("/foo/bar/baz.json", serializer="orjson")
+        {'foo': 'bar'}
+    ```
+
+    Parameters
+    ==========
+    store_path: str, pathlib.Path
+        Where the data is stored.
+    serializer: str, Serializer
+        Which serializer to read with. Defaults to msgpack for ".msgpack"
+        files and json for every other file. Any json serializer can read
+        files written by any other json serializer.
+
+    Returns
+    ==========
+    data: list, dict
+        The stored data.
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+
+    if serializer is None:
+        serializer = DEFAULT_SERIALIZER
+        if pathlib.Path(store_path).suffix == ".msgpack":
+            serializer = "msgpack"
+
+    serializer = get_serializer(serializer)
+    with open(store_path, "rb") as infile:
+        return serializer.loads(infile.read())
+
+def store_json_stream(records, store_path, overwrite=False,
+                      serializer=DEFAULT_SERIALIZER, skip_unchanged=False):
+    """
+    Store the provided records as a json list at the provided path while they
+    are being iterated over, so that only one record is held in memory at a
+    time.
+
+    Example:
+    ==========
+    ```
+        >>> pages = pipe.iter_legistar_object("Matters", pages="all")
+        >>> records = itertools.chain.from_iterable(pages)
+        >>> store_json_stream(records, "/foo/bar/Matters")
+        Stored: /foo/bar/Matters.json
+
+        >>> store_json_stream(records, "/foo/bar/Matters")
+        FileExistsError: File exists already and overwrite is False
+    ```
+
+    Parameters
+    ==========
+    records: iterable
+        Any iterable of json serializable records, i.e. a generator.
+    store_path: str, pathlib.Path
+        Where to store the provided records.
+    overwrite: bool
+        Should the file be overwritten if a file already exists at the provided
+        path.
+    serializer: str, Serializer
+        Which json serializer to write every record with, "json" or "orjson".
+    skip_unchanged: bool
+        Should the stored file be left untouched when the streamed records
+        serialize identically to what is stored, see store_data. The records
+        are still streamed to a partial file, which is discarded.
+
+    Returns
+    ==========
+    real_path: pathlib.Path
+        Returns the true path of where the records were stored.
+
+    Errors
+    ==========
+    FileExistsError:
+        A file already exists at the provided path and overwrite is False.
+    """
+
+    return _store_json_stream(records, store_path, overwrite, serializer,
+                              skip_unchanged)[0]
+
+def store_json_stream_if_changed(records, store_path, overwrite=False,
+                                 serializer=DEFAULT_SERIALIZER):
+    """
+    Store the provided records as a json list at the provided path while they
+    are being iterated over, unless they serialize identically to what is
+    stored, see store_json_stream with skip_unchanged.
+    Returns the true path of where the records were stored and whether the
+    file was replaced.
+    """
+
+    return _store_json_stream(records, store_path, overwrite, serializer,
+                              True)
+
+def _store_json_stream(records, store_path, overwrite, serializer,
+                       skip_unchanged):
+    """
+    Store the provided records for store_json_stream and
+    store_json_stream_if_changed and return the true path of where they were
+    stored and whether the file was replaced.
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+    checks.check_types(overwrite, bool)
+    checks.check_types(skip_unchanged, bool)
+
+    serializer = get_json_serializer(serializer)
 
     # convert to pathlib.Path
     if not isinstance(store_path, pathlib.Path):
@@ -63,12 +629,475 @@ def store_json_data(data, store_path, overwrite=False):
     if ".json" not in store_path.suffixes:
         store_path = store_path.with_suffix(".json")
 
-    # dump data
-    if not os.path.exists(store_path) or overwrite:
-        with open(store_path, 'w') as outfile:
-            json.dump(data, outfile)
-            print("Stored:", store_path)
-            return store_path
+    # raise error, unchanged records may still be skipped
+    if os.path.exists(store_path) and not overwrite and not skip_unchanged:
+        raise FileExistsError("File exists already and overwrite is False")
 
-    # raise error
-    raise FileExistsError("File exists already and overwrite is False")
+    # write to a partial file so a failed stream never replaces a good store
+    partial_path = store_path.with_name(store_path.name + ".partial")
+    try:
+        with open(partial_path, 'w') as outfile:
+            writer = HashingWriter(outfile) if skip_unchanged else outfile
+            writer.write("[")
+            for i, record in enumerate(records):
+                if i > 0:
+                    writer.write(", ")
+                writer.write(serializer.dumps_text(record))
+            writer.write("]")
+    except BaseException:
+        os.remove(partial_path)
+        raise
+
+    digest = writer.digest if skip_unchanged else None
+    return store_path, replace_partial(partial_path,
+                                       store_path,
+                                       overwrite,
+                                       digest)
+
+def get_ndjson_path(store_path, compression=None):
+    """
+    Returns the provided path with the newline delimited json suffix and the
+    suffix of the provided compression, i.e. "/foo/bar/Matters.ndjson.gz" for
+    "/foo/bar/Matters" and "gzip".
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+    checks.check_types(compression, [str, type(None)])
+    if compression not in COMPRESSIONS:
+        raise ValueError("Unknown compression: {c}".format(c=compression))
+
+    # convert to pathlib.Path
+    if not isinstance(store_path, pathlib.Path):
+        store_path = pathlib.Path(store_path)
+
+    # strip any json, ndjson, and compression suffixes
+    while store_path.suffix in NDJSON_SUFFIXES:
+        store_path = store_path.with_suffix("")
+
+    return store_path.with_name(store_path.name
+                                + ".ndjson"
+                                + COMPRESSIONS[compression])
+
+def get_compression(store_path):
+    """
+    Returns the compression of the provided path inferred from its suffix, or
+    None if the path is not compressed.
+    """
+
+    for compression, suffix in COMPRESSIONS.items():
+        if suffix != "" and str(store_path).endswith(suffix):
+            return compression
+
+    return None
+
+def open_compressed(store_path, mode="r", compression=None):
+    """
+    Returns a text file object of the provided path that transparently
+    compresses what is written and decompresses what is read with the
+    provided compression. Mode may be "r", "w", or "a". zstd requires the
+    optional zstandard package.
+    """
+
+    if compression is None:
+        return open(store_path, mode, encoding="utf-8")
+
+    if compression == "gzip":
+        return gzip.open(store_path, mode + "t", encoding="utf-8")
+
+    try:
+        import zstandard
+    except ImportError:
+        raise ImportError("zstd compression requires the zstandard package")
+
+    # every append adds a new frame, readers read across frames
+    if mode == "r":
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            open(store_path, "rb"),
+            read_across_frames=True,
+            closefd=True)
+    else:
+        stream = zstandard.ZstdCompressor().stream_writer(
+            open(store_path, mode + "b"),
+            closefd=True)
+
+    return io.TextIOWrapper(stream, encoding="utf-8")
+
+def store_ndjson_stream(records, store_path, overwrite=False, append=False,
+                        compression=None, serializer=DEFAULT_SERIALIZER,
+                        skip_unchanged=False):
+    """
+    Store the provided records as newline delimited json, one record per
+    line, at the provided path while they are being iterated over, so that
+    only one record is held in memory at a time.
+
+    Example:
+    ==========
+    ```
+        >>> pages = pipe.iter_legistar_object("Matters", pages="all")
+        >>> records = itertools.chain.from_iterable(pages)
+        >>> store_ndjson_stream(records, "/foo/bar/Matters", compression="gzip")
+        Stored: /foo/bar/Matters.ndjson.gz
+
+        >>> store_ndjson_stream(changed, "/foo/bar/Matters", append=True,
+        ...                     compression="gzip")
+        Stored: /foo/bar/Matters.ndjson.gz
+
+        >>> store_ndjson_stream(records, "/foo/bar/Matters", compression="gzip")
+        FileExistsError: File exists already and overwrite is False
+    ```
+
+    Parameters
+    ==========
+    records: iterable
+        Any iterable of json serializable records, i.e. a generator.
+    store_path: str, pathlib.Path
+        Where to store the provided records. The ndjson and compression
+        suffixes are added if they are missing.
+    overwrite: bool
+        Should the file be overwritten if a file already exists at the provided
+        path.
+    append: bool
+        Should the records be appended to the file at the provided path. The
+        file is created if it does not exist.
+    compression: str
+        How the file should be compressed, "gzip", "zstd", or None.
+    serializer: str, Serializer
+        Which json serializer to write every record with, "json" or "orjson".
+    skip_unchanged: bool
+        Should the stored file be left untouched when the streamed records
+        serialize identically to what is stored, see store_json_stream. The
+        digest is of the uncompressed records. Ignored with append.
+
+    Returns
+    ==========
+    real_path: pathlib.Path
+        Returns the true path of where the records were stored.
+
+    Errors
+    ==========
+    FileExistsError:
+        A file already exists at the provided path and neither overwrite nor
+        append is True.
+    """
+
+    return _store_ndjson_stream(records, store_path, overwrite, append,
+                                compression, serializer, skip_unchanged)[0]
+
+def store_ndjson_stream_if_changed(records, store_path, overwrite=False,
+                                   compression=None,
+                                   serializer=DEFAULT_SERIALIZER):
+    """
+    Store the provided records as newline delimited json at the provided path
+    while they are being iterated over, unless they serialize identically to
+    what is stored, see store_ndjson_stream with skip_unchanged.
+    Returns the true path of where the records were stored and whether the
+    file was replaced.
+    """
+
+    return _store_ndjson_stream(records, store_path, overwrite, False,
+                                compression, serializer, True)
+
+def _store_ndjson_stream(records, store_path, overwrite, append, compression,
+                         serializer, skip_unchanged):
+    """
+    Store the provided records for store_ndjson_stream and
+    store_ndjson_stream_if_changed and return the true path of where they
+    were stored and whether the file was replaced.
+    """
+
+    # enforce types
+    checks.check_types(overwrite, bool)
+    checks.check_types(append, bool)
+    checks.check_types(skip_unchanged, bool)
+
+    serializer = get_json_serializer(serializer)
+    store_path = get_ndjson_path(store_path, compression)
+
+    # append in place, a failed append leaves the records stored before it
+    if append:
+        clear_digest(store_path)
+        with open_compressed(store_path, "a", compression) as outfile:
+            for record in records:
+                outfile.write(serializer.dumps_text(record))
+                outfile.write("\n")
+
+        print("Stored:", store_path)
+        return store_path, True
+
+    # raise error, unchanged records may still be skipped
+    if os.path.exists(store_path) and not overwrite and not skip_unchanged:
+        raise FileExistsError("File exists already and overwrite is False")
+
+    # write to a partial file so a failed stream never replaces a good store
+    partial_path = store_path.with_name(store_path.name + ".partial")
+    try:
+        with open_compressed(partial_path, "w", compression) as outfile:
+            writer = HashingWriter(outfile) if skip_unchanged else outfile
+            for record in records:
+                writer.write(serializer.dumps_text(record))
+                writer.write("\n")
+    except BaseException:
+        os.remove(partial_path)
+        raise
+
+    digest = writer.digest if skip_unchanged else None
+    return store_path, replace_partial(partial_path,
+                                       store_path,
+                                       overwrite,
+                                       digest)
+
+def read_ndjson_stream(store_path, serializer=DEFAULT_SERIALIZER):
+    """
+    Yields every record stored as newline delimited json at the provided
+    path, one at a time. The compression is inferred from the path suffix.
+
+    Example:
+    ==========
+    ```
+        >>> for matter in read_ndjson_stream("/foo/bar/Matters.ndjson.gz"):
+        ...     print(matter["MatterId"])
+        1
+        2
+        ...
+    ```
+
+    Parameters
+    ==========
+    store_path: str, pathlib.Path
+        Where the records are stored.
+    serializer: str, Serializer
+        Which json serializer to read every record with, "json" or "orjson".
+
+    Returns
+    ==========
+    records: generator
+        A generator of every stored record in the order they were stored.
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+
+    serializer = get_json_serializer(serializer)
+
+    with open_compressed(store_path, "r", get_compression(store_path)) as f:
+        for line in f:
+            if line.strip() != "":
+                yield serializer.loads(line)
+
+def iter_text_chunks(store_path, memory_map=False,
+                     chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields the text of the file at the provided path in chunks of at most
+    chunk_size characters. The compression is inferred from the path suffix.
+    Uncompressed files are read from a read only memory map when memory_map
+    is True.
+    """
+
+    compression = get_compression(store_path)
+    if not memory_map or compression is not None:
+        with open_compressed(store_path, "r", compression) as infile:
+            while True:
+                chunk = infile.read(chunk_size)
+                if chunk == "":
+                    return
+
+                yield chunk
+
+    with open(store_path, "rb") as infile:
+        if os.fstat(infile.fileno()).st_size == 0:
+            return
+
+        # a multibyte character may be split across chunks
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with mmap.mmap(infile.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            for start in range(0, len(mapped), chunk_size):
+                yield decoder.decode(mapped[start:start + chunk_size])
+
+        yield decoder.decode(b"", final=True)
+
+class JsonStreamBuffer:
+    """
+    The unparsed text of a json stream. Only the value being parsed and what
+    follows it in the last read chunk are held in memory.
+    """
+
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.decoder = json.JSONDecoder()
+        self.text = ""
+        self.position = 0
+        self.exhausted = False
+
+    def read(self, size=1):
+        """
+        Appends at least size more characters to the buffer and returns False
+        if the stream is exhausted before any could be appended.
+        """
+
+        # drop the text that has already been parsed
+        if self.position > 0:
+            self.text = self.text[self.position:]
+            self.position = 0
+
+        appended = []
+        count = 0
+        while count < size and not self.exhausted:
+            chunk = next(self.chunks, None)
+            if chunk is None:
+                self.exhausted = True
+            else:
+                appended.append(chunk)
+                count += len(chunk)
+
+        self.text += "".join(appended)
+        return count > 0
+
+    def peek(self):
+        """
+        Returns the next character that is not whitespace without consuming
+        it, or an empty string at the end of the stream.
+        """
+
+        while True:
+            self.position = WHITESPACE.match(self.text, self.position).end()
+            if self.position < len(self.text):
+                return self.text[self.position]
+
+            if not self.read():
+                return ""
+
+    def expect(self, characters):
+        """
+        Consumes and returns the next character that is not whitespace.
+        Raises a ValueError if it is not one of the provided characters.
+        """
+
+        character = self.peek()
+        if character == "" or character not in characters:
+            raise ValueError("Expected one of {e} in json stream, got: {c}"
+                             .format(e=list(characters), c=repr(character)))
+
+        self.position += 1
+        return character
+
+    def decode(self):
+        """
+        Consumes and returns the next json value.
+        """
+
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.text, self.position)
+            except json.JSONDecodeError:
+                # the value may only be incomplete, read as much again
+                if not self.read(len(self.text) - self.position):
+                    raise
+                continue
+
+            # a number cut at the end of the buffer may continue in the next
+            # chunk, raw_decode stops before a trailing ".", "e", or sign
+            if (isinstance(value, (int, float))
+                    and not isinstance(value, bool)
+                    and NUMBER_TAIL.match(self.text, end).end()
+                    == len(self.text)
+                    and self.read(len(self.text) - self.position)):
+                continue
+
+            self.position = end
+            return value
+
+def read_json_stream(store_path, memory_map=False,
+                     chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Yields every element of the top level list, or every (key, value) item of
+    the top level dictionary, stored as json at the provided path, one at a
+    time. The compression is inferred from the path suffix.
+
+    Example:
+    ==========
+    ```
+        >>> for matter in read_json_stream("/foo/bar/Matters.json"):
+        ...     print(matter["MatterId"])
+        1
+        2
+        ...
+
+        >>> versioning = read_json_stream("/foo/bar/events_versioning.json",
+        ...                               memory_map=True)
+        >>> next(versioning)
+        ('council_briefing_2018_01_08', [{'full_text': ...}])
+    ```
+
+    Parameters
+    ==========
+    store_path: str, pathlib.Path
+        Where the json is stored.
+    memory_map: bool
+        Should an uncompressed file be read from a read only memory map
+        instead of with file reads.
+    chunk_size: int
+        How many characters are read from the file at a time.
+
+    Returns
+    ==========
+    elements: generator
+        A generator of every element of a stored list or every item of a
+        stored dictionary in the order they were stored.
+
+    Errors
+    ==========
+    ValueError:
+        The stored json is not a list or a dictionary or is malformed.
+
+    Usage
+    ==========
+    The file is parsed incrementally, so memory use is bound by the largest
+    single element and chunk_size instead of the size of the file.
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+    checks.check_types(memory_map, bool)
+    checks.check_types(chunk_size, int)
+
+    buffer = JsonStreamBuffer(iter_text_chunks(store_path,
+                                               memory_map,
+                                               chunk_size))
+
+    opening = buffer.expect("[{")
+    closing = "]" if opening == "[" else "}"
+    if buffer.peek() == closing:
+        buffer.expect(closing)
+        return
+
+    while True:
+        if opening == "[":
+            yield buffer.decode()
+        else:
+            if buffer.peek() != "\"":
+                buffer.expect("\"")
+            key = buffer.decode()
+            buffer.expect(":")
+            yield key, buffer.decode()
+
+        if buffer.expect("," + closing) == closing:
+            return
+
+def read_records(store_path, serializer=DEFAULT_SERIALIZER):
+    """
+    Yields every record of a table stored by store_json_data,
+    store_json_stream, or store_ndjson_stream at the provided path, one
+    record at a time. Newline delimited json records are read with the
+    provided json serializer.
+    """
+
+    # enforce types
+    checks.check_types(store_path, [str, pathlib.Path])
+
+    if ".ndjson" in pathlib.Path(store_path).suffixes:
+        yield from read_ndjson_stream(store_path, serializer)
+        return
+
+    yield from read_json_stream(store_path)
@@ -0,0 +1,317 @@
+from cdptools.utils import checks
+import threading
+import random
+import time
+
+RETRY_STATUSES = [429, 500, 502, 503, 504]
+
+class TokenBucket:
+    """
+    Client side request rate limiter.
+
+    Example:
+    ==========
+    ```
+        >>> bucket = TokenBucket(rate=5, burst=10)
+        >>> for url in urls:
+        ...     bucket.acquire()
+        ...     session.get(url)
+
+    ```
+
+    Parameters
+    ==========
+    rate: int, float
+        How many tokens are added to the bucket each second.
+    burst: int
+        How many tokens the bucket holds at most. Defaults to one second worth
+        of tokens.
+
+    Usage
+    ==========
+    Every request takes a token with acquire, which blocks until one is
+    available. The bucket is safe to share between threads.
+    """
+
+    def __init__(self, rate=10, burst=None):
+
+        # enforce types
+        checks.check_types(rate, [int, float])
+        checks.check_types(burst, [int, type(None)])
+        if rate <= 0:
+            raise ValueError("TokenBucket requires a positive rate, given: "
+                             "{r}".format(r=rate))
+
+        if burst is None:
+            burst = max(1, int(rate))
+
+        self.rate = rate
+        self.burst = burst
+
+        self._tokens = burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """
+        Take a token from the bucket, waiting for one if the bucket is empty.
+        """
+
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.burst,
+                                   self._tokens
+                                   + ((now - self._updated) * self.rate))
+                self._updated = now
+
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+
+                wait = (1 - self._tokens) / self.rate
+
+            time.sleep(wait)
+
+class AIMDController:
+    """
+    Additive increase, multiplicative decrease concurrency controller.
+
+    Example:
+    ==========
+    ```
+        >>> controller = AIMDController(initial=2, maximum=8)
+        >>> controller.limit
+        2
+        >>> controller.acquire()
+        >>> session.get(url)
+        >>> controller.release()
+        >>> controller.record_success()
+        >>> controller.record_success()
+        >>> controller.record_success()
+        >>> controller.limit
+        3
+        >>> controller.record_failure()
+        >>> controller.limit
+        1
+    ```
+
+    Parameters
+    ==========
+    initial: int
+        How many requests may be in flight at the start.
+    minimum: int
+        The lowest the limit may be decreased to.
+    maximum: int
+        The highest the limit may be increased to.
+    decrease: float
+        What the limit is multiplied by on every failure.
+
+    Usage
+    ==========
+    Every request takes a slot with acquire, which blocks while limit
+    requests are in flight, and returns it with release once its response
+    arrived. The limit grows by one for every limit successful responses and
+    is cut by the decrease factor on every throttled or failed response. The
+    controller is safe to share between threads.
+    """
+
+    def __init__(self, initial=1, minimum=1, maximum=16, decrease=0.5):
+
+        # enforce types
+        checks.check_types(initial, int)
+        checks.check_types(minimum, int)
+        checks.check_types(maximum, int)
+        checks.check_types(decrease, float)
+        if minimum < 1 or maximum < minimum:
+            raise ValueError("AIMDController requires 1 <= minimum <= "
+                             "maximum, given: {mi}, {ma}".format(mi=minimum,
+                                                                 ma=maximum))
+
+        self.minimum = minimum
+        self.maximum = maximum
+        self.decrease = decrease
+
+        self._limit = float(min(max(initial, minimum), maximum))
+        self._in_flight = 0
+        self._condition = threading.Condition()
+
+    @property
+    def limit(self):
+        """
+        Returns how many requests may currently be in flight.
+        """
+
+        return int(self._limit)
+
+    @property
+    def in_flight(self):
+        """
+        Returns how many requests are currently in flight.
+        """
+
+        return self._in_flight
+
+    def acquire(self):
+        """
+        Take a request slot, waiting while limit requests are in flight.
+        """
+
+        with self._condition:
+            while self._in_flight >= int(self._limit):
+                self._condition.wait()
+
+            self._in_flight += 1
+
+    def release(self):
+        """
+        Return the request slot taken by acquire.
+        """
+
+        with self._condition:
+            self._in_flight -= 1
+            self._condition.notify()
+
+    def record_success(self):
+        """
+        Additively increase the limit after a healthy response.
+        """
+
+        with self._condition:
+            self._limit = min(self.maximum, self._limit + (1 / self._limit))
+            self._condition.notify_all()
+
+    def record_failure(self):
+        """
+        Multiplicatively decrease the limit after a throttled or failed
+        response.
+        """
+
+        with self._condition:
+            self._limit = max(self.minimum, self._limit * self.decrease)
+
+class Throttle:
+    """
+    Rate, concurrency, and retry policy for requests against a single API.
+
+    Example:
+    ==========
+    ```
+        >>> throttle = Throttle(rate=20, maximum=16)
+        >>> pipe = LegistarPipe("seattle", throttle=throttle)
+        >>> matters = pipe.get_legistar_object("Matters",
+        ...                                    pages="all",
+        ...                                    workers=16)
+
+    ```
+
+    Parameters
+    ==========
+    rate: int, float
+        How many requests may be started each second.
+    burst: int
+        How many requests may be started at once after an idle period.
+    initial: int
+        How many requests may be in flight at the start.
+    maximum: int
+        The most requests that may ever be in flight.
+    retries: int
+        How many times a throttled or failed request is retried before giving
+        up.
+    backoff: int, float
+        The base number of seconds to wait before a retry. The wait doubles
+        with every attempt and is jittered.
+    max_backoff: int, float
+        The most seconds to wait before a retry.
+
+    Usage
+    ==========
+    Pipes call acquire before every request, release once its response
+    arrived, and record the outcome after. Throttled (429), server error
+    (5xx), and connection failures decrease the concurrency limit and are
+    retried after a jittered exponential backoff, or after the Retry-After the
+    server asked for. The rate and concurrency limits hold for every request
+    made through the Throttle, so a Throttle may be shared by every pipe that
+    requests the same API.
+    """
+
+    def __init__(self,
+                 rate=10,
+                 burst=None,
+                 initial=1,
+                 maximum=16,
+                 retries=5,
+                 backoff=0.5,
+                 max_backoff=30):
+
+        # enforce types
+        checks.check_types(retries, int)
+        checks.check_types(backoff, [int, float])
+        checks.check_types(max_backoff, [int, float])
+
+        self.bucket = TokenBucket(rate, burst)
+        self.controller = AIMDController(initial=initial, maximum=maximum)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+    @property
+    def limit(self):
+        """
+        Returns how many requests may currently be in flight.
+        """
+
+        return self.controller.limit
+
+    def acquire(self):
+        """
+        Wait until the concurrency and rate limits allow another request to
+        start. Every acquire must be followed by a release.
+        """
+
+        self.controller.acquire()
+        self.bucket.acquire()
+
+    def release(self):
+        """
+        Record that a request started by acquire is no longer in flight.
+        """
+
+        self.controller.release()
+
+    def should_retry(self, status_code):
+        """
+        Returns True if a response with the provided status code should be
+        retried.
+        """
+
+        return status_code in RETRY_STATUSES
+
+    def record_success(self):
+        """
+        Record a healthy response.
+        """
+
+        self.controller.record_success()
+
+    def record_failure(self):
+        """
+        Record a throttled or failed response.
+        """
+
+        self.controller.record_failure()
+
+    def wait(self, attempt, retry_after=None):
+        """
+        Sleep before the provided retry attempt. A numeric Retry-After header
+        value is honored when provided, otherwise a fully jittered exponential
+        backoff is used.
+        """
+
+        try:
+            delay = min(self.max_backoff, float(retry_after))
+        except (TypeError, ValueError):
+            delay = random.uniform(0, min(self.max_backoff,
+                                          self.backoff * (2 ** attempt)))
+
+        time.sleep(delay)
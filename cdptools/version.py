@@ -72,6 +72,8 @@ REQUIRES = [
             "speechrecognition"
             ]
 SCRIPTS = [
+            "cdptools/benchmarks/bin/run_cdp_fetch_benchmarks",
+            "cdptools/benchmarks/bin/run_cdp_serializer_benchmarks",
             "cdptools/generator/bin/create_cdp_site",
             "cdptools/generator/bin/create_cdp_staging",
             "cdptools/processor/bin/start_cdp_instance",
@@ -13,6 +13,7 @@ import math
 import sys
 import Levenshtein
 import collections
+from cdptools.utils import stores
 
 # GENERAL
 
@@ -272,7 +273,7 @@ def get_video_feeds(packed_routes, storage_directory, scraping_function, prints=
     return returnObject
 
 # get_video_sources for a json/ dictionary of video information
-def get_video_sources(objects_file, storage_directory, throughput_directory, prints=True):
+def get_video_sources(objects_file, storage_directory, throughput_directory, prints=True, session=None):
 
     '''Get all video source files from the previously stored video_feeds associated JSON file.
 
@@ -289,12 +290,18 @@ def get_video_sources(objects_file, storage_directory, throughput_directory, pri
         example: 'C:/transcription_runner/seattle/audio/'
 
     prints -- boolean value to determine to show helpful print statements during the course of the run to indicate where the runner is at in the process. Default: True (show prints)
+
+    session -- a requests.Session to download with so that connections to the video server are kept alive between videos. Default: None (plain requests)
     '''
 
     # ensure path safety
     storage_directory = check_path_safety(storage_directory)
     throughput_directory = check_path_safety(throughput_directory)
 
+    # use the pooled session if one was provided
+    if session is None:
+        session = requests
+
     # ensure directory safety
     if not os.path.exists(storage_directory):
         os.mkdir(storage_directory)
@@ -338,7 +345,7 @@ def get_video_sources(objects_file, storage_directory, throughput_directory, pri
                         print('collecting:', datum['video'])
 
                     # request the video source and store the file
-                    r = requests.get(datum['video'], stream=True)
+                    r = session.get(datum['video'], stream=True)
                     if r.status_code == 200:
                         with open((storage_directory + datum['naming'] + '.mp4'), 'wb') as mp4_out:
                             r.raw.decode_content = True
@@ -1215,10 +1222,34 @@ def predict_relevancy(search, tfidf_store, edit_distance=True, adjusted_distance
 
 # COMBINING AND STORING
 
+# write_json_items as a JSON object while they are being iterated over
+def write_json_items(items, outfile):
+
+    '''Write (key, value) items to an open file as a JSON object one item at a time.
+
+    Arguments:
+
+    items -- any iterable of (key, value) tuples, i.e. the generator returned by stores.read_json_stream for a stored dictionary.
+
+    outfile -- the open file to write the JSON object to.
+    '''
+
+    outfile.write('{')
+
+    for i, (key, value) in enumerate(items):
+        if i > 0:
+            outfile.write(', ')
+
+        outfile.write(json.dumps(key))
+        outfile.write(': ')
+        json.dump(value, outfile)
+
+    outfile.write('}')
+
 # combine_data_sources for JSON files of video feeds and tfidf tree
 def combine_data_sources(feeds_store, tfidf_store, versioning_store, storage_directory, prints=True):
 
-    '''Combine feeds storage and tfidf storage objects into a single object.
+    '''Combine feeds storage and tfidf storage objects into a single object stored as JSON, returns the path of the stored file.
 
     Arguments:
 
@@ -1228,6 +1259,9 @@ def combine_data_sources(feeds_store, tfidf_store, versioning_store, storage_dir
     tfidf_store -- the os file path for where the tfidf_store created by generate_tfidf_from_directory is stored.
         example: 'C:/transcription_runner/seattle/json/tfidf.json'
 
+    versioning_store -- the os file path for where the versioning_store created by generate_tfidf_from_directory is stored.
+        example: 'C:/transcription_runner/seattle/json/events_versioning.json'
+
     storage_directory -- the directory or folder os path for where to store the combined JSON file.
         example: 'C:/transcription_runner/seattle/json/'
 
@@ -1246,53 +1280,27 @@ def combine_data_sources(feeds_store, tfidf_store, versioning_store, storage_dir
     if not os.path.exists(storage_directory):
         os.mkdir(storage_directory)
 
-    # read the feeds_data in
-    with open(feeds_store, 'r') as feeds_file:
-        feeds_data = json.load(feeds_file)
-
-    # ensure file safety
-    feeds_file.close()
-    time.sleep(1)
-
-    # read the tfidf_data in
-    with open(tfidf_store, 'r') as tfidf_file:
-        tfidf_data = json.load(tfidf_file)
-
-    # ensure file safety
-    tfidf_file.close()
-    time.sleep(1)
-
-    with open(versioning_store, 'r') as versioning_file:
-        versioning_data = json.load(versioning_file)
-
-    versioning_file.close()
-    time.sleep(1)
-
-    # initialize the combined_data dictionary to be stored
-    combined_data = dict()
-    combined_data['events'] = dict()
-    combined_data['events_tfidf'] = tfidf_data
-    combined_data['transcript_versioning'] = versioning_data
-
-    # place each item from the feeds data into the matching combined_data location
-    for item in feeds_data:
+    # place each item from the feeds data into the matching events location, feeds are small so they are held to keep the last item of each naming
+    events = dict()
+    for item in stores.read_json_stream(feeds_store):
         if item['naming'] != '':
-            combined_data['events'][item['naming']] = item
+            events[item['naming']] = item
 
     # give the combined_data a filename
     result_file = storage_directory + 'combined_data.json'
+    partial_file = result_file + '.partial'
 
-    # always rewrite the file because of potential changes in tfidf process
-    if os.path.exists(result_file):
-        os.remove(result_file)
+    # always rewrite the file because of potential changes in tfidf process, the tfidf and versioning data are streamed from their stores one transcript at a time
+    with open(partial_file, 'w') as combined_file:
+        combined_file.write('{"events": ')
+        write_json_items(events.items(), combined_file)
+        combined_file.write(', "events_tfidf": ')
+        write_json_items(stores.read_json_stream(tfidf_store), combined_file)
+        combined_file.write(', "transcript_versioning": ')
+        write_json_items(stores.read_json_stream(versioning_store), combined_file)
+        combined_file.write('}')
 
-    # actual rewrite of file
-    with open(result_file, 'w') as combined_file:
-        json.dump(combined_data, combined_file)
-
-    # ensure file safety
-    combined_file.close()
-    time.sleep(1)
+    os.replace(partial_file, result_file)
 
     current_dt = datetime.datetime.now()
     curr_date = current_dt.date()
@@ -1300,16 +1308,12 @@ def combine_data_sources(feeds_store, tfidf_store, versioning_store, storage_dir
 
     result_log_file = storage_directory + 'combined_data_' + str(curr_date) + 'T' + str(curr_time).replace(':', '-') + '.json'
 
-    with open(result_log_file, 'w') as combined_log_file:
-        json.dump(combined_data, combined_log_file)
-
-    combined_log_file.close()
-    time.sleep(1)
+    shutil.copyfile(result_file, result_log_file)
 
     if prints:
         print('stored combined data at: ' + result_file)
         print('stored combined data at: ' + result_log_file)
         print('----------------------------------------------------------------------------------------')
 
-    return combined_data
+    return result_file
 
@@ -4,8 +4,8 @@ import Levenshtein
 import datetime
 import requests
 
-def _get_parse_page(url):
-    r = requests.get(url)
+def _get_parse_page(url, session=requests):
+    r = session.get(url)
     return bs(r.content, 'html.parser')
 
 def _collect_all(soup,
@@ -97,9 +97,9 @@ def _reduce_dict(d):
     #     for b_key in b:
 
 
-def get_all_video():
+def get_all_video(session=requests):
     base_url = 'http://www.seattlechannel.org/'
-    landing = _get_parse_page(base_url + 'CityCouncil')
+    landing = _get_parse_page(base_url + 'CityCouncil', session)
     committee_div_classes = ['col-md-6 col-xs-12 twoColLeft',
                             'col-md-6col-xs-12 twoColRight']
     committee_divs = _collect_all(landing, classes=committee_div_classes)